@@ -0,0 +1,106 @@
+"""
+Número de filas por tabla para publicar totales sin ejecutar `COUNT(*)`.
+
+Cada tabla contada tiene una fila en `conteo_tabla` que triggers de la base de datos
+ajustan en cada INSERT o DELETE, igual que las versiones de `version_tabla`: cualquier
+ruta de escritura la mantiene al día y leerla es una consulta por clave primaria.
+En PostgreSQL los triggers son por sentencia y suman el tamaño de las tablas de
+transición, de modo que una inserción masiva actualiza el contador una sola vez.
+
+En PostgreSQL los escritores concurrentes de una misma tabla se serializan en el bloqueo
+de su fila de `conteo_tabla` (igual que en `version_tabla`) hasta que cada transacción
+confirma; ver la migración `0006_conteo_tabla` para el alcance de esta decisión.
+"""
+from typing import List, Optional
+
+from sqlalchemy import event, func, select, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from ..models.models import Base, ConteoTabla, MarcaVehiculo, Persona, Vehiculo
+from .versioning import TRIGGER_DIALECTS
+
+# Tablas cuyas filas se cuentan
+COUNTED_TABLES = (
+    MarcaVehiculo.__tablename__,
+    Persona.__tablename__,
+    Vehiculo.__tablename__,
+)
+
+_POSTGRESQL_FUNCTION = """
+CREATE OR REPLACE FUNCTION contar_filas_tabla() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE conteo_tabla SET filas = filas + (SELECT count(*) FROM filas_nuevas) WHERE tabla = TG_TABLE_NAME;
+    ELSE
+        UPDATE conteo_tabla SET filas = filas - (SELECT count(*) FROM filas_eliminadas) WHERE tabla = TG_TABLE_NAME;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def _trigger_statements(dialect: str, name: str):
+    """Sentencias que crean (si no existen) los triggers de conteo de `name`"""
+    if dialect == "postgresql":
+        for operation, transition in (("INSERT", "NEW TABLE AS filas_nuevas"), ("DELETE", "OLD TABLE AS filas_eliminadas")):
+            yield (
+                f"CREATE OR REPLACE TRIGGER {name}_conteo_{operation.lower()} "
+                f"AFTER {operation} ON {name} REFERENCING {transition} "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION contar_filas_tabla()"
+            )
+        return
+    for operation, delta in (("INSERT", "+ 1"), ("DELETE", "- 1")):
+        yield (
+            f"CREATE TRIGGER IF NOT EXISTS {name}_conteo_{operation.lower()} "
+            f"AFTER {operation} ON {name} BEGIN "
+            f"UPDATE conteo_tabla SET filas = filas {delta} WHERE tabla = '{name}'; END"
+        )
+
+
+def count_trigger_ddl(dialect: str) -> List[str]:
+    """DDL idempotente de los triggers de conteo para `dialect` (también la usan las migraciones)"""
+    if dialect not in TRIGGER_DIALECTS:
+        return []
+    statements = [_POSTGRESQL_FUNCTION] if dialect == "postgresql" else []
+    for name in COUNTED_TABLES:
+        statements.extend(_trigger_statements(dialect, name))
+    return statements
+
+
+def install_row_counters(connection: Connection) -> None:
+    """
+    Registrar las tablas contadas y crear sus triggers (operación idempotente).
+
+    Un contador nuevo empieza con el `COUNT(*)` actual de su tabla; los existentes
+    no se recalculan.
+    """
+    dialect = connection.dialect.name
+    if dialect not in TRIGGER_DIALECTS:
+        return
+
+    existing = set(connection.scalars(select(ConteoTabla.tabla)))
+    for name in COUNTED_TABLES:
+        if name not in existing:
+            rows = connection.scalar(select(func.count()).select_from(table(name)))
+            connection.execute(ConteoTabla.__table__.insert().values(tabla=name, filas=rows))
+
+    for statement in count_trigger_ddl(dialect):
+        connection.execute(text(statement))
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_after_create(target, connection, **kw):
+    install_row_counters(connection)
+
+
+def read_row_count(db: Session, name: str) -> Optional[int]:
+    """
+    Obtener el número de filas de la tabla `name`.
+
+    Retorna `None` si el motor no tiene triggers de conteo.
+    """
+    if db.get_bind().dialect.name not in TRIGGER_DIALECTS:
+        return None
+    return db.scalar(select(ConteoTabla.filas).where(ConteoTabla.tabla == name))
@@ -1,10 +1,21 @@
+import importlib.util
+import logging
 import os
+import time
+from typing import AsyncIterator
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
 
 from ..models.models import Base
+from ..utils.metrics import DB_POOL_CHECKOUT, record_query
+from . import counts, search, stats, versioning  # noqa: F401  (registran triggers, índices y resúmenes en create_all)
+from .migrations import stamp_head
+
+logger = logging.getLogger(__name__)
 
 # Cargar variables de entorno
 load_dotenv()
@@ -12,26 +23,246 @@ load_dotenv()
 # Configuración de base de datos desde variables de entorno
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./vehiculos.db")
 
-# Crear engine con configuraciones específicas para SQLite
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
+# Modo de acceso a la base de datos: "sync" (threadpool) o "async" (AsyncSession)
+DATABASE_MODE = os.getenv("DATABASE_MODE", "sync").lower()
+
+# Driver asíncrono que se usa para cada motor en modo "async"
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+# Perfil de SQLite: "default" (sin pragmas) o "production" (WAL, mmap, caché, ...)
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "default").lower()
+
+# Pragmas que se incluyen en el reporte de configuración efectiva
+SQLITE_REPORTED_PRAGMAS = (
+    "journal_mode", "synchronous", "mmap_size", "cache_size",
+    "temp_store", "busy_timeout", "foreign_keys",
 )
 
+
+def _env_int(name: str, default: int) -> int:
+    """Leer una variable de entorno entera con valor por defecto"""
+    return int(os.getenv(name, str(default)))
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Leer una variable de entorno booleana con valor por defecto"""
+    return os.getenv(name, str(default)).lower() == "true"
+
+
+def get_engine_options(database_url: str) -> dict:
+    """
+    Construir los argumentos de `create_engine` según el motor de `database_url`.
+
+    - **SQLite en memoria**: una única conexión compartida (`StaticPool`), porque
+      cada conexión nueva vería una base de datos vacía.
+    - **SQLite en archivo**: `QueuePool` sin afinidad de hilo, de modo que cada hilo
+      del threadpool de uvicorn trabaja con su propia conexión durante la petición.
+    - **Servidores (PostgreSQL, MySQL, ...)**: `QueuePool` con tamaño, desborde,
+      timeout, reciclado y pre-ping configurables por variables de entorno.
+    """
+    url = make_url(database_url)
+    pool_options = {
+        "poolclass": QueuePool,
+        "pool_size": _env_int("DB_POOL_SIZE", 5),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 10),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+    }
+
+    if url.get_backend_name() == "sqlite":
+        options = {"connect_args": {"check_same_thread": False}}
+        in_memory = url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+        if in_memory:
+            options["poolclass"] = StaticPool
+        else:
+            options.update(pool_options)
+        return options
+
+    pool_options.update(
+        pool_recycle=_env_int("DB_POOL_RECYCLE", 1800),
+        pool_pre_ping=_env_bool("DB_POOL_PRE_PING", True),
+    )
+    return pool_options
+
+
+def get_sqlite_pragmas() -> dict:
+    """
+    Pragmas del perfil "production" de SQLite.
+
+    WAL permite que las lecturas continúen mientras hay una escritura en curso,
+    `synchronous=NORMAL` es seguro con WAL y evita un fsync por transacción, y
+    `busy_timeout` hace que los escritores concurrentes esperen en lugar de fallar.
+    """
+    return {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": _env_int("SQLITE_MMAP_SIZE", 268435456),
+        "cache_size": _env_int("SQLITE_CACHE_SIZE", -65536),
+        "temp_store": "MEMORY",
+        "busy_timeout": _env_int("SQLITE_BUSY_TIMEOUT", 5000),
+        "foreign_keys": "ON",
+    }
+
+
+def enable_sqlite_pragmas(engine: Engine, pragmas: dict) -> None:
+    """Aplicar `pragmas` en cada conexión nueva que abra el pool de `engine`"""
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def _apply_sqlite_profile(engine: Engine, options: dict, sqlite_profile: str) -> None:
+    """Aplicar el perfil de SQLite a `engine` si corresponde (solo SQLite en archivo)"""
+    in_memory = options["poolclass"] is StaticPool
+    if sqlite_profile == "production" and engine.dialect.name == "sqlite" and not in_memory:
+        enable_sqlite_pragmas(engine, get_sqlite_pragmas())
+
+
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started"] = time.perf_counter()
+
+
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("query_started", None)
+    if started is not None:
+        record_query(time.perf_counter() - started)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Medir cada consulta de `engine` para `/metrics` (operación idempotente).
+
+    `before_cursor_execute`/`after_cursor_execute` rodean la ejecución en el driver, así
+    que la duración no incluye compilar la sentencia ni construir los objetos ORM.
+    """
+    if not event.contains(engine, "before_cursor_execute", _query_started):
+        event.listen(engine, "before_cursor_execute", _query_started)
+        event.listen(engine, "after_cursor_execute", _query_finished)
+
+
+def build_engine(database_url: str, sqlite_profile: str = SQLITE_PROFILE) -> Engine:
+    """Crear un engine con la configuración de pool adecuada para `database_url`"""
+    options = get_engine_options(database_url)
+    engine = create_engine(database_url, **options)
+    _apply_sqlite_profile(engine, options, sqlite_profile)
+    instrument_engine(engine)
+    return engine
+
+
+def get_async_database_url(database_url: str) -> str:
+    """
+    Traducir `database_url` a su equivalente con driver asíncrono.
+
+    `sqlite:///./vehiculos.db` pasa a `sqlite+aiosqlite:///./vehiculos.db` y
+    `postgresql://...` a `postgresql+asyncpg://...`. Si el driver no está instalado
+    se rechaza aquí, al arrancar, y no en la primera petición.
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No hay un driver asíncrono configurado para '{backend}'")
+    driver = ASYNC_DRIVERS[backend]
+    if importlib.util.find_spec(driver) is None:
+        raise RuntimeError(
+            f"DATABASE_MODE=async con '{backend}' requiere el paquete '{driver}' (pip install {driver})"
+        )
+    url = url.set(drivername=f"{backend}+{driver}")
+    return url.render_as_string(hide_password=False)
+
+
+def build_async_engine(database_url: str, sqlite_profile: str = SQLITE_PROFILE) -> AsyncEngine:
+    """Crear un engine asíncrono con la misma configuración de pool que `build_engine`"""
+    options = get_engine_options(database_url)
+    if options["poolclass"] is QueuePool:
+        options["poolclass"] = AsyncAdaptedQueuePool
+    engine = create_async_engine(get_async_database_url(database_url), **options)
+    _apply_sqlite_profile(engine.sync_engine, options, sqlite_profile)
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+def database_settings_report(engine: Engine) -> dict:
+    """Obtener la configuración efectiva del engine (pool y, en SQLite, pragmas)"""
+    report = {
+        "backend": engine.dialect.name,
+        "pool": type(engine.pool).__name__,
+    }
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as connection:
+            for name in SQLITE_REPORTED_PRAGMAS:
+                report[name] = connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+    return report
+
+
+# Crear engine con la configuración específica del motor de base de datos
+engine = build_engine(SQLALCHEMY_DATABASE_URL)
+
 # Crear SessionLocal
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine y sesiones asíncronas (solo se crean en modo "async")
+async_engine = build_async_engine(SQLALCHEMY_DATABASE_URL) if DATABASE_MODE == "async" else None
+
+# Sin expire_on_commit los objetos se pueden serializar tras el commit sin volver a la base de datos
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+def create_tables(bind: Engine = None):
+    """
+    Crear todas las tablas en la base de datos.
+
+    Una base de datos vacía se crea con el esquema actual y se marca con la última
+    migración de Alembic; en una existente solo se crean las tablas que falten y los
+    cambios de esquema (índices, columnas) se aplican con `alembic upgrade head`.
+    """
+    bind = bind if bind is not None else engine
+    with bind.begin() as connection:
+        empty = not inspect(connection).get_table_names()
+        Base.metadata.create_all(bind=connection)
+        if empty:
+            stamp_head(connection)
+
 
-def create_tables():
-    """Crear todas las tablas en la base de datos"""
-    Base.metadata.create_all(bind=engine)
+def log_database_settings():
+    """Registrar en el log la configuración efectiva de la base de datos"""
+    settings = database_settings_report(engine)
+    logger.info(
+        "Base de datos: %s",
+        ", ".join(f"{name}={value}" for name, value in settings.items())
+    )
 
 
 def get_db() -> Session:
-    """Obtener una sesión de base de datos"""
+    """
+    Obtener una sesión de base de datos.
+
+    La conexión se obtiene del pool antes del handler para medir la espera en
+    `db_pool_checkout_seconds`; la petición la usaría de todos modos.
+    """
     db = SessionLocal()
     try:
+        with DB_POOL_CHECKOUT.time():
+            db.connection()
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Obtener una sesión asíncrona de base de datos (mide la espera del pool como `get_db`)"""
+    async with AsyncSessionLocal() as db:
+        with DB_POOL_CHECKOUT.time():
+            await db.connection()
+        yield db
+
+
+async def dispose_async_engine():
+    """Cerrar las conexiones del engine asíncrono al detener la aplicación"""
+    if async_engine is not None:
+        await async_engine.dispose()
@@ -0,0 +1,47 @@
+"""
+Integración con Alembic (directorio `migrations/`).
+
+El esquema se versiona con migraciones; `create_tables` sigue creando las tablas
+al arrancar para que una base de datos nueva funcione sin pasos manuales, y en ese
+caso la marca con la última migración para que `alembic upgrade head` no intente
+recrearlas.
+"""
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy.engine import Connection
+
+# alembic.ini en la raíz del proyecto
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+def alembic_config(connection: Connection = None) -> Config:
+    """Configuración de Alembic; con `connection` las migraciones se ejecutan sobre ella"""
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["configure_logger"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def head_revision() -> str:
+    """Última revisión definida en `migrations/versions`"""
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def current_revision(connection: Connection):
+    """Revisión aplicada a la base de datos de `connection` (`None` si no está versionada)"""
+    return MigrationContext.configure(connection).get_current_revision()
+
+
+def stamp_head(connection: Connection) -> None:
+    """Marcar la base de datos como actualizada a la última migración sin ejecutarlas"""
+    command.stamp(alembic_config(connection), "head")
+
+
+def upgrade_head(connection: Connection) -> None:
+    """Aplicar las migraciones pendientes"""
+    command.upgrade(alembic_config(connection), "head")
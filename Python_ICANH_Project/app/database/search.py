@@ -0,0 +1,206 @@
+"""
+Búsqueda de texto completo sobre personas, vehículos y marcas.
+
+- **SQLite**: una tabla virtual FTS5 de contenido externo por recurso (`persona_fts`,
+  `vehiculo_fts`, `marca_vehiculo_fts`) que guarda solo el índice invertido; triggers de
+  la base de datos la mantienen sincronizada con cualquier ruta de escritura y el
+  resultado se ordena por `bm25`.
+- **PostgreSQL**: un índice GIN sobre `to_tsvector('simple', ...)` de las mismas columnas,
+  que el motor mantiene por sí mismo; el resultado se ordena por `ts_rank`.
+- **Otros motores**: `ILIKE` sin índice ni ranking, solo como respaldo.
+
+Cada término de la consulta se busca como prefijo y todos deben aparecer. Los puntajes
+de `bm25`/`ts_rank` dependen de las estadísticas de cada tabla y no se comparan entre
+recursos: se normalizan por recurso antes de combinar los resultados.
+"""
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import and_, event, or_, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from ..models.models import Base, MarcaVehiculo, Persona, Vehiculo
+
+# Términos que se toman de la consulta como máximo
+MAX_TERMS = 8
+
+# Tokenizador de FTS5: ignora mayúsculas y tildes ("gómez" encuentra "Gomez")
+FTS5_TOKENIZE = "unicode61 remove_diacritics 2"
+
+
+class SearchIndex:
+    """Columnas indexadas de un recurso y las consultas de búsqueda sobre ellas"""
+
+    def __init__(self, tipo: str, model: Any, *columns: str):
+        self.tipo = tipo
+        self.table = model.__table__
+        self.columns = columns
+        self.fts_table = f"{self.table.name}_fts"
+
+    def sqlite_ddl(self, rebuild: bool = True) -> List[str]:
+        """Tabla FTS5, carga inicial (`rebuild`) y triggers de sincronización"""
+        table, fts, columns = self.table.name, self.fts_table, ", ".join(self.columns)
+        new_values = ", ".join(f"new.{column}" for column in self.columns)
+        old_values = ", ".join(f"old.{column}" for column in self.columns)
+        insert = f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});"
+        delete = f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});"
+
+        statements = [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"{columns}, content='{table}', content_rowid='id', tokenize='{FTS5_TOKENIZE}')"
+        ]
+        if rebuild:
+            statements.append(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN {insert} END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN {delete} END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {columns} ON {table} "
+            f"BEGIN {delete} {insert} END",
+        ]
+        return statements
+
+    def sqlite_drop_ddl(self) -> List[str]:
+        statements = [
+            f"DROP TRIGGER IF EXISTS {self.fts_table}_{operation}" for operation in ("insert", "delete", "update")
+        ]
+        return statements + [f"DROP TABLE IF EXISTS {self.fts_table}"]
+
+    def _tsvector(self, alias: str = "") -> str:
+        document = " || ' ' || ".join(f"{alias}{column}" for column in self.columns)
+        return f"to_tsvector('simple', {document})"
+
+    def postgresql_ddl(self) -> List[str]:
+        """Índice GIN sobre la misma expresión que usan las consultas"""
+        return [f"CREATE INDEX IF NOT EXISTS {self.fts_table} ON {self.table.name} USING gin ({self._tsvector()})"]
+
+    def postgresql_drop_ddl(self) -> List[str]:
+        return [f"DROP INDEX IF EXISTS {self.fts_table}"]
+
+    def statement(self, dialect: str, terms: Sequence[str], limit: int):
+        """Consulta de las filas que contienen todos los `terms`, con su puntaje (mayor es mejor)"""
+        columns = ", ".join(f"c.{column}" for column in self.columns)
+        if dialect == "sqlite":
+            # bm25 es negativo: cuanto menor, más relevante
+            return text(
+                f"SELECT c.id, {columns}, -bm25({self.fts_table}) AS puntaje "
+                f"FROM {self.fts_table} JOIN {self.table.name} AS c ON c.id = {self.fts_table}.rowid "
+                f"WHERE {self.fts_table} MATCH :query ORDER BY bm25({self.fts_table}) LIMIT :limit"
+            ).bindparams(query=" ".join(f'"{term}"*' for term in terms), limit=limit)
+        if dialect == "postgresql":
+            vector = self._tsvector("c.")
+            return text(
+                f"SELECT c.id, {columns}, ts_rank({vector}, to_tsquery('simple', :query)) AS puntaje "
+                f"FROM {self.table.name} AS c WHERE {vector} @@ to_tsquery('simple', :query) "
+                f"ORDER BY puntaje DESC, c.id LIMIT :limit"
+            ).bindparams(query=" & ".join(f"{term}:*" for term in terms), limit=limit)
+
+        table_columns = [self.table.c[column] for column in self.columns]
+        condition = and_(*(or_(*(column.ilike(f"%{term}%") for column in table_columns)) for term in terms))
+        return (
+            select(self.table.c.id, *table_columns, text("0.0 AS puntaje"))
+            .where(condition)
+            .order_by(self.table.c.id)
+            .limit(limit)
+        )
+
+
+SEARCH_INDEXES = (
+    SearchIndex("persona", Persona, "nombre", "cedula"),
+    SearchIndex("vehiculo", Vehiculo, "modelo", "color"),
+    SearchIndex("marca", MarcaVehiculo, "nombre_marca"),
+)
+
+
+def search_index_ddl(dialect: str) -> List[str]:
+    """DDL de los índices de búsqueda para `dialect`, incluida su carga inicial (la usan las migraciones)"""
+    statements = []
+    for index in SEARCH_INDEXES:
+        if dialect == "sqlite":
+            statements.extend(index.sqlite_ddl())
+        elif dialect == "postgresql":
+            statements.extend(index.postgresql_ddl())
+    return statements
+
+
+def drop_search_index_ddl(dialect: str) -> List[str]:
+    """DDL que elimina los índices de búsqueda de `dialect`"""
+    statements = []
+    for index in SEARCH_INDEXES:
+        if dialect == "sqlite":
+            statements.extend(index.sqlite_drop_ddl())
+        elif dialect == "postgresql":
+            statements.extend(index.postgresql_drop_ddl())
+    return statements
+
+
+def install_search_indexes(connection: Connection) -> None:
+    """
+    Crear los índices de búsqueda que falten (operación idempotente).
+
+    En SQLite la tabla FTS5 solo se carga (`rebuild`) cuando se crea, para no recorrer
+    las tablas completas en cada arranque.
+    """
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        existing = set(connection.scalars(text("SELECT name FROM sqlite_master WHERE type = 'table'")))
+        for index in SEARCH_INDEXES:
+            for statement in index.sqlite_ddl(rebuild=index.fts_table not in existing):
+                connection.execute(text(statement))
+    else:
+        for statement in search_index_ddl(dialect):
+            connection.execute(text(statement))
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_after_create(target, connection, **kw):
+    install_search_indexes(connection)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_before_drop(target, connection, **kw):
+    # Las tablas FTS5 no son parte de los modelos: sin esto sobrevivirían a drop_all
+    if connection.dialect.name == "sqlite":
+        for statement in drop_search_index_ddl("sqlite"):
+            connection.execute(text(statement))
+
+
+def is_search_table(name: str) -> bool:
+    """Si `name` es una tabla FTS5 (o una de sus tablas internas `_data`, `_idx`, ...)"""
+    return any(name == index.fts_table or name.startswith(f"{index.fts_table}_") for index in SEARCH_INDEXES)
+
+
+def include_name(name: Optional[str], type_: str, parent_names: Dict[str, Any]) -> bool:
+    """Filtro `include_name` de Alembic: las tablas de búsqueda no se comparan con los modelos"""
+    return not (type_ == "table" and name is not None and is_search_table(name))
+
+
+def query_terms(query: str) -> List[str]:
+    """Términos de búsqueda de `query` (palabras en minúsculas, sin repetir)"""
+    terms = dict.fromkeys(term.lower() for term in re.findall(r"\w+", query))
+    return list(terms)[:MAX_TERMS]
+
+
+def search(db: Session, terms: Sequence[str], tipos: Sequence[str], limit: int) -> List[Dict[str, Any]]:
+    """
+    Buscar `terms` en los recursos `tipos` y combinar los resultados por puntaje.
+
+    Cada índice aporta como máximo `limit` filas, de modo que el costo no depende del
+    número de coincidencias. El puntaje de cada fila se divide por el mejor de su
+    recurso (queda entre 0 y 1): los puntajes crudos de tablas distintas no son
+    comparables, así que el mejor resultado de cada recurso vale 1 y los empates entre
+    recursos conservan el orden de `SEARCH_INDEXES`.
+    """
+    dialect = db.get_bind().dialect.name
+    results = []
+    for index in SEARCH_INDEXES:
+        if index.tipo not in tipos:
+            continue
+        rows = db.execute(index.statement(dialect, terms, limit)).mappings().all()
+        best = max((float(row["puntaje"]) for row in rows), default=0.0)
+        for row in rows:
+            datos = {column: row[column] for column in index.columns}
+            puntaje = float(row["puntaje"]) / best if best > 0 else 0.0
+            results.append({"tipo": index.tipo, "id": row["id"], "puntaje": puntaje, "datos": datos})
+    results.sort(key=lambda result: -result["puntaje"])
+    return results[:limit]
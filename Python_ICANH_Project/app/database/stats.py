@@ -0,0 +1,161 @@
+"""
+Estadísticas de vehículos calculadas en la base de datos.
+
+Los conteos por marca, país, color y número de puertas se calculan con `GROUP BY`.
+Con el resumen activo (`STATS_SUMMARY=true`, por defecto) se leen de `resumen_vehiculo`,
+que guarda el número de vehículos por combinación (marca, color, puertas): una consulta
+recorre tantas filas como combinaciones distintas existan, no tantas como vehículos.
+
+El resumen lo mantienen triggers de la base de datos en cada INSERT, UPDATE o DELETE de
+`vehiculo`, de modo que lo actualizan tanto los endpoints de `app/routes/vehiculo.py`
+(síncronos y asíncronos) como las cargas masivas y las importaciones. En motores sin
+triggers los conteos se calculan directamente sobre `vehiculo`.
+"""
+import os
+from enum import Enum
+from typing import List, Optional, Sequence
+
+from sqlalchemy import Column, event, func, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import visitors
+
+from ..models.models import Base, MarcaVehiculo, ResumenVehiculo, Vehiculo
+from .versioning import TRIGGER_DIALECTS
+
+# Leer los conteos del resumen en lugar de agrupar `vehiculo` completa
+STATS_SUMMARY = os.getenv("STATS_SUMMARY", "true").lower() == "true"
+
+_SUMMARY_KEY = "marca_id = {row}.marca_id AND color = {row}.color AND numero_puertas = {row}.numero_puertas"
+
+_SQLITE_ADD = (
+    "INSERT INTO resumen_vehiculo (marca_id, color, numero_puertas, total) "
+    "VALUES (new.marca_id, new.color, new.numero_puertas, 1) "
+    "ON CONFLICT (marca_id, color, numero_puertas) DO UPDATE SET total = total + 1;"
+)
+
+_SQLITE_REMOVE = (
+    f"UPDATE resumen_vehiculo SET total = total - 1 WHERE {_SUMMARY_KEY.format(row='old')}; "
+    f"DELETE FROM resumen_vehiculo WHERE {_SUMMARY_KEY.format(row='old')} AND total <= 0;"
+)
+
+_POSTGRESQL_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION actualizar_resumen_vehiculo() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE resumen_vehiculo SET total = total - 1 WHERE {_SUMMARY_KEY.format(row='OLD')};
+        DELETE FROM resumen_vehiculo WHERE {_SUMMARY_KEY.format(row='OLD')} AND total <= 0;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO resumen_vehiculo (marca_id, color, numero_puertas, total)
+        VALUES (NEW.marca_id, NEW.color, NEW.numero_puertas, 1)
+        ON CONFLICT (marca_id, color, numero_puertas)
+        DO UPDATE SET total = resumen_vehiculo.total + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+# Columnas de `vehiculo` que cambian la combinación de un vehículo en el resumen
+_SUMMARY_COLUMNS = "marca_id, color, numero_puertas"
+
+
+def summary_trigger_ddl(dialect: str) -> List[str]:
+    """DDL idempotente de los triggers del resumen para `dialect` (también la usan las migraciones)"""
+    if dialect == "postgresql":
+        return [
+            _POSTGRESQL_FUNCTION,
+            "CREATE OR REPLACE TRIGGER vehiculo_resumen "
+            f"AFTER INSERT OR DELETE OR UPDATE OF {_SUMMARY_COLUMNS} ON vehiculo "
+            "FOR EACH ROW EXECUTE FUNCTION actualizar_resumen_vehiculo()",
+        ]
+    if dialect == "sqlite":
+        return [
+            f"CREATE TRIGGER IF NOT EXISTS vehiculo_resumen_insert AFTER INSERT ON vehiculo BEGIN {_SQLITE_ADD} END",
+            f"CREATE TRIGGER IF NOT EXISTS vehiculo_resumen_delete AFTER DELETE ON vehiculo BEGIN {_SQLITE_REMOVE} END",
+            f"CREATE TRIGGER IF NOT EXISTS vehiculo_resumen_update AFTER UPDATE OF {_SUMMARY_COLUMNS} ON vehiculo "
+            f"BEGIN {_SQLITE_REMOVE} {_SQLITE_ADD} END",
+        ]
+    return []
+
+
+def rebuild_summary(connection: Connection) -> None:
+    """Recalcular `resumen_vehiculo` desde `vehiculo` (carga inicial o reparación)"""
+    summary = ResumenVehiculo.__table__
+    groups = select(Vehiculo.marca_id, Vehiculo.color, Vehiculo.numero_puertas, func.count()).group_by(
+        Vehiculo.marca_id, Vehiculo.color, Vehiculo.numero_puertas
+    )
+    connection.execute(summary.delete())
+    connection.execute(summary.insert().from_select(["marca_id", "color", "numero_puertas", "total"], groups))
+
+
+@event.listens_for(ResumenVehiculo.__table__, "after_create")
+def _mark_created(target, connection, **kw):
+    # Solo se dispara cuando la tabla se crea; se carga al terminar create_all,
+    # cuando `vehiculo` ya existe
+    connection.info["resumen_vehiculo_creado"] = True
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_after_create(target, connection, **kw):
+    if connection.info.pop("resumen_vehiculo_creado", False):
+        rebuild_summary(connection)
+    for statement in summary_trigger_ddl(connection.dialect.name):
+        connection.execute(text(statement))
+
+
+class Dimension(str, Enum):
+    marca = "marca"
+    pais = "pais"
+    color = "color"
+    puertas = "puertas"
+
+
+def stats_statement(dimension: Dimension, use_summary: bool):
+    """Consulta `(grupo, total)` del número de vehículos por `dimension`, de mayor a menor"""
+    source = ResumenVehiculo if use_summary else Vehiculo
+    total = func.sum(ResumenVehiculo.total) if use_summary else func.count(Vehiculo.id)
+    group = {
+        Dimension.marca: MarcaVehiculo.nombre_marca,
+        Dimension.pais: MarcaVehiculo.pais,
+        Dimension.color: source.color,
+        Dimension.puertas: source.numero_puertas,
+    }[dimension]
+
+    statement = select(group.label("grupo"), total.label("total")).select_from(source)
+    if dimension in (Dimension.marca, Dimension.pais):
+        statement = statement.join(MarcaVehiculo, MarcaVehiculo.id == source.marca_id)
+    return statement.group_by(group).order_by(total.desc(), group)
+
+
+def uses_summary(db: Session) -> bool:
+    """Si los conteos se leen del resumen (activo y con triggers en el motor actual)"""
+    return STATS_SUMMARY and db.get_bind().dialect.name in TRIGGER_DIALECTS
+
+
+def vehicle_stats(db: Session, dimension: Dimension) -> List[dict]:
+    """Número de vehículos por `dimension`"""
+    rows = db.execute(stats_statement(dimension, uses_summary(db)))
+    return [{"grupo": grupo, "total": total} for grupo, total in rows]
+
+
+def summary_conditions(conditions: Sequence) -> Optional[list]:
+    """
+    Traducir condiciones sobre `vehiculo` a condiciones sobre `resumen_vehiculo`.
+
+    Retorna `None` si alguna usa una columna que el resumen no agrupa (p. ej. `modelo`).
+    """
+    vehiculo, summary = Vehiculo.__table__, ResumenVehiculo.__table__
+    compatible = True
+
+    def replace(element):
+        nonlocal compatible
+        if isinstance(element, Column) and element.table is vehiculo:
+            if element.name in summary.c and element.name != "total":
+                return summary.c[element.name]
+            compatible = False
+        return None
+
+    adapted = [visitors.replacement_traverse(condition, {}, replace) for condition in conditions]
+    return adapted if compatible else None
@@ -0,0 +1,125 @@
+"""
+Versiones por tabla para validar cachés HTTP (ETag) sin leer los datos.
+
+Cada tabla versionada tiene una fila en `version_tabla` cuyo contador incrementan
+triggers de la base de datos en cada INSERT, UPDATE o DELETE. Así cualquier ruta de
+escritura (ORM, inserciones masivas, importaciones, otros workers u otras
+herramientas) cambia la versión, y leerla es una única consulta sobre una tabla mínima.
+"""
+import time
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import event, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from ..models.models import Base, MarcaVehiculo, Persona, Vehiculo, VersionTabla, vehiculo_persona
+
+# Tablas cuyas escrituras se cuentan
+VERSIONED_TABLES = (
+    MarcaVehiculo.__tablename__,
+    Persona.__tablename__,
+    Vehiculo.__tablename__,
+    vehiculo_persona.name,
+)
+
+# Motores para los que se instalan triggers; en los demás no hay versiones (ni ETag)
+TRIGGER_DIALECTS = ("sqlite", "postgresql")
+
+# Clave de `Session.info` con las versiones ya leídas en la petición (ver `share_table_versions`)
+SESSION_VERSIONS_KEY = "versiones_tabla"
+
+_POSTGRESQL_FUNCTION = """
+CREATE OR REPLACE FUNCTION incrementar_version_tabla() RETURNS trigger AS $$
+BEGIN
+    UPDATE version_tabla SET version = version + 1 WHERE tabla = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def _trigger_statements(dialect: str, table: str):
+    """Sentencias que crean (si no existen) los triggers de versión de `table`"""
+    if dialect == "postgresql":
+        yield (
+            f"CREATE OR REPLACE TRIGGER {table}_version "
+            f"AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION incrementar_version_tabla()"
+        )
+        return
+    for operation in ("INSERT", "UPDATE", "DELETE"):
+        yield (
+            f"CREATE TRIGGER IF NOT EXISTS {table}_version_{operation.lower()} "
+            f"AFTER {operation} ON {table} BEGIN "
+            f"UPDATE version_tabla SET version = version + 1 WHERE tabla = '{table}'; END"
+        )
+
+
+def version_trigger_ddl(dialect: str) -> List[str]:
+    """DDL idempotente de los triggers de versión para `dialect` (también la usan las migraciones)"""
+    if dialect not in TRIGGER_DIALECTS:
+        return []
+    statements = [_POSTGRESQL_FUNCTION] if dialect == "postgresql" else []
+    for table in VERSIONED_TABLES:
+        statements.extend(_trigger_statements(dialect, table))
+    return statements
+
+
+def install_version_triggers(connection: Connection) -> None:
+    """
+    Registrar las tablas versionadas y crear sus triggers (operación idempotente).
+
+    La versión inicial es el instante actual en milisegundos, de modo que una base de
+    datos recreada no repite versiones (ni ETags) de la anterior.
+    """
+    dialect = connection.dialect.name
+    if dialect not in TRIGGER_DIALECTS:
+        return
+
+    existing = set(connection.scalars(select(VersionTabla.tabla)))
+    initial = int(time.time() * 1000)
+    missing = [{"tabla": table, "version": initial} for table in VERSIONED_TABLES if table not in existing]
+    if missing:
+        connection.execute(VersionTabla.__table__.insert(), missing)
+
+    for statement in version_trigger_ddl(dialect):
+        connection.execute(text(statement))
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_after_create(target, connection, **kw):
+    install_version_triggers(connection)
+
+
+def read_table_versions(db: Session, tables: Sequence[str]) -> Optional[Dict[str, int]]:
+    """
+    Obtener la versión actual de cada tabla de `tables`.
+
+    Retorna `None` si el motor no tiene triggers de versión.
+    """
+    if db.get_bind().dialect.name not in TRIGGER_DIALECTS:
+        return None
+    rows = db.execute(
+        select(VersionTabla.tabla, VersionTabla.version).where(VersionTabla.tabla.in_(tables))
+    )
+    return dict(rows.all())
+
+
+def share_table_versions(db: Session, versions: Optional[Dict[str, int]]) -> None:
+    """
+    Guardar en la sesión las versiones leídas al inicio de una petición de lectura.
+
+    La caché HTTP las lee antes del handler; las cachés de lectura las reutilizan
+    (`session_table_versions`) para validar sus entradas sin otra consulta.
+    """
+    if versions is not None:
+        db.info[SESSION_VERSIONS_KEY] = versions
+
+
+def session_table_versions(db: Session, tables: Sequence[str]) -> Optional[Dict[str, int]]:
+    """Versiones de `tables` compartidas en la sesión o, si falta alguna, leídas de la base de datos"""
+    known = db.info.get(SESSION_VERSIONS_KEY, {})
+    if all(table in known for table in tables):
+        return {table: known[table] for table in tables}
+    return read_table_versions(db, tables)
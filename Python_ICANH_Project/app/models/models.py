@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Table
+from sqlalchemy import BigInteger, Column, Index, Integer, String, ForeignKey, Table
 from sqlalchemy.orm import relationship, DeclarativeBase
 
 
@@ -11,7 +11,10 @@ vehiculo_persona = Table(
     'vehiculo_persona',
     Base.metadata,
     Column('vehiculo_id', Integer, ForeignKey('vehiculo.id'), primary_key=True),
-    Column('persona_id', Integer, ForeignKey('persona.id'), primary_key=True)
+    Column('persona_id', Integer, ForeignKey('persona.id'), primary_key=True),
+    # La clave primaria (vehiculo_id, persona_id) solo sirve para buscar por vehículo;
+    # este índice cubre las búsquedas inversas (vehículos de una persona)
+    Index('ix_vehiculo_persona_persona_id', 'persona_id'),
 )
 
 
@@ -20,7 +23,7 @@ class MarcaVehiculo(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     nombre_marca = Column(String, unique=True, nullable=False)
-    pais = Column(String, nullable=False)
+    pais = Column(String, nullable=False, index=True)
 
     # Relación con Vehiculo
     vehiculos = relationship("Vehiculo", back_populates="marca")
@@ -30,7 +33,7 @@ class Persona(Base):
     __tablename__ = "persona"
 
     id = Column(Integer, primary_key=True, index=True)
-    nombre = Column(String, nullable=False)
+    nombre = Column(String, nullable=False, index=True)
     cedula = Column(String, unique=True, nullable=False)
 
     # Relación Many-to-Many con Vehiculo a través de la tabla vehiculo_persona
@@ -41,13 +44,42 @@ class Vehiculo(Base):
     __tablename__ = "vehiculo"
 
     id = Column(Integer, primary_key=True, index=True)
-    modelo = Column(String, nullable=False)
-    marca_id = Column(Integer, ForeignKey("marca_vehiculo.id"), nullable=False)
+    modelo = Column(String, nullable=False, index=True)
+    marca_id = Column(Integer, ForeignKey("marca_vehiculo.id"), nullable=False, index=True)
     numero_puertas = Column(Integer, nullable=False)
-    color = Column(String, nullable=False)
+    color = Column(String, nullable=False, index=True)
 
     # Relación con MarcaVehiculo
     marca = relationship("MarcaVehiculo", back_populates="vehiculos")
 
     # Relación Many-to-Many con Persona a través de la tabla vehiculo_persona
     propietarios = relationship("Persona", secondary=vehiculo_persona, back_populates="vehiculos")
+
+
+class VersionTabla(Base):
+    __tablename__ = "version_tabla"
+
+    # Contador de cambios por tabla; lo incrementan triggers de la base de datos
+    # en cada INSERT/UPDATE/DELETE (ver app/database/versioning.py)
+    tabla = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False)
+
+
+class ResumenVehiculo(Base):
+    __tablename__ = "resumen_vehiculo"
+
+    # Número de vehículos por combinación (marca, color, puertas); lo mantienen
+    # triggers de la base de datos en cada escritura de `vehiculo` (ver app/database/stats.py)
+    marca_id = Column(Integer, primary_key=True)
+    color = Column(String, primary_key=True)
+    numero_puertas = Column(Integer, primary_key=True)
+    total = Column(Integer, nullable=False)
+
+
+class ConteoTabla(Base):
+    __tablename__ = "conteo_tabla"
+
+    # Número de filas por tabla; lo mantienen triggers de la base de datos en cada
+    # INSERT/DELETE (ver app/database/counts.py)
+    tabla = Column(String, primary_key=True)
+    filas = Column(BigInteger, nullable=False)
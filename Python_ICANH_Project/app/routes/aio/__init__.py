@@ -0,0 +1,52 @@
+# Async routes package
+from fastapi import APIRouter, Depends, params
+from fastapi.routing import APIRoute
+
+from ...utils.http_cache import HttpCache
+from . import marca_vehiculo, persona, vehiculo
+
+
+def async_dependency(dependency: params.Depends) -> params.Depends:
+    """`dependency` o, si es una `HttpCache`, su versión asíncrona (`HttpCache.acall`)"""
+    if isinstance(dependency.dependency, HttpCache):
+        return Depends(dependency.dependency.acall, use_cache=dependency.use_cache)
+    return dependency
+
+
+def merge_async_routes(sync_router: APIRouter, async_router: APIRouter) -> APIRouter:
+    """
+    Combinar un router síncrono con su versión asíncrona.
+
+    Se conserva el orden y la documentación de `sync_router` (las rutas fijas como
+    `/export` siguen registradas antes que `/{id}`), y cada ruta que tiene una versión
+    en `async_router` con la misma ruta y métodos se atiende con el handler `async def`.
+    Las dependencias de caché HTTP de esas rutas se cambian por su versión asíncrona, de
+    modo que la petición no abre además una sesión síncrona en el threadpool.
+    """
+    async_routes = {
+        (route.path, frozenset(route.methods)): route
+        for route in async_router.routes
+        if isinstance(route, APIRoute)
+    }
+    merged = APIRouter()
+    for route in sync_router.routes:
+        async_route = async_routes.get((route.path, frozenset(getattr(route, "methods", ()))))
+        if async_route is None:
+            merged.routes.append(route)
+            continue
+        merged.add_api_route(
+            route.path,
+            async_route.endpoint,
+            methods=list(route.methods),
+            response_model=route.response_model,
+            status_code=route.status_code,
+            tags=route.tags,
+            summary=route.summary,
+            description=route.description,
+            responses=route.responses,
+            name=route.name,
+            include_in_schema=route.include_in_schema,
+            response_class=route.response_class,
+            dependencies=[async_dependency(dependency) for dependency in route.dependencies],
+        )
+    return merged
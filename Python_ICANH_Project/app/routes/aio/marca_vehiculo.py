@@ -0,0 +1,161 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from ...database.database import get_async_db
+from ...models.models import MarcaVehiculo as MarcaVehiculoModel, Vehiculo
+from ...schemas.schemas import (
+    MarcaVehiculo,
+    MarcaVehiculoCreate,
+    MarcaVehiculoUpdate
+)
+from ...utils.fields import FieldSelection, json_response
+from ...utils.filters import Listing, marca_listing
+from ...utils.loading import MARCA_FIELDS
+from ...utils.marca_cache import marca_cache
+from ...utils.rows import MARCA_ROWS, use_rows
+from ...utils.resource_cache import vehiculo_cache, vehiculos_de_marca
+from ...utils.pagination import paginate_statement, set_next_cursor, split_page
+from ...utils.totals import TotalCount, total_count
+from ...utils.sql import insert_returning, update_returning
+
+# Versiones asíncronas de los handlers de app/routes/marca_vehiculo.py; se combinan con ese router
+# mediante `merge_async_routes`, que conserva su orden y su documentación.
+router = APIRouter(
+    prefix="/api/marcas-vehiculo",
+    tags=["Marcas de Vehículo"],
+    responses={404: {"description": "No encontrado"}},
+)
+
+
+@router.post("/", response_model=MarcaVehiculo, summary="Crear una nueva marca de vehículo")
+async def create_marca_vehiculo(
+    marca: MarcaVehiculoCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Crear una nueva marca de vehículo (versión asíncrona)."""
+    try:
+        db_marca = (await db.execute(insert_returning(MarcaVehiculoModel, marca.model_dump()))).one()
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Ya existe una marca con ese nombre"
+        )
+
+    # Descartar cualquier entrada previa con el mismo id (SQLite puede reutilizar ids)
+    await marca_cache.ainvalidate(db_marca.id, db_marca.nombre_marca)
+    return db_marca
+
+
+@router.get("/", response_model=List[MarcaVehiculo], summary="Obtener todas las marcas de vehículo")
+async def read_marcas_vehiculo(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    listing: Listing = Depends(marca_listing),
+    total: TotalCount = Depends(total_count),
+    selection: FieldSelection = Depends(MARCA_FIELDS),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Obtener una lista de todas las marcas de vehículo (versión asíncrona)."""
+    if use_rows(selection):
+        marcas, next_cursor = await MARCA_ROWS.apage(db, listing, cursor, skip, limit)
+        render = MARCA_ROWS.render
+    else:
+        statement = paginate_statement(
+            listing.apply(select(MarcaVehiculoModel).options(*selection.options)),
+            listing.columns, listing.sort, cursor=cursor, skip=skip, limit=limit, descending=listing.descending
+        )
+        marcas, next_cursor = split_page((await db.scalars(statement)).all(), listing.columns, listing.sort, limit)
+        render = selection.render
+    set_next_cursor(response, next_cursor)
+    await total.aapply(db, listing, response)
+    return render(marcas, response)
+
+
+@router.get("/{marca_id}", response_model=MarcaVehiculo, summary="Obtener una marca de vehículo por ID")
+async def read_marca_vehiculo(
+    marca_id: int,
+    response: Response,
+    selection: FieldSelection = Depends(MARCA_FIELDS),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Obtener una marca de vehículo específica por su ID (versión asíncrona)."""
+    if not selection.partial:
+        version = await marca_cache.aversion(db)
+        cached = await marca_cache.aget_json(marca_id, version)
+        if cached is not None:
+            return json_response(cached, response)
+
+    db_marca = await db.scalar(
+        select(MarcaVehiculoModel)
+        .options(*selection.options)
+        .where(MarcaVehiculoModel.id == marca_id)
+    )
+    if db_marca is None:
+        raise HTTPException(status_code=404, detail="Marca no encontrada")
+    if selection.partial:
+        return selection.render(db_marca, response)
+    return json_response(await marca_cache.astore(db_marca, version), response)
+
+
+@router.put("/{marca_id}", response_model=MarcaVehiculo, summary="Actualizar una marca de vehículo")
+async def update_marca_vehiculo(
+    marca_id: int,
+    marca_update: MarcaVehiculoUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Actualizar una marca de vehículo existente (versión asíncrona)."""
+    marca_anterior = await marca_cache.aget(db, marca_id)
+    if marca_anterior is None:
+        raise HTTPException(status_code=404, detail="Marca no encontrada")
+    nombre_anterior = marca_anterior.nombre_marca
+
+    changes = marca_update.model_dump(exclude_unset=True, exclude_none=True)
+    try:
+        db_marca = (await db.execute(update_returning(MarcaVehiculoModel, marca_id, changes))).first()
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Ya existe una marca con ese nombre"
+        )
+    if db_marca is None:
+        raise HTTPException(status_code=404, detail="Marca no encontrada")
+
+    await marca_cache.ainvalidate(marca_id, nombre_anterior, db_marca.nombre_marca)
+    # Las respuestas en caché de sus vehículos incluyen la marca
+    await vehiculo_cache.ainvalidate(*(await db.scalars(vehiculos_de_marca(marca_id))))
+    return db_marca
+
+
+@router.delete("/{marca_id}", summary="Eliminar una marca de vehículo")
+async def delete_marca_vehiculo(
+    marca_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Eliminar una marca de vehículo (versión asíncrona)."""
+    db_marca = await db.get(MarcaVehiculoModel, marca_id)
+    if db_marca is None:
+        raise HTTPException(status_code=404, detail="Marca no encontrada")
+
+    # Verificar si hay vehículos asociados a esta marca
+    vehiculo_id = await db.scalar(
+        select(Vehiculo.id).where(Vehiculo.marca_id == marca_id).limit(1)
+    )
+    if vehiculo_id is not None:
+        raise HTTPException(
+            status_code=400,
+            detail="No se puede eliminar la marca porque tiene vehículos asociados"
+        )
+
+    await db.delete(db_marca)
+    await db.commit()
+    await marca_cache.ainvalidate(marca_id, db_marca.nombre_marca)
+    return {"message": "Marca eliminada exitosamente"}
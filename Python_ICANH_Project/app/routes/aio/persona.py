@@ -0,0 +1,209 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import List, Optional
+
+from ...database.database import get_async_db
+from ...models.models import Persona as PersonaModel, vehiculo_persona
+from ...schemas.schemas import (
+    Persona,
+    PersonaCreate,
+    PersonaUpdate,
+    PersonaConVehiculos,
+    ConteoRelaciones
+)
+from ...utils.fields import FieldSelection, json_response
+from ...utils.filters import Listing, persona_listing
+from ...utils.loading import PERSONA_FIELDS
+from ...utils.ownership import VEHICULOS_CURSOR, VEHICULOS_ORDER, count_statement, vehiculos_statement
+from ...utils.rows import (
+    PERSONA_CON_VEHICULOS_JSON,
+    PERSONA_ROWS,
+    ROW_RESPONSES,
+    apersona_con_vehiculos,
+    use_rows,
+)
+from ...utils.resource_cache import persona_cache, vehiculo_cache, vehiculos_de_persona
+from ...utils.pagination import paginate_statement, set_next_cursor, split_page
+from ...utils.totals import TotalCount, total_count
+from ...utils.sql import insert_returning, update_returning
+
+# Versiones asíncronas de los handlers de app/routes/persona.py; se combinan con ese router
+# mediante `merge_async_routes`, que conserva su orden y su documentación.
+router = APIRouter(
+    prefix="/api/personas",
+    tags=["Personas"],
+    responses={404: {"description": "No encontrado"}},
+)
+
+
+@router.post("/", response_model=Persona, summary="Crear una nueva persona")
+async def create_persona(
+    persona: PersonaCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Crear una nueva persona (versión asíncrona)."""
+    try:
+        db_persona = (await db.execute(insert_returning(PersonaModel, persona.model_dump()))).one()
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Ya existe una persona con esa cédula"
+        )
+
+    # Descartar cualquier entrada previa con el mismo id (SQLite puede reutilizar ids)
+    await persona_cache.ainvalidate(db_persona.id)
+    return db_persona
+
+
+@router.get("/", response_model=List[Persona], summary="Obtener todas las personas")
+async def read_personas(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    listing: Listing = Depends(persona_listing),
+    total: TotalCount = Depends(total_count),
+    selection: FieldSelection = Depends(PERSONA_FIELDS),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Obtener una lista de todas las personas (versión asíncrona)."""
+    if use_rows(selection):
+        personas, next_cursor = await PERSONA_ROWS.apage(db, listing, cursor, skip, limit)
+        render = PERSONA_ROWS.render
+    else:
+        statement = paginate_statement(
+            listing.apply(select(PersonaModel).options(*selection.options)),
+            listing.columns, listing.sort, cursor=cursor, skip=skip, limit=limit, descending=listing.descending
+        )
+        personas, next_cursor = split_page((await db.scalars(statement)).all(), listing.columns, listing.sort, limit)
+        render = selection.render
+    set_next_cursor(response, next_cursor)
+    await total.aapply(db, listing, response)
+    return render(personas, response)
+
+
+@router.get("/{persona_id}", response_model=Persona, summary="Obtener una persona por ID")
+async def read_persona(
+    persona_id: int,
+    response: Response,
+    selection: FieldSelection = Depends(PERSONA_FIELDS),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Obtener una persona específica por su ID (versión asíncrona)."""
+    if not selection.partial:
+        version = await persona_cache.aversion(db)
+        cached = await persona_cache.aget_json(persona_id, version)
+        if cached is not None:
+            return json_response(cached, response)
+
+    db_persona = await db.scalar(
+        select(PersonaModel)
+        .options(*selection.options)
+        .where(PersonaModel.id == persona_id)
+    )
+    if db_persona is None:
+        raise HTTPException(status_code=404, detail="Persona no encontrada")
+    if selection.partial:
+        return selection.render(db_persona, response)
+    return json_response(await persona_cache.astore(db_persona, version), response)
+
+
+@router.put("/{persona_id}", response_model=Persona, summary="Actualizar una persona")
+async def update_persona(
+    persona_id: int,
+    persona_update: PersonaUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Actualizar una persona existente (versión asíncrona)."""
+    changes = persona_update.model_dump(exclude_unset=True, exclude_none=True)
+    try:
+        db_persona = (await db.execute(update_returning(PersonaModel, persona_id, changes))).first()
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Ya existe una persona con esa cédula"
+        )
+    if db_persona is None:
+        raise HTTPException(status_code=404, detail="Persona no encontrada")
+
+    await persona_cache.ainvalidate(persona_id)
+    # Las respuestas en caché de sus vehículos la incluyen como propietaria
+    await vehiculo_cache.ainvalidate(*(await db.scalars(vehiculos_de_persona(persona_id))))
+    return db_persona
+
+
+@router.delete("/{persona_id}", summary="Eliminar una persona")
+async def delete_persona(
+    persona_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Eliminar una persona (versión asíncrona)."""
+    db_persona = await db.get(PersonaModel, persona_id)
+    if db_persona is None:
+        raise HTTPException(status_code=404, detail="Persona no encontrada")
+
+    # Verificar si la persona tiene vehículos asociados
+    vehiculo_id = await db.scalar(
+        select(vehiculo_persona.c.vehiculo_id)
+        .where(vehiculo_persona.c.persona_id == persona_id)
+        .limit(1)
+    )
+    if vehiculo_id is not None:
+        raise HTTPException(
+            status_code=400,
+            detail="No se puede eliminar la persona porque tiene vehículos asociados"
+        )
+
+    await db.delete(db_persona)
+    await db.commit()
+    await persona_cache.ainvalidate(persona_id)
+    return {"message": "Persona eliminada exitosamente"}
+
+
+@router.get("/{persona_id}/vehiculos", response_model=PersonaConVehiculos, summary="Obtener vehículos de una persona")
+async def read_persona_vehiculos(
+    persona_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Obtener los vehículos de una persona específica, paginados (versión asíncrona)."""
+    if ROW_RESPONSES:
+        persona, next_cursor = await apersona_con_vehiculos(db, persona_id, cursor, skip, limit)
+        if persona is None:
+            raise HTTPException(status_code=404, detail="Persona no encontrada")
+        set_next_cursor(response, next_cursor)
+        return PERSONA_CON_VEHICULOS_JSON.render(persona, response)
+
+    db_persona = await db.get(PersonaModel, persona_id)
+    if db_persona is None:
+        raise HTTPException(status_code=404, detail="Persona no encontrada")
+
+    statement = paginate_statement(
+        vehiculos_statement(persona_id), VEHICULOS_ORDER, cursor=cursor, skip=skip, limit=limit
+    )
+    vehiculos, next_cursor = split_page((await db.scalars(statement)).all(), VEHICULOS_CURSOR, limit=limit)
+    set_committed_value(db_persona, "vehiculos", vehiculos)
+    set_next_cursor(response, next_cursor)
+    return db_persona
+
+
+@router.get("/{persona_id}/vehiculos/count", response_model=ConteoRelaciones, summary="Contar vehículos de una persona")
+async def count_persona_vehiculos(
+    persona_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Contar los vehículos de una persona sin cargarlos (versión asíncrona)."""
+    total = await db.scalar(count_statement(vehiculo_persona.c.persona_id, persona_id))
+    if not total and await db.get(PersonaModel, persona_id) is None:
+        raise HTTPException(status_code=404, detail="Persona no encontrada")
+    return ConteoRelaciones(total=total)
@@ -0,0 +1,237 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import List, Optional
+
+from ...database.database import get_async_db
+from ...models.models import Persona, Vehiculo as VehiculoModel, vehiculo_persona
+from ...schemas.schemas import (
+    Vehiculo,
+    VehiculoCreate,
+    VehiculoUpdate,
+    VehiculoConPropietarios,
+    AsignarPropietario,
+    ConteoRelaciones
+)
+from ...utils.fields import FieldSelection, json_response
+from ...utils.filters import Listing, vehiculo_listing
+from ...utils.loading import VEHICULO_FIELDS, VEHICULO_LOAD_OPTIONS
+from ...utils.marca_cache import marca_cache
+from ...utils.ownership import (
+    PROPIETARIOS_CURSOR,
+    PROPIETARIOS_ORDER,
+    add_ownership_statement,
+    count_statement,
+    propietarios_statement,
+)
+from ...utils.rows import VEHICULO_ROWS, use_rows
+from ...utils.resource_cache import vehiculo_cache
+from ...utils.pagination import paginate_statement, set_next_cursor, split_page
+from ...utils.totals import TotalCount, total_count
+
+# Versiones asíncronas de los handlers de app/routes/vehiculo.py; se combinan con ese router
+# mediante `merge_async_routes`, que conserva su orden y su documentación.
+router = APIRouter(
+    prefix="/api/vehiculos",
+    tags=["Vehículos"],
+    responses={404: {"description": "No encontrado"}},
+)
+
+async def _get_vehiculo(
+    db: AsyncSession,
+    vehiculo_id: int,
+    options=VEHICULO_LOAD_OPTIONS
+) -> Optional[VehiculoModel]:
+    """
+    Obtener un vehículo con su marca y propietarios ya cargados.
+
+    Con AsyncSession no hay carga perezosa, así que todo lo que serializa el
+    esquema de respuesta se carga en la misma consulta (`options`).
+    """
+    return await db.scalar(
+        select(VehiculoModel)
+        .options(*options)
+        .where(VehiculoModel.id == vehiculo_id)
+        .execution_options(populate_existing=True)
+    )
+
+
+@router.post("/", response_model=Vehiculo, summary="Crear un nuevo vehículo")
+async def create_vehiculo(
+    vehiculo: VehiculoCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Crear un nuevo vehículo (versión asíncrona)."""
+    if await marca_cache.aget(db, vehiculo.marca_id) is None:
+        raise HTTPException(
+            status_code=400,
+            detail="La marca especificada no existe"
+        )
+
+    db_vehiculo = VehiculoModel(
+        modelo=vehiculo.modelo,
+        marca_id=vehiculo.marca_id,
+        numero_puertas=vehiculo.numero_puertas,
+        color=vehiculo.color
+    )
+    db.add(db_vehiculo)
+    await db.commit()
+    # Descartar cualquier entrada previa con el mismo id (SQLite puede reutilizar ids)
+    await vehiculo_cache.ainvalidate(db_vehiculo.id)
+    return await _get_vehiculo(db, db_vehiculo.id)
+
+
+@router.get("/", response_model=List[Vehiculo], summary="Obtener todos los vehículos")
+async def read_vehiculos(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    listing: Listing = Depends(vehiculo_listing),
+    total: TotalCount = Depends(total_count),
+    selection: FieldSelection = Depends(VEHICULO_FIELDS),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Obtener una lista de todos los vehículos con su marca (versión asíncrona)."""
+    if use_rows(selection):
+        vehiculos, next_cursor = await VEHICULO_ROWS.apage(db, listing, cursor, skip, limit)
+        render = VEHICULO_ROWS.render
+    else:
+        statement = paginate_statement(
+            listing.apply(select(VehiculoModel).options(*selection.options)),
+            listing.columns, listing.sort, cursor=cursor, skip=skip, limit=limit, descending=listing.descending
+        )
+        vehiculos, next_cursor = split_page((await db.scalars(statement)).all(), listing.columns, listing.sort, limit)
+        render = selection.render
+    set_next_cursor(response, next_cursor)
+    await total.aapply(db, listing, response)
+    return render(vehiculos, response)
+
+
+@router.get("/{vehiculo_id}", response_model=Vehiculo, summary="Obtener un vehículo por ID")
+async def read_vehiculo(
+    vehiculo_id: int,
+    response: Response,
+    selection: FieldSelection = Depends(VEHICULO_FIELDS),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Obtener un vehículo específico por su ID (versión asíncrona)."""
+    if not selection.partial:
+        version = await vehiculo_cache.aversion(db)
+        cached = await vehiculo_cache.aget_json(vehiculo_id, version)
+        if cached is not None:
+            return json_response(cached, response)
+
+    db_vehiculo = await _get_vehiculo(db, vehiculo_id, selection.options)
+    if db_vehiculo is None:
+        raise HTTPException(status_code=404, detail="Vehículo no encontrado")
+    if selection.partial:
+        return selection.render(db_vehiculo, response)
+    return json_response(await vehiculo_cache.astore(db_vehiculo, version), response)
+
+
+@router.put("/{vehiculo_id}", response_model=Vehiculo, summary="Actualizar un vehículo")
+async def update_vehiculo(
+    vehiculo_id: int,
+    vehiculo_update: VehiculoUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Actualizar un vehículo existente (versión asíncrona)."""
+    db_vehiculo = await db.get(VehiculoModel, vehiculo_id)
+    if db_vehiculo is None:
+        raise HTTPException(status_code=404, detail="Vehículo no encontrado")
+
+    # Verificar si la nueva marca existe (solo si se está cambiando)
+    if vehiculo_update.marca_id is not None:
+        if await marca_cache.aget(db, vehiculo_update.marca_id) is None:
+            raise HTTPException(
+                status_code=400,
+                detail="La marca especificada no existe"
+            )
+
+    for field, value in vehiculo_update.model_dump(exclude_unset=True).items():
+        setattr(db_vehiculo, field, value)
+
+    await db.commit()
+    await vehiculo_cache.ainvalidate(vehiculo_id)
+    return await _get_vehiculo(db, vehiculo_id)
+
+
+@router.delete("/{vehiculo_id}", summary="Eliminar un vehículo")
+async def delete_vehiculo(
+    vehiculo_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Eliminar un vehículo (versión asíncrona)."""
+    db_vehiculo = await db.get(VehiculoModel, vehiculo_id)
+    if db_vehiculo is None:
+        raise HTTPException(status_code=404, detail="Vehículo no encontrado")
+
+    await db.delete(db_vehiculo)
+    await db.commit()
+    await vehiculo_cache.ainvalidate(vehiculo_id)
+    return {"message": "Vehículo eliminado exitosamente"}
+
+
+@router.get("/{vehiculo_id}/propietarios", response_model=VehiculoConPropietarios, summary="Obtener propietarios de un vehículo")
+async def read_vehiculo_propietarios(
+    vehiculo_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Obtener los propietarios de un vehículo específico, paginados (versión asíncrona)."""
+    db_vehiculo = await _get_vehiculo(db, vehiculo_id, (joinedload(VehiculoModel.marca),))
+    if db_vehiculo is None:
+        raise HTTPException(status_code=404, detail="Vehículo no encontrado")
+
+    statement = paginate_statement(
+        propietarios_statement(vehiculo_id), PROPIETARIOS_ORDER, cursor=cursor, skip=skip, limit=limit
+    )
+    propietarios, next_cursor = split_page((await db.scalars(statement)).all(), PROPIETARIOS_CURSOR, limit=limit)
+    set_committed_value(db_vehiculo, "propietarios", propietarios)
+    set_next_cursor(response, next_cursor)
+    return db_vehiculo
+
+
+@router.get("/{vehiculo_id}/propietarios/count", response_model=ConteoRelaciones, summary="Contar propietarios de un vehículo")
+async def count_vehiculo_propietarios(
+    vehiculo_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Contar los propietarios de un vehículo sin cargarlos (versión asíncrona)."""
+    total = await db.scalar(count_statement(vehiculo_persona.c.vehiculo_id, vehiculo_id))
+    if not total and await db.get(VehiculoModel, vehiculo_id) is None:
+        raise HTTPException(status_code=404, detail="Vehículo no encontrado")
+    return ConteoRelaciones(total=total)
+
+
+@router.post("/{vehiculo_id}/propietarios", summary="Asignar propietario a un vehículo")
+async def assign_propietario_to_vehiculo(
+    vehiculo_id: int,
+    asignacion: AsignarPropietario,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Asignar un propietario a un vehículo (versión asíncrona)."""
+    if await db.get(VehiculoModel, vehiculo_id) is None:
+        raise HTTPException(status_code=404, detail="Vehículo no encontrado")
+
+    if await db.get(Persona, asignacion.persona_id) is None:
+        raise HTTPException(status_code=404, detail="Persona no encontrada")
+
+    # Crear la relación en una sola sentencia: si ya existe (también si la creó una
+    # petición concurrente entre tanto) no se inserta nada y se responde 400
+    result = await db.execute(add_ownership_statement(db, vehiculo_id, asignacion.persona_id))
+    if result.rowcount == 0:
+        raise HTTPException(
+            status_code=400,
+            detail="Esta persona ya es propietaria de este vehículo"
+        )
+    await db.commit()
+    await vehiculo_cache.ainvalidate(vehiculo_id)
+
+    return {"message": "Propietario asignado exitosamente al vehículo"}
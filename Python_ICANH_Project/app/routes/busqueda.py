@@ -0,0 +1,55 @@
+from enum import Enum
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from ..database.database import get_db
+from ..database.search import query_terms, search
+from ..schemas.schemas import ResultadoBusqueda
+from ..utils.http_cache import HttpCache
+
+
+class TipoBusqueda(str, Enum):
+    persona = "persona"
+    vehiculo = "vehiculo"
+    marca = "marca"
+
+
+# Tablas de las que dependen los resultados de búsqueda (ETag / If-None-Match)
+http_cache = HttpCache(
+    tables=("persona", "vehiculo", "marca_vehiculo"),
+    env_var="CACHE_CONTROL_BUSQUEDA",
+)
+
+router = APIRouter(
+    prefix="/api/search",
+    tags=["Búsqueda"],
+    dependencies=[Depends(http_cache)],
+)
+
+
+@router.get("", response_model=List[ResultadoBusqueda], summary="Buscar personas, vehículos y marcas")
+def search_records(
+    q: str = Query(..., min_length=1, max_length=200, description="Texto a buscar"),
+    tipo: Optional[List[TipoBusqueda]] = Query(None, description="Recursos en los que buscar (todos si se omite)"),
+    limit: int = Query(20, ge=1, le=100, description="Número máximo de resultados"),
+    db: Session = Depends(get_db)
+):
+    """
+    Buscar texto en personas (`nombre`, `cedula`), vehículos (`modelo`, `color`) y
+    marcas (`nombre_marca`).
+
+    Cada palabra de **q** se busca como prefijo, sin distinguir mayúsculas ni tildes,
+    y todas deben aparecer en el registro. Los resultados de todos los recursos se
+    devuelven juntos, ordenados de mayor a menor **puntaje**.
+
+    El **puntaje** es relativo a cada recurso: la relevancia del motor (`bm25` en SQLite,
+    `ts_rank` en PostgreSQL) dividida por la del mejor resultado del mismo recurso, de
+    0 a 1. Los puntajes crudos de tablas distintas no son comparables, así que el mejor
+    resultado de cada recurso tiene puntaje 1.
+    """
+    terms = query_terms(q)
+    if not terms:
+        raise HTTPException(status_code=400, detail="La búsqueda no contiene palabras")
+    tipos = [t.value for t in tipo] if tipo else [t.value for t in TipoBusqueda]
+    return search(db, terms, tipos, limit)
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, Path
+from sqlalchemy.orm import Session
+from typing import List
+
+from ..database.database import get_db
+from ..database.stats import Dimension, vehicle_stats
+from ..schemas.schemas import ConteoGrupo
+from ..utils.http_cache import HttpCache
+
+# Tablas de las que dependen las estadísticas (ETag / If-None-Match)
+http_cache = HttpCache(
+    tables=("vehiculo", "marca_vehiculo"),
+    env_var="CACHE_CONTROL_ESTADISTICAS",
+)
+
+router = APIRouter(
+    prefix="/api/stats",
+    tags=["Estadísticas"],
+    dependencies=[Depends(http_cache)],
+)
+
+
+@router.get("/vehiculos/{dimension}", response_model=List[ConteoGrupo], summary="Contar vehículos por grupo")
+def count_vehiculos(
+    dimension: Dimension = Path(..., description="Agrupar por marca, pais, color o puertas"),
+    db: Session = Depends(get_db)
+):
+    """
+    Número de vehículos por **dimension**, de mayor a menor:
+
+    - **marca**: nombre de la marca
+    - **pais**: país de origen de la marca
+    - **color**: color del vehículo
+    - **puertas**: número de puertas
+
+    Los conteos se calculan en la base de datos con `GROUP BY`; con el resumen
+    `resumen_vehiculo` activo el costo depende del número de grupos y no del de vehículos.
+    """
+    return vehicle_stats(db, dimension)
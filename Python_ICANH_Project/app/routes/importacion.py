@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from ..database.database import get_db
+from ..schemas.schemas import ResultadoImportacion
+from ..utils.export import ExportFormat
+from ..utils.importer import TipoRegistro, detect_format, import_records
+
+router = APIRouter(
+    prefix="/api/import",
+    tags=["Importación"],
+)
+
+
+@router.post("", response_model=ResultadoImportacion, summary="Importar registros desde un archivo CSV o NDJSON")
+def import_file(
+    archivo: UploadFile = File(..., description="Archivo CSV o NDJSON con los registros"),
+    import_format: Optional[ExportFormat] = Query(None, alias="format", description="Se deduce de la extensión si se omite"),
+    tipo: Optional[TipoRegistro] = Query(None, description="Tipo de las filas que no traen la columna `tipo`"),
+    batch_size: int = Query(1000, ge=1, le=5000, description="Filas por lote/transacción"),
+    db: Session = Depends(get_db)
+):
+    """
+    Importar marcas, personas, vehículos y relaciones de propiedad desde un archivo.
+
+    Cada fila indica su tipo en la columna/campo `tipo` (`marca`, `persona`, `vehiculo`
+    o `propietario`) o toma el del parámetro **tipo**. El archivo se lee línea a línea
+    y se escribe en lotes de **batch_size** filas, cada uno en su propia transacción:
+
+    - **marca**: `nombre_marca`, `pais` (upsert por `nombre_marca`)
+    - **persona**: `nombre`, `cedula` (upsert por `cedula`)
+    - **vehiculo**: `modelo`, `numero_puertas`, `color` y `marca_id` o `nombre_marca`;
+      si trae `id` se actualiza el vehículo existente
+    - **propietario**: `vehiculo_id` y `persona_id` o `cedula` (las relaciones existentes se ignoran)
+
+    El archivo debe estar en UTF-8; las líneas con otra codificación o que no se pueden
+    interpretar se rechazan sin detener la importación.
+
+    La respuesta resume las filas procesadas, importadas por tipo, lotes escritos y
+    el detalle de las filas rechazadas.
+    """
+    file_format = import_format or detect_format(archivo.filename)
+    if file_format is None:
+        raise HTTPException(
+            status_code=400,
+            detail="No se pudo determinar el formato del archivo; use ?format=csv o ?format=ndjson"
+        )
+    return import_records(db, archivo.file, file_format, tipo, batch_size)
@@ -1,19 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from ..database.database import get_db
 from ..models.models import MarcaVehiculo as MarcaVehiculoModel
 from ..schemas.schemas import (
     MarcaVehiculo,
     MarcaVehiculoCreate,
-    MarcaVehiculoUpdate
+    MarcaVehiculoUpdate,
+    ResultadoCargaMasiva
+)
+from ..utils.bulk import bulk_insert, check_bulk_size, find_unique_conflicts
+from ..utils.fields import FieldSelection, json_response
+from ..utils.filters import Listing, marca_listing
+from ..utils.http_cache import HttpCache, no_http_cache
+from ..utils.loading import MARCA_FIELDS
+from ..utils.marca_cache import marca_cache
+from ..utils.rows import MARCA_ROWS, use_rows
+from ..utils.resource_cache import vehiculo_cache, vehiculos_de_marca
+from ..utils.export import EXPORT_RESPONSES, ExportFormat, export_response
+from ..utils.pagination import paginate, set_next_cursor
+from ..utils.totals import TotalCount, total_count
+from ..utils.sql import insert_returning, update_returning
+
+# Tablas de las que dependen las respuestas GET del router (ETag / If-None-Match)
+http_cache = HttpCache(
+    tables=("marca_vehiculo", "vehiculo"),
+    env_var="CACHE_CONTROL_MARCAS",
 )
 
 router = APIRouter(
     prefix="/api/marcas-vehiculo",
     tags=["Marcas de Vehículo"],
     responses={404: {"description": "No encontrado"}},
+    dependencies=[Depends(http_cache)],
 )
 
 
@@ -28,30 +50,63 @@ def create_marca_vehiculo(
     - **nombre_marca**: Nombre único de la marca
     - **pais**: País de origen de la marca
     """
-    # Verificar si ya existe una marca con el mismo nombre
-    db_marca = db.query(MarcaVehiculoModel).filter(
-        MarcaVehiculoModel.nombre_marca == marca.nombre_marca
-    ).first()
-    if db_marca:
+    # La restricción única de `nombre_marca` rechaza los duplicados, también entre peticiones concurrentes
+    try:
+        db_marca = db.execute(insert_returning(MarcaVehiculoModel, marca.model_dump())).one()
+        db.commit()
+    except IntegrityError:
+        db.rollback()
         raise HTTPException(
             status_code=400,
             detail="Ya existe una marca con ese nombre"
         )
 
-    db_marca = MarcaVehiculoModel(
-        nombre_marca=marca.nombre_marca,
-        pais=marca.pais
-    )
-    db.add(db_marca)
-    db.commit()
-    db.refresh(db_marca)
+    # Descartar cualquier entrada previa con el mismo id (SQLite puede reutilizar ids)
+    marca_cache.invalidate(db_marca.id, db_marca.nombre_marca)
     return db_marca
 
 
+@router.post(
+    "/bulk",
+    response_model=ResultadoCargaMasiva,
+    responses={400: {"model": ResultadoCargaMasiva, "description": "Lote rechazado (modo atómico)"}},
+    summary="Crear marcas de vehículo en lote"
+)
+def create_marcas_vehiculo_bulk(
+    marcas: List[MarcaVehiculoCreate],
+    atomic: bool = True,
+    db: Session = Depends(get_db)
+):
+    """
+    Crear muchas marcas de vehículo en una sola petición y una sola transacción.
+
+    - **marcas**: Arreglo de marcas a crear
+    - **atomic**: Si es `true` (por defecto) el lote se rechaza completo cuando algún
+      elemento es inválido; si es `false` se crean los válidos y se reportan los rechazados
+
+    La unicidad de `nombre_marca` se valida con una sola consulta por lote.
+    """
+    check_bulk_size(marcas)
+    errors = find_unique_conflicts(
+        db,
+        MarcaVehiculoModel.nombre_marca,
+        [marca.nombre_marca for marca in marcas],
+        existing_message="Ya existe una marca con ese nombre",
+        repeated_message="El nombre de la marca está repetido dentro del lote",
+    )
+    rows = [marca.model_dump() for marca in marcas]
+    return bulk_insert(db, MarcaVehiculoModel, rows, errors, atomic)
+
+
 @router.get("/", response_model=List[MarcaVehiculo], summary="Obtener todas las marcas de vehículo")
 def read_marcas_vehiculo(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    listing: Listing = Depends(marca_listing),
+    total: TotalCount = Depends(total_count),
+    selection: FieldSelection = Depends(MARCA_FIELDS),
     db: Session = Depends(get_db)
 ):
     """
@@ -59,27 +114,86 @@ def read_marcas_vehiculo(
 
     - **skip**: Número de registros a saltar (paginación)
     - **limit**: Número máximo de registros a devolver
+    - **cursor**: Cursor opaco del header `X-Next-Cursor` de la página anterior (ignora `skip`)
+    - **pais**: País de origen exacto
+    - **include_total**: Publicar el total en `X-Total-Count` (`total_mode`: auto, exact, estimate)
+    - **sort**: Orden (id, nombre_marca, pais); `-` delante para descendente
+    - **fields**: Columnas a devolver (id, nombre_marca, pais)
+    - **expand**: Relaciones a incluir (vehiculos)
     """
-    marcas = db.query(MarcaVehiculoModel).offset(skip).limit(limit).all()
-    return marcas
+    if use_rows(selection):
+        marcas, next_cursor = MARCA_ROWS.page(db, listing, cursor, skip, limit)
+        render = MARCA_ROWS.render
+    else:
+        query = listing.apply(db.query(MarcaVehiculoModel).options(*selection.options))
+        marcas, next_cursor = paginate(
+            query, listing.columns, listing.sort,
+            cursor=cursor, skip=skip, limit=limit, descending=listing.descending
+        )
+        render = selection.render
+    set_next_cursor(response, next_cursor)
+    total.apply(db, listing, response)
+    return render(marcas, response)
+
+
+@router.get("/export", response_class=StreamingResponse, responses=EXPORT_RESPONSES, summary="Exportar todas las marcas de vehículo")
+def export_marcas_vehiculo(
+    response: Response,
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    db: Session = Depends(get_db)
+):
+    """
+    Exportar la tabla completa de marcas de vehículo en streaming.
+
+    - **format**: `ndjson` (un objeto JSON por línea) o `csv`
+
+    Columnas: id, nombre_marca, pais. Las filas se leen con un cursor del servidor en bloques,
+    por lo que la memoria y el tiempo hasta el primer byte no dependen del tamaño de la tabla.
+    """
+    return export_response(db.get_bind(), MarcaVehiculoModel.__table__, export_format, response.headers)
+
+
+@router.get("/cache/stats", summary="Estadísticas de la caché de marcas")
+@no_http_cache
+def read_marca_cache_stats():
+    """
+    Obtener el tamaño y los contadores de aciertos/fallos de la caché de marcas.
+
+    Los contadores son del proceso que atiende la petición.
+    """
+    return marca_cache.stats()
 
 
 @router.get("/{marca_id}", response_model=MarcaVehiculo, summary="Obtener una marca de vehículo por ID")
 def read_marca_vehiculo(
     marca_id: int,
+    response: Response,
+    selection: FieldSelection = Depends(MARCA_FIELDS),
     db: Session = Depends(get_db)
 ):
     """
     Obtener una marca de vehículo específica por su ID.
 
     - **marca_id**: ID de la marca a obtener
+    - **fields**: Columnas a devolver (id, nombre_marca, pais)
+    - **expand**: Relaciones a incluir (vehiculos)
+
+    La respuesta completa se sirve desde la caché de marcas cuando está disponible.
     """
-    db_marca = db.query(MarcaVehiculoModel).filter(
+    if not selection.partial:
+        version = marca_cache.version(db)
+        cached = marca_cache.get_json(marca_id, version)
+        if cached is not None:
+            return json_response(cached, response)
+
+    db_marca = db.query(MarcaVehiculoModel).options(*selection.options).filter(
         MarcaVehiculoModel.id == marca_id
     ).first()
     if db_marca is None:
         raise HTTPException(status_code=404, detail="Marca no encontrada")
-    return db_marca
+    if selection.partial:
+        return selection.render(db_marca, response)
+    return json_response(marca_cache.store(db_marca, version), response)
 
 
 @router.put("/{marca_id}", response_model=MarcaVehiculo, summary="Actualizar una marca de vehículo")
@@ -94,29 +208,29 @@ def update_marca_vehiculo(
     - **marca_id**: ID de la marca a actualizar
     - **marca_update**: Datos a actualizar
     """
-    db_marca = db.query(MarcaVehiculoModel).filter(
-        MarcaVehiculoModel.id == marca_id
-    ).first()
-    if db_marca is None:
+    # El nombre anterior (para invalidar su entrada) sale de la caché, normalmente sin consultar
+    marca_anterior = marca_cache.get(db, marca_id)
+    if marca_anterior is None:
         raise HTTPException(status_code=404, detail="Marca no encontrada")
+    nombre_anterior = marca_anterior.nombre_marca
 
-    # Verificar si el nuevo nombre ya existe (solo si se está cambiando)
-    if marca_update.nombre_marca and marca_update.nombre_marca != db_marca.nombre_marca:
-        existing_marca = db.query(MarcaVehiculoModel).filter(
-            MarcaVehiculoModel.nombre_marca == marca_update.nombre_marca
-        ).first()
-        if existing_marca:
-            raise HTTPException(
-                status_code=400,
-                detail="Ya existe una marca con ese nombre"
-            )
-
-    # Actualizar campos proporcionados
-    for field, value in marca_update.dict(exclude_unset=True).items():
-        setattr(db_marca, field, value)
+    # Actualizar campos proporcionados; un nombre repetido lo rechaza la restricción única
+    changes = marca_update.model_dump(exclude_unset=True, exclude_none=True)
+    try:
+        db_marca = db.execute(update_returning(MarcaVehiculoModel, marca_id, changes)).first()
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Ya existe una marca con ese nombre"
+        )
+    if db_marca is None:
+        raise HTTPException(status_code=404, detail="Marca no encontrada")
 
-    db.commit()
-    db.refresh(db_marca)
+    marca_cache.invalidate(marca_id, nombre_anterior, db_marca.nombre_marca)
+    # Las respuestas en caché de sus vehículos incluyen la marca
+    vehiculo_cache.invalidate(*db.scalars(vehiculos_de_marca(marca_id)))
     return db_marca
 
 
@@ -145,4 +259,5 @@ def delete_marca_vehiculo(
 
     db.delete(db_marca)
     db.commit()
+    marca_cache.invalidate(marca_id, db_marca.nombre_marca)
     return {"message": "Marca eliminada exitosamente"}
@@ -1,20 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import List, Optional
 
 from ..database.database import get_db
-from ..models.models import Persona as PersonaModel, Vehiculo
+from ..models.models import Persona as PersonaModel, Vehiculo as VehiculoModel, vehiculo_persona
 from ..schemas.schemas import (
     Persona,
     PersonaCreate,
     PersonaUpdate,
-    PersonaConVehiculos
+    PersonaConVehiculos,
+    AsignarVehiculos,
+    ConteoRelaciones,
+    ResultadoAsignacionMasiva,
+    ResultadoCargaMasiva
+)
+from ..utils.bulk import bulk_insert, check_bulk_size, find_missing_references, find_unique_conflicts
+from ..utils.fields import FieldSelection, json_response
+from ..utils.filters import Listing, persona_listing
+from ..utils.http_cache import HttpCache
+from ..utils.loading import PERSONA_FIELDS
+from ..utils.ownership import (
+    VEHICULOS_CURSOR,
+    VEHICULOS_ORDER,
+    add_ownerships,
+    count_statement,
+    remove_ownerships,
+    vehiculos_statement,
+)
+from ..utils.rows import (
+    PERSONA_CON_VEHICULOS_JSON,
+    PERSONA_ROWS,
+    ROW_RESPONSES,
+    persona_con_vehiculos,
+    use_rows,
+)
+from ..utils.resource_cache import persona_cache, vehiculo_cache, vehiculos_de_persona
+from ..utils.export import EXPORT_RESPONSES, ExportFormat, export_response
+from ..utils.pagination import paginate, paginate_statement, set_next_cursor, split_page
+from ..utils.totals import TotalCount, total_count
+from ..utils.sql import insert_returning, update_returning
+
+# Tablas de las que dependen las respuestas GET del router (ETag / If-None-Match)
+http_cache = HttpCache(
+    tables=("persona", "vehiculo", "vehiculo_persona", "marca_vehiculo"),
+    env_var="CACHE_CONTROL_PERSONAS",
 )
 
 router = APIRouter(
     prefix="/api/personas",
     tags=["Personas"],
     responses={404: {"description": "No encontrado"}},
+    dependencies=[Depends(http_cache)],
 )
 
 
@@ -29,30 +68,63 @@ def create_persona(
     - **nombre**: Nombre completo de la persona
     - **cedula**: Número de cédula único
     """
-    # Verificar si ya existe una persona con la misma cédula
-    db_persona = db.query(PersonaModel).filter(
-        PersonaModel.cedula == persona.cedula
-    ).first()
-    if db_persona:
+    # La restricción única de `cedula` rechaza los duplicados, también entre peticiones concurrentes
+    try:
+        db_persona = db.execute(insert_returning(PersonaModel, persona.model_dump())).one()
+        db.commit()
+    except IntegrityError:
+        db.rollback()
         raise HTTPException(
             status_code=400,
             detail="Ya existe una persona con esa cédula"
         )
 
-    db_persona = PersonaModel(
-        nombre=persona.nombre,
-        cedula=persona.cedula
-    )
-    db.add(db_persona)
-    db.commit()
-    db.refresh(db_persona)
+    # Descartar cualquier entrada previa con el mismo id (SQLite puede reutilizar ids)
+    persona_cache.invalidate(db_persona.id)
     return db_persona
 
 
+@router.post(
+    "/bulk",
+    response_model=ResultadoCargaMasiva,
+    responses={400: {"model": ResultadoCargaMasiva, "description": "Lote rechazado (modo atómico)"}},
+    summary="Crear personas en lote"
+)
+def create_personas_bulk(
+    personas: List[PersonaCreate],
+    atomic: bool = True,
+    db: Session = Depends(get_db)
+):
+    """
+    Crear muchas personas en una sola petición y una sola transacción.
+
+    - **personas**: Arreglo de personas a crear
+    - **atomic**: Si es `true` (por defecto) el lote se rechaza completo cuando algún
+      elemento es inválido; si es `false` se crean los válidos y se reportan los rechazados
+
+    La unicidad de `cedula` se valida con una sola consulta por lote.
+    """
+    check_bulk_size(personas)
+    errors = find_unique_conflicts(
+        db,
+        PersonaModel.cedula,
+        [persona.cedula for persona in personas],
+        existing_message="Ya existe una persona con esa cédula",
+        repeated_message="La cédula está repetida dentro del lote",
+    )
+    rows = [persona.model_dump() for persona in personas]
+    return bulk_insert(db, PersonaModel, rows, errors, atomic)
+
+
 @router.get("/", response_model=List[Persona], summary="Obtener todas las personas")
 def read_personas(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    listing: Listing = Depends(persona_listing),
+    total: TotalCount = Depends(total_count),
+    selection: FieldSelection = Depends(PERSONA_FIELDS),
     db: Session = Depends(get_db)
 ):
     """
@@ -60,27 +132,75 @@ def read_personas(
 
     - **skip**: Número de registros a saltar (paginación)
     - **limit**: Número máximo de registros a devolver
+    - **cursor**: Cursor opaco del header `X-Next-Cursor` de la página anterior (ignora `skip`)
+    - **nombre**, **cedula**: Prefijos del nombre y de la cédula
+    - **include_total**: Publicar el total en `X-Total-Count` (`total_mode`: auto, exact, estimate)
+    - **sort**: Orden (id, nombre, cedula); `-` delante para descendente
+    - **fields**: Columnas a devolver (id, nombre, cedula)
+    - **expand**: Relaciones a incluir (vehiculos)
+    """
+    if use_rows(selection):
+        personas, next_cursor = PERSONA_ROWS.page(db, listing, cursor, skip, limit)
+        render = PERSONA_ROWS.render
+    else:
+        query = listing.apply(db.query(PersonaModel).options(*selection.options))
+        personas, next_cursor = paginate(
+            query, listing.columns, listing.sort,
+            cursor=cursor, skip=skip, limit=limit, descending=listing.descending
+        )
+        render = selection.render
+    set_next_cursor(response, next_cursor)
+    total.apply(db, listing, response)
+    return render(personas, response)
+
+
+@router.get("/export", response_class=StreamingResponse, responses=EXPORT_RESPONSES, summary="Exportar todas las personas")
+def export_personas(
+    response: Response,
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    db: Session = Depends(get_db)
+):
+    """
+    Exportar la tabla completa de personas en streaming.
+
+    - **format**: `ndjson` (un objeto JSON por línea) o `csv`
+
+    Columnas: id, nombre, cedula. Las filas se leen con un cursor del servidor en bloques,
+    por lo que la memoria y el tiempo hasta el primer byte no dependen del tamaño de la tabla.
     """
-    personas = db.query(PersonaModel).offset(skip).limit(limit).all()
-    return personas
+    return export_response(db.get_bind(), PersonaModel.__table__, export_format, response.headers)
 
 
 @router.get("/{persona_id}", response_model=Persona, summary="Obtener una persona por ID")
 def read_persona(
     persona_id: int,
+    response: Response,
+    selection: FieldSelection = Depends(PERSONA_FIELDS),
     db: Session = Depends(get_db)
 ):
     """
     Obtener una persona específica por su ID.
 
     - **persona_id**: ID de la persona a obtener
+    - **fields**: Columnas a devolver (id, nombre, cedula)
+    - **expand**: Relaciones a incluir (vehiculos)
+
+    La respuesta completa se sirve desde la caché de personas cuando está disponible.
     """
-    db_persona = db.query(PersonaModel).filter(
+    if not selection.partial:
+        version = persona_cache.version(db)
+        cached = persona_cache.get_json(persona_id, version)
+        if cached is not None:
+            return json_response(cached, response)
+
+    db_persona = db.query(PersonaModel).options(*selection.options).filter(
         PersonaModel.id == persona_id
     ).first()
     if db_persona is None:
         raise HTTPException(status_code=404, detail="Persona no encontrada")
-    return db_persona
+    if selection.partial:
+        return selection.render(db_persona, response)
+    return json_response(persona_cache.store(db_persona, version), response)
 
 
 @router.put("/{persona_id}", response_model=Persona, summary="Actualizar una persona")
@@ -95,29 +215,23 @@ def update_persona(
     - **persona_id**: ID de la persona a actualizar
     - **persona_update**: Datos a actualizar
     """
-    db_persona = db.query(PersonaModel).filter(
-        PersonaModel.id == persona_id
-    ).first()
+    # Actualizar campos proporcionados; una cédula repetida la rechaza la restricción única
+    changes = persona_update.model_dump(exclude_unset=True, exclude_none=True)
+    try:
+        db_persona = db.execute(update_returning(PersonaModel, persona_id, changes)).first()
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Ya existe una persona con esa cédula"
+        )
     if db_persona is None:
         raise HTTPException(status_code=404, detail="Persona no encontrada")
 
-    # Verificar si la nueva cédula ya existe (solo si se está cambiando)
-    if persona_update.cedula and persona_update.cedula != db_persona.cedula:
-        existing_persona = db.query(PersonaModel).filter(
-            PersonaModel.cedula == persona_update.cedula
-        ).first()
-        if existing_persona:
-            raise HTTPException(
-                status_code=400,
-                detail="Ya existe una persona con esa cédula"
-            )
-
-    # Actualizar campos proporcionados
-    for field, value in persona_update.dict(exclude_unset=True).items():
-        setattr(db_persona, field, value)
-
-    db.commit()
-    db.refresh(db_persona)
+    persona_cache.invalidate(persona_id)
+    # Las respuestas en caché de sus vehículos la incluyen como propietaria
+    vehiculo_cache.invalidate(*db.scalars(vehiculos_de_persona(persona_id)))
     return db_persona
 
 
@@ -146,22 +260,122 @@ def delete_persona(
 
     db.delete(db_persona)
     db.commit()
+    persona_cache.invalidate(persona_id)
     return {"message": "Persona eliminada exitosamente"}
 
 
 @router.get("/{persona_id}/vehiculos", response_model=PersonaConVehiculos, summary="Obtener vehículos de una persona")
 def read_persona_vehiculos(
     persona_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """
-    Obtener todos los vehículos de una persona específica.
+    Obtener los vehículos de una persona específica, paginados.
 
     - **persona_id**: ID de la persona
+    - **limit**: Máximo de vehículos por página
+    - **cursor**: Cursor devuelto en el header `X-Next-Cursor` de la página anterior
+    - **skip**: Desplazamiento clásico (se ignora si se envía `cursor`)
+
+    Los vehículos se leen de `vehiculo_persona` en orden de `vehiculo_id`, así que cada
+    página cuesta lo mismo sin importar cuántos vehículos tenga la persona.
     """
-    db_persona = db.query(PersonaModel).options(
-        joinedload(PersonaModel.vehiculos).joinedload(Vehiculo.marca)
-    ).filter(PersonaModel.id == persona_id).first()
+    if ROW_RESPONSES:
+        persona, next_cursor = persona_con_vehiculos(db, persona_id, cursor, skip, limit)
+        if persona is None:
+            raise HTTPException(status_code=404, detail="Persona no encontrada")
+        set_next_cursor(response, next_cursor)
+        return PERSONA_CON_VEHICULOS_JSON.render(persona, response)
+
+    db_persona = db.get(PersonaModel, persona_id)
     if db_persona is None:
         raise HTTPException(status_code=404, detail="Persona no encontrada")
+
+    statement = paginate_statement(
+        vehiculos_statement(persona_id), VEHICULOS_ORDER, cursor=cursor, skip=skip, limit=limit
+    )
+    vehiculos, next_cursor = split_page(db.scalars(statement).all(), VEHICULOS_CURSOR, limit=limit)
+    # Publicar la página como la colección ya cargada (no se marca como modificada)
+    set_committed_value(db_persona, "vehiculos", vehiculos)
+    set_next_cursor(response, next_cursor)
     return db_persona
+
+
+@router.get("/{persona_id}/vehiculos/count", response_model=ConteoRelaciones, summary="Contar vehículos de una persona")
+def count_persona_vehiculos(
+    persona_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Contar los vehículos de una persona sin cargarlos.
+
+    - **persona_id**: ID de la persona
+    """
+    total = db.scalar(count_statement(vehiculo_persona.c.persona_id, persona_id))
+    # La existencia de la persona solo se consulta cuando el conteo no la demuestra
+    if not total and db.get(PersonaModel, persona_id) is None:
+        raise HTTPException(status_code=404, detail="Persona no encontrada")
+    return ConteoRelaciones(total=total)
+
+
+def _get_persona_or_404(db: Session, persona_id: int) -> PersonaModel:
+    """Obtener la persona `persona_id` o responder 404"""
+    db_persona = db.get(PersonaModel, persona_id)
+    if db_persona is None:
+        raise HTTPException(status_code=404, detail="Persona no encontrada")
+    return db_persona
+
+
+@router.post("/{persona_id}/vehiculos/bulk", response_model=ResultadoAsignacionMasiva, summary="Asignar vehículos a una persona en lote")
+def assign_vehiculos_bulk(
+    persona_id: int,
+    asignacion: AsignarVehiculos,
+    db: Session = Depends(get_db)
+):
+    """
+    Registrar a una persona como propietaria de varios vehículos en una sola operación.
+
+    - **persona_id**: ID de la persona
+    - **vehiculo_ids**: IDs de los vehículos; los que ya le pertenecen se ignoran
+
+    La existencia de los vehículos se valida con una sola consulta y las relaciones se
+    insertan con un único `INSERT ... ON CONFLICT DO NOTHING`. Si algún vehículo no
+    existe no se asigna ninguno.
+    """
+    vehiculo_ids = list(dict.fromkeys(asignacion.vehiculo_ids))
+    check_bulk_size(vehiculo_ids)
+    _get_persona_or_404(db, persona_id)
+
+    missing = find_missing_references(db, VehiculoModel.id, vehiculo_ids, message="")
+    if missing:
+        ids = ", ".join(str(vehiculo_ids[index]) for index in missing)
+        raise HTTPException(status_code=404, detail=f"Vehículos no encontrados: {ids}")
+
+    result = add_ownerships(db, [(vehiculo_id, persona_id) for vehiculo_id in vehiculo_ids])
+    vehiculo_cache.invalidate(*vehiculo_ids)
+    return result
+
+
+@router.delete("/{persona_id}/vehiculos/bulk", response_model=ResultadoAsignacionMasiva, summary="Retirar vehículos de una persona en lote")
+def remove_vehiculos_bulk(
+    persona_id: int,
+    asignacion: AsignarVehiculos,
+    db: Session = Depends(get_db)
+):
+    """
+    Dejar de registrar a una persona como propietaria de varios vehículos con un único `DELETE`.
+
+    - **persona_id**: ID de la persona
+    - **vehiculo_ids**: IDs de los vehículos; los que no le pertenecen se ignoran
+    """
+    vehiculo_ids = list(dict.fromkeys(asignacion.vehiculo_ids))
+    check_bulk_size(vehiculo_ids)
+    _get_persona_or_404(db, persona_id)
+
+    result = remove_ownerships(db, [(vehiculo_id, persona_id) for vehiculo_id in vehiculo_ids])
+    vehiculo_cache.invalidate(*vehiculo_ids)
+    return result
@@ -1,21 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
-from typing import List
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import List, Optional
 
 from ..database.database import get_db
-from ..models.models import Vehiculo as VehiculoModel, MarcaVehiculo
+from ..models.models import Vehiculo as VehiculoModel, MarcaVehiculo, Persona, vehiculo_persona
 from ..schemas.schemas import (
     Vehiculo,
     VehiculoCreate,
     VehiculoUpdate,
     VehiculoConPropietarios,
-    AsignarPropietario
+    AsignarPropietario,
+    AsignarPropietarios,
+    ConteoRelaciones,
+    ResultadoAsignacionMasiva,
+    ResultadoCargaMasiva
+)
+from ..utils.bulk import bulk_insert, check_bulk_size, find_missing_references
+from ..utils.fields import FieldSelection, json_response
+from ..utils.filters import Listing, vehiculo_listing
+from ..utils.http_cache import HttpCache
+from ..utils.loading import VEHICULO_FIELDS
+from ..utils.marca_cache import marca_cache
+from ..utils.ownership import (
+    PROPIETARIOS_CURSOR,
+    PROPIETARIOS_ORDER,
+    add_ownership_statement,
+    add_ownerships,
+    count_statement,
+    propietarios_statement,
+    remove_ownerships,
+)
+from ..utils.rows import VEHICULO_ROWS, use_rows
+from ..utils.resource_cache import vehiculo_cache
+from ..utils.export import EXPORT_RESPONSES, ExportFormat, export_response
+from ..utils.pagination import paginate, paginate_statement, set_next_cursor, split_page
+from ..utils.totals import TotalCount, total_count
+
+# Tablas de las que dependen las respuestas GET del router (ETag / If-None-Match)
+http_cache = HttpCache(
+    tables=("vehiculo", "marca_vehiculo", "vehiculo_persona", "persona"),
+    env_var="CACHE_CONTROL_VEHICULOS",
 )
 
 router = APIRouter(
     prefix="/api/vehiculos",
     tags=["Vehículos"],
     responses={404: {"description": "No encontrado"}},
+    dependencies=[Depends(http_cache)],
 )
 
 
@@ -33,10 +66,7 @@ def create_vehiculo(
     - **color**: Color del vehículo
     """
     # Verificar si la marca existe
-    db_marca = db.query(MarcaVehiculo).filter(
-        MarcaVehiculo.id == vehiculo.marca_id
-    ).first()
-    if not db_marca:
+    if marca_cache.get(db, vehiculo.marca_id) is None:
         raise HTTPException(
             status_code=400,
             detail="La marca especificada no existe"
@@ -51,13 +81,51 @@ def create_vehiculo(
     db.add(db_vehiculo)
     db.commit()
     db.refresh(db_vehiculo)
+    # Descartar cualquier entrada previa con el mismo id (SQLite puede reutilizar ids)
+    vehiculo_cache.invalidate(db_vehiculo.id)
     return db_vehiculo
 
 
+@router.post(
+    "/bulk",
+    response_model=ResultadoCargaMasiva,
+    responses={400: {"model": ResultadoCargaMasiva, "description": "Lote rechazado (modo atómico)"}},
+    summary="Crear vehículos en lote"
+)
+def create_vehiculos_bulk(
+    vehiculos: List[VehiculoCreate],
+    atomic: bool = True,
+    db: Session = Depends(get_db)
+):
+    """
+    Crear muchos vehículos en una sola petición y una sola transacción.
+
+    - **vehiculos**: Arreglo de vehículos a crear
+    - **atomic**: Si es `true` (por defecto) el lote se rechaza completo cuando algún
+      elemento es inválido; si es `false` se crean los válidos y se reportan los rechazados
+
+    La existencia de las marcas (`marca_id`) se valida con una sola consulta por lote.
+    """
+    check_bulk_size(vehiculos)
+    errors = find_missing_references(
+        db,
+        MarcaVehiculo.id,
+        [vehiculo.marca_id for vehiculo in vehiculos],
+        message="La marca especificada no existe",
+    )
+    rows = [vehiculo.model_dump() for vehiculo in vehiculos]
+    return bulk_insert(db, VehiculoModel, rows, errors, atomic)
+
+
 @router.get("/", response_model=List[Vehiculo], summary="Obtener todos los vehículos")
 def read_vehiculos(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    listing: Listing = Depends(vehiculo_listing),
+    total: TotalCount = Depends(total_count),
+    selection: FieldSelection = Depends(VEHICULO_FIELDS),
     db: Session = Depends(get_db)
 ):
     """
@@ -65,29 +133,102 @@ def read_vehiculos(
 
     - **skip**: Número de registros a saltar (paginación)
     - **limit**: Número máximo de registros a devolver
+    - **cursor**: Cursor opaco del header `X-Next-Cursor` de la página anterior (ignora `skip`)
+    - **marca_id**, **color**: Filtros exactos
+    - **numero_puertas_min**/**numero_puertas_max**: Rango de número de puertas
+    - **modelo**: Prefijo del modelo
+    - **include_total**: Publicar el total en `X-Total-Count` (`total_mode`: auto, exact, estimate)
+    - **sort**: Orden (id, modelo, color, marca_id); `-` delante para descendente
+    - **fields**: Columnas a devolver (id, modelo, marca_id, numero_puertas, color)
+    - **expand**: Relaciones a incluir (marca, propietarios); si se envía `fields` o `expand`,
+      solo se incluyen las relaciones listadas
     """
-    vehiculos = db.query(VehiculoModel).options(
-        joinedload(VehiculoModel.marca)
-    ).offset(skip).limit(limit).all()
-    return vehiculos
+    if use_rows(selection):
+        vehiculos, next_cursor = VEHICULO_ROWS.page(db, listing, cursor, skip, limit)
+        render = VEHICULO_ROWS.render
+    else:
+        query = listing.apply(db.query(VehiculoModel).options(*selection.options))
+        vehiculos, next_cursor = paginate(
+            query, listing.columns, listing.sort,
+            cursor=cursor, skip=skip, limit=limit, descending=listing.descending
+        )
+        render = selection.render
+    set_next_cursor(response, next_cursor)
+    total.apply(db, listing, response)
+    return render(vehiculos, response)
+
+
+@router.get("/export", response_class=StreamingResponse, responses=EXPORT_RESPONSES, summary="Exportar todas las vehículos")
+def export_vehiculos(
+    response: Response,
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    db: Session = Depends(get_db)
+):
+    """
+    Exportar la tabla completa de vehículos en streaming.
+
+    - **format**: `ndjson` (un objeto JSON por línea) o `csv`
+
+    Columnas: id, modelo, marca_id, numero_puertas, color. Las filas se leen con un cursor del servidor en bloques,
+    por lo que la memoria y el tiempo hasta el primer byte no dependen del tamaño de la tabla.
+    """
+    return export_response(db.get_bind(), VehiculoModel.__table__, export_format, response.headers)
+
+
+@router.get(
+    "/propietarios/export",
+    response_class=StreamingResponse,
+    responses=EXPORT_RESPONSES,
+    summary="Exportar todas las relaciones vehículo-propietario",
+)
+def export_propietarios(
+    response: Response,
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    db: Session = Depends(get_db)
+):
+    """
+    Exportar la tabla completa de relaciones vehículo-propietario en streaming.
+
+    - **format**: `ndjson` (un objeto JSON por línea) o `csv`
+
+    Columnas: vehiculo_id, persona_id, ordenadas por vehículo y persona. El archivo se puede volver a
+    importar con `POST /api/import?tipo=propietario` (las relaciones existentes se ignoran).
+    """
+    return export_response(db.get_bind(), vehiculo_persona, export_format, response.headers)
 
 
 @router.get("/{vehiculo_id}", response_model=Vehiculo, summary="Obtener un vehículo por ID")
 def read_vehiculo(
     vehiculo_id: int,
+    response: Response,
+    selection: FieldSelection = Depends(VEHICULO_FIELDS),
     db: Session = Depends(get_db)
 ):
     """
     Obtener un vehículo específico por su ID con información de su marca.
 
     - **vehiculo_id**: ID del vehículo a obtener
+    - **fields**: Columnas a devolver (id, modelo, marca_id, numero_puertas, color)
+    - **expand**: Relaciones a incluir (marca, propietarios); si se envía `fields` o `expand`,
+      solo se incluyen las relaciones listadas
+
+    La respuesta completa se sirve desde la caché de vehículos cuando está disponible.
     """
+    if not selection.partial:
+        # Versión de las tablas antes de cargar el recurso (ver resource_cache)
+        version = vehiculo_cache.version(db)
+        cached = vehiculo_cache.get_json(vehiculo_id, version)
+        if cached is not None:
+            return json_response(cached, response)
+
     db_vehiculo = db.query(VehiculoModel).options(
-        joinedload(VehiculoModel.marca)
+        *selection.options
     ).filter(VehiculoModel.id == vehiculo_id).first()
     if db_vehiculo is None:
         raise HTTPException(status_code=404, detail="Vehículo no encontrado")
-    return db_vehiculo
+    if selection.partial:
+        return selection.render(db_vehiculo, response)
+    return json_response(vehiculo_cache.store(db_vehiculo, version), response)
 
 
 @router.put("/{vehiculo_id}", response_model=Vehiculo, summary="Actualizar un vehículo")
@@ -110,10 +251,7 @@ def update_vehiculo(
 
     # Verificar si la nueva marca existe (solo si se está cambiando)
     if vehiculo_update.marca_id is not None:
-        db_marca = db.query(MarcaVehiculo).filter(
-            MarcaVehiculo.id == vehiculo_update.marca_id
-        ).first()
-        if not db_marca:
+        if marca_cache.get(db, vehiculo_update.marca_id) is None:
             raise HTTPException(
                 status_code=400,
                 detail="La marca especificada no existe"
@@ -125,6 +263,7 @@ def update_vehiculo(
 
     db.commit()
     db.refresh(db_vehiculo)
+    vehiculo_cache.invalidate(vehiculo_id)
     return db_vehiculo
 
 
@@ -146,28 +285,63 @@ def delete_vehiculo(
 
     db.delete(db_vehiculo)
     db.commit()
+    vehiculo_cache.invalidate(vehiculo_id)
     return {"message": "Vehículo eliminado exitosamente"}
 
 
 @router.get("/{vehiculo_id}/propietarios", response_model=VehiculoConPropietarios, summary="Obtener propietarios de un vehículo")
 def read_vehiculo_propietarios(
     vehiculo_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """
-    Obtener todos los propietarios de un vehículo específico.
+    Obtener los propietarios de un vehículo específico, paginados.
 
     - **vehiculo_id**: ID del vehículo
+    - **limit**: Máximo de propietarios por página
+    - **cursor**: Cursor devuelto en el header `X-Next-Cursor` de la página anterior
+    - **skip**: Desplazamiento clásico (se ignora si se envía `cursor`)
+
+    Los propietarios se leen de `vehiculo_persona` en el orden de su clave primaria,
+    así que cada página cuesta lo mismo sin importar cuántos propietarios tenga el vehículo.
     """
     db_vehiculo = db.query(VehiculoModel).options(
-        joinedload(VehiculoModel.marca),
-        joinedload(VehiculoModel.propietarios)
+        joinedload(VehiculoModel.marca)
     ).filter(VehiculoModel.id == vehiculo_id).first()
     if db_vehiculo is None:
         raise HTTPException(status_code=404, detail="Vehículo no encontrado")
+
+    statement = paginate_statement(
+        propietarios_statement(vehiculo_id), PROPIETARIOS_ORDER, cursor=cursor, skip=skip, limit=limit
+    )
+    propietarios, next_cursor = split_page(db.scalars(statement).all(), PROPIETARIOS_CURSOR, limit=limit)
+    # Publicar la página como la colección ya cargada (no se marca como modificada)
+    set_committed_value(db_vehiculo, "propietarios", propietarios)
+    set_next_cursor(response, next_cursor)
     return db_vehiculo
 
 
+@router.get("/{vehiculo_id}/propietarios/count", response_model=ConteoRelaciones, summary="Contar propietarios de un vehículo")
+def count_vehiculo_propietarios(
+    vehiculo_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Contar los propietarios de un vehículo sin cargarlos.
+
+    - **vehiculo_id**: ID del vehículo
+    """
+    total = db.scalar(count_statement(vehiculo_persona.c.vehiculo_id, vehiculo_id))
+    # La existencia del vehículo solo se consulta cuando el conteo no la demuestra
+    if not total and db.get(VehiculoModel, vehiculo_id) is None:
+        raise HTTPException(status_code=404, detail="Vehículo no encontrado")
+    return ConteoRelaciones(total=total)
+
+
 @router.post("/{vehiculo_id}/propietarios", summary="Asignar propietario a un vehículo")
 def assign_propietario_to_vehiculo(
     vehiculo_id: int,
@@ -188,22 +362,78 @@ def assign_propietario_to_vehiculo(
         raise HTTPException(status_code=404, detail="Vehículo no encontrado")
 
     # Verificar que la persona existe
-    from ..models.models import Persona
-    db_persona = db.query(Persona).filter(
-        Persona.id == asignacion.persona_id
-    ).first()
+    db_persona = db.get(Persona, asignacion.persona_id)
     if not db_persona:
         raise HTTPException(status_code=404, detail="Persona no encontrada")
 
-    # Verificar si la relación ya existe
-    if db_persona in db_vehiculo.propietarios:
+    # Crear la relación en una sola sentencia: si ya existe (también si la creó una
+    # petición concurrente entre tanto) no se inserta nada y se responde 400
+    result = db.execute(add_ownership_statement(db, vehiculo_id, asignacion.persona_id))
+    if result.rowcount == 0:
         raise HTTPException(
             status_code=400,
             detail="Esta persona ya es propietaria de este vehículo"
         )
-
-    # Agregar la relación
-    db_vehiculo.propietarios.append(db_persona)
     db.commit()
+    vehiculo_cache.invalidate(vehiculo_id)
 
     return {"message": "Propietario asignado exitosamente al vehículo"}
+
+
+def _get_vehiculo_or_404(db: Session, vehiculo_id: int) -> VehiculoModel:
+    """Obtener el vehículo `vehiculo_id` o responder 404"""
+    db_vehiculo = db.get(VehiculoModel, vehiculo_id)
+    if db_vehiculo is None:
+        raise HTTPException(status_code=404, detail="Vehículo no encontrado")
+    return db_vehiculo
+
+
+@router.post("/{vehiculo_id}/propietarios/bulk", response_model=ResultadoAsignacionMasiva, summary="Asignar propietarios a un vehículo en lote")
+def assign_propietarios_bulk(
+    vehiculo_id: int,
+    asignacion: AsignarPropietarios,
+    db: Session = Depends(get_db)
+):
+    """
+    Asignar varios propietarios a un vehículo en una sola operación.
+
+    - **vehiculo_id**: ID del vehículo
+    - **persona_ids**: IDs de las personas a asignar; las que ya son propietarias se ignoran
+
+    La existencia de las personas se valida con una sola consulta y las relaciones se
+    insertan con un único `INSERT ... ON CONFLICT DO NOTHING`. Si alguna persona no
+    existe no se asigna ninguna.
+    """
+    persona_ids = list(dict.fromkeys(asignacion.persona_ids))
+    check_bulk_size(persona_ids)
+    _get_vehiculo_or_404(db, vehiculo_id)
+
+    missing = find_missing_references(db, Persona.id, persona_ids, message="")
+    if missing:
+        ids = ", ".join(str(persona_ids[index]) for index in missing)
+        raise HTTPException(status_code=404, detail=f"Personas no encontradas: {ids}")
+
+    result = add_ownerships(db, [(vehiculo_id, persona_id) for persona_id in persona_ids])
+    vehiculo_cache.invalidate(vehiculo_id)
+    return result
+
+
+@router.delete("/{vehiculo_id}/propietarios/bulk", response_model=ResultadoAsignacionMasiva, summary="Retirar propietarios de un vehículo en lote")
+def remove_propietarios_bulk(
+    vehiculo_id: int,
+    asignacion: AsignarPropietarios,
+    db: Session = Depends(get_db)
+):
+    """
+    Retirar varios propietarios de un vehículo con un único `DELETE`.
+
+    - **vehiculo_id**: ID del vehículo
+    - **persona_ids**: IDs de las personas a retirar; las que no son propietarias se ignoran
+    """
+    persona_ids = list(dict.fromkeys(asignacion.persona_ids))
+    check_bulk_size(persona_ids)
+    _get_vehiculo_or_404(db, vehiculo_id)
+
+    result = remove_ownerships(db, [(vehiculo_id, persona_id) for persona_id in persona_ids])
+    vehiculo_cache.invalidate(vehiculo_id)
+    return result
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import Dict, List, Optional, Union
 
 
 # Esquemas para MarcaVehiculo
@@ -74,6 +74,14 @@ class Vehiculo(VehiculoBase):
         from_attributes = True
 
 
+# Vehículo sin relaciones, para expandir `vehiculos` en marcas y personas
+class VehiculoResumen(VehiculoBase):
+    id: int
+
+    class Config:
+        from_attributes = True
+
+
 # Esquemas para relaciones
 class VehiculoConPropietarios(Vehiculo):
     propietarios: List[Persona] = []
@@ -86,3 +94,93 @@ class PersonaConVehiculos(Persona):
 # Esquema para asignar propietario a vehiculo
 class AsignarPropietario(BaseModel):
     persona_id: int
+
+
+# Esquemas para asignar o retirar propietarios en lote
+class AsignarPropietarios(BaseModel):
+    persona_ids: List[int] = Field(..., description="IDs de las personas propietarias")
+
+
+class AsignarVehiculos(BaseModel):
+    vehiculo_ids: List[int] = Field(..., description="IDs de los vehículos de la persona")
+
+
+class ConteoRelaciones(BaseModel):
+    total: int = Field(..., description="Número de relaciones en vehiculo_persona")
+
+
+class ResultadoAsignacionMasiva(BaseModel):
+    solicitados: int = Field(..., description="IDs distintos recibidos")
+    modificados: int = Field(..., description="Relaciones creadas o eliminadas")
+    sin_cambios: int = Field(..., description="Relaciones que ya existían (o que no existían, al retirar)")
+
+
+# Esquemas para creación masiva
+class ResultadoItemMasivo(BaseModel):
+    indice: int = Field(..., description="Posición del elemento en el arreglo enviado")
+    id: Optional[int] = Field(None, description="ID asignado si el elemento se creó")
+    error: Optional[str] = Field(None, description="Motivo por el que el elemento no se creó")
+
+
+class ResultadoCargaMasiva(BaseModel):
+    creados: int
+    fallidos: int
+    resultados: List[ResultadoItemMasivo] = []
+
+
+# Esquemas para importación desde archivo
+class VehiculoImportacion(BaseModel):
+    id: Optional[int] = Field(None, gt=0, description="ID del vehículo; si existe se actualiza")
+    modelo: str = Field(..., min_length=1)
+    marca_id: Optional[int] = Field(None, gt=0)
+    nombre_marca: Optional[str] = Field(None, min_length=1, description="Alternativa a marca_id")
+    numero_puertas: int = Field(..., ge=2, le=5)
+    color: str = Field(..., min_length=1)
+
+    @model_validator(mode="after")
+    def check_marca(self):
+        if self.marca_id is None and self.nombre_marca is None:
+            raise ValueError("Se requiere marca_id o nombre_marca")
+        return self
+
+
+class PropietarioImportacion(BaseModel):
+    vehiculo_id: int = Field(..., gt=0)
+    persona_id: Optional[int] = Field(None, gt=0)
+    cedula: Optional[str] = Field(None, min_length=1, description="Alternativa a persona_id")
+
+    @model_validator(mode="after")
+    def check_persona(self):
+        if self.persona_id is None and self.cedula is None:
+            raise ValueError("Se requiere persona_id o cedula")
+        return self
+
+
+class FilaRechazada(BaseModel):
+    linea: int
+    tipo: Optional[str] = None
+    motivo: str
+
+
+class ResultadoImportacion(BaseModel):
+    procesadas: int
+    importadas: Dict[str, int]
+    rechazadas: int
+    lotes: int
+    filas_rechazadas: List[FilaRechazada] = Field(
+        [], description="Detalle de las primeras filas rechazadas"
+    )
+
+
+# Esquemas para búsqueda de texto completo
+class ResultadoBusqueda(BaseModel):
+    tipo: str = Field(..., description="Recurso encontrado: persona, vehiculo o marca")
+    id: int
+    puntaje: float = Field(..., description="Relevancia del resultado dentro de su recurso, de 0 a 1 (mayor es más relevante)")
+    datos: Dict[str, str] = Field(..., description="Columnas indexadas del recurso")
+
+
+# Esquemas para estadísticas
+class ConteoGrupo(BaseModel):
+    grupo: Union[int, str] = Field(..., description="Marca, país, color o número de puertas")
+    total: int = Field(..., description="Número de vehículos del grupo")
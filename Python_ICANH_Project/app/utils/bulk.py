@@ -0,0 +1,108 @@
+from typing import Any, Dict, List, Sequence, Union
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..schemas.schemas import ResultadoCargaMasiva, ResultadoItemMasivo
+
+# Máximo de elementos aceptados por petición de creación masiva
+MAX_BULK_ITEMS = 10000
+
+
+def check_bulk_size(items: Sequence[Any]) -> None:
+    """Rechazar lotes vacíos o mayores que `MAX_BULK_ITEMS`"""
+    if not items:
+        raise HTTPException(status_code=400, detail="El lote no contiene elementos")
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Se permiten como máximo {MAX_BULK_ITEMS} elementos por lote"
+        )
+
+
+def find_unique_conflicts(
+    db: Session,
+    column: Any,
+    values: Sequence[Any],
+    existing_message: str,
+    repeated_message: str,
+) -> Dict[int, str]:
+    """
+    Detectar, con una sola consulta, los valores de una columna única que ya existen
+    en la base de datos o que se repiten dentro del mismo lote.
+
+    Retorna un diccionario {índice: motivo} con los elementos que no se pueden crear.
+    """
+    existing = set(db.scalars(select(column).where(column.in_(set(values)))))
+    errors = {}
+    seen = set()
+    for index, value in enumerate(values):
+        if value in existing:
+            errors[index] = existing_message
+        elif value in seen:
+            errors[index] = repeated_message
+        seen.add(value)
+    return errors
+
+
+def find_missing_references(
+    db: Session,
+    column: Any,
+    values: Sequence[Any],
+    message: str,
+) -> Dict[int, str]:
+    """Detectar, con una sola consulta, las referencias de un lote que no existen en `column`"""
+    existing = set(db.scalars(select(column).where(column.in_(set(values)))))
+    return {index: message for index, value in enumerate(values) if value not in existing}
+
+
+def bulk_insert(
+    db: Session,
+    model: Any,
+    rows: List[dict],
+    errors: Dict[int, str],
+    atomic: bool = True,
+) -> Union[ResultadoCargaMasiva, JSONResponse]:
+    """
+    Insertar las filas válidas de un lote con un único INSERT ejecutado como
+    executemany y un solo commit.
+
+    - **atomic=True**: si algún elemento tiene error no se inserta ninguno y se responde 400
+    - **atomic=False**: se insertan los elementos válidos y se reportan los rechazados
+    """
+    if atomic and errors:
+        result = _build_result(len(rows), {}, errors)
+        return JSONResponse(status_code=400, content=result.model_dump())
+
+    valid = [index for index in range(len(rows)) if index not in errors]
+    ids = {}
+    if valid:
+        statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+        try:
+            inserted = db.scalars(statement, [rows[index] for index in valid]).all()
+            db.commit()
+        except IntegrityError:
+            # Otra petición insertó un valor único entre la validación y el INSERT
+            db.rollback()
+            raise HTTPException(
+                status_code=400,
+                detail="El lote entra en conflicto con datos creados concurrentemente; reintente"
+            )
+        ids = dict(zip(valid, inserted))
+
+    return _build_result(len(rows), ids, errors)
+
+
+def _build_result(total: int, ids: Dict[int, int], errors: Dict[int, str]) -> ResultadoCargaMasiva:
+    """Construir el resultado por elemento de una carga masiva"""
+    return ResultadoCargaMasiva(
+        creados=len(ids),
+        fallidos=len(errors),
+        resultados=[
+            ResultadoItemMasivo(indice=index, id=ids.get(index), error=errors.get(index))
+            for index in range(total)
+        ],
+    )
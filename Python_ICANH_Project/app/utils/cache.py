@@ -0,0 +1,305 @@
+"""
+Cachés de la aplicación.
+
+- `TTLCache`: diccionario en memoria acotado por tamaño (LRU) y antigüedad (TTL).
+- `CacheBackend`: interfaz de almacenamiento clave -> bytes con dos implementaciones,
+  `MemoryCacheBackend` (por proceso) y `RedisCacheBackend` (compartida entre workers).
+- `CacheNamespace`: vista de un backend bajo un prefijo, con contadores de aciertos.
+
+Los handlers asíncronos usan los métodos `aget`, `aset` y `adelete`: en un backend con
+E/S bloqueante (`RedisCacheBackend`) se ejecutan en el threadpool para no detener el
+event loop mientras se espera al servidor.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+
+class TTLCache:
+    """
+    Caché en memoria acotada por número de entradas (LRU) y por antigüedad (TTL).
+
+    - **maxsize**: Número máximo de entradas; al superarlo se descarta la menos usada
+    - **ttl**: Segundos que una entrada es válida desde que se guardó
+
+    Es segura entre hilos y lleva contadores de aciertos y fallos.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, timer: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._timer = timer
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Obtener el valor de `key` si existe y no ha expirado"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > self._timer():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Guardar `value` en `key`, descartando las entradas menos usadas si no cabe"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (self._timer() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """Eliminar `key` de la caché si existe"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def keys(self) -> List[Hashable]:
+        """Claves guardadas actualmente (incluye las expiradas aún no descartadas)"""
+        with self._lock:
+            return list(self._data)
+
+    def clear(self) -> None:
+        """Vaciar la caché (los contadores se conservan)"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """Tamaño, límites y contadores de aciertos/fallos"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class CacheBackend:
+    """
+    Almacenamiento clave -> bytes usado por las cachés de la aplicación.
+
+    Las implementaciones deben ser seguras entre hilos; los valores ya vienen
+    serializados, de modo que cualquier backend puede compartirse entre procesos.
+    """
+
+    name = "base"
+
+    # Si las operaciones esperan E/S (red): sus versiones asíncronas van al threadpool
+    blocking = False
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes) -> None:
+        raise NotImplementedError
+
+    def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    def clear(self, prefix: str = "") -> None:
+        """Eliminar todas las claves que empiezan por `prefix`"""
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+    async def _run(self, function: Callable, *args: Any) -> Any:
+        if self.blocking:
+            return await run_in_threadpool(function, *args)
+        return function(*args)
+
+    async def aget(self, key: str) -> Optional[bytes]:
+        """Versión de `get` para los handlers asíncronos"""
+        return await self._run(self.get, key)
+
+    async def aset(self, key: str, value: bytes) -> None:
+        """Versión de `set` para los handlers asíncronos"""
+        await self._run(self.set, key, value)
+
+    async def adelete(self, *keys: str) -> None:
+        """Versión de `delete` para los handlers asíncronos"""
+        await self._run(self.delete, *keys)
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Backend en memoria del proceso (LRU con TTL); cada worker tiene el suyo"""
+
+    name = "memory"
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize, ttl)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: bytes) -> None:
+        self._cache.set(key, value)
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._cache.delete(key)
+
+    def clear(self, prefix: str = "") -> None:
+        if not prefix:
+            self._cache.clear()
+            return
+        self.delete(*(key for key in self._cache.keys() if key.startswith(prefix)))
+
+    def stats(self) -> dict:
+        stats = self._cache.stats()
+        return {
+            "backend": self.name,
+            "size": stats["size"],
+            "maxsize": stats["maxsize"],
+            "ttl": stats["ttl"],
+        }
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Backend sobre cualquier servidor que hable el protocolo de Redis.
+
+    - **client**: Cliente ya construido (por ejemplo `redis.Redis` o un doble de pruebas)
+    - **url**: URL del servidor si no se pasa `client`; requiere `pip install redis`
+    - **ttl**: Segundos de vida de cada entrada
+    - **prefix**: Prefijo de todas las claves, para compartir el servidor con otras aplicaciones
+
+    Al ser compartido, una invalidación hecha por un worker es visible para todos.
+    """
+
+    name = "redis"
+    blocking = True
+
+    def __init__(self, client: Any = None, url: Optional[str] = None, ttl: float = 300, prefix: str = "icanh:"):
+        if client is None:
+            try:
+                import redis
+            except ImportError as exc:
+                raise RuntimeError("CACHE_BACKEND=redis requiere el paquete 'redis' (pip install redis)") from exc
+            client = redis.Redis.from_url(url or "redis://localhost:6379/0")
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes) -> None:
+        self.client.set(self.prefix + key, value, ex=max(int(self.ttl), 1))
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+    def clear(self, prefix: str = "") -> None:
+        batch = []
+        for key in self.client.scan_iter(match=f"{self.prefix}{prefix}*", count=500):
+            batch.append(key)
+            if len(batch) == 500:
+                self.client.delete(*batch)
+                batch = []
+        if batch:
+            self.client.delete(*batch)
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "ttl": self.ttl, "prefix": self.prefix}
+
+
+def build_cache_backend() -> CacheBackend:
+    """
+    Crear el backend configurado por variables de entorno.
+
+    - `CACHE_BACKEND`: `memory` (por defecto) o `redis`
+    - `CACHE_SIZE`: Entradas máximas del backend en memoria
+    - `CACHE_TTL`: Segundos de vida de cada entrada
+    - `REDIS_URL`: Servidor del backend `redis`
+    """
+    ttl = float(os.getenv("CACHE_TTL", "300"))
+    if os.getenv("CACHE_BACKEND", "memory").lower() == "redis":
+        return RedisCacheBackend(url=os.getenv("REDIS_URL", "redis://localhost:6379/0"), ttl=ttl)
+    return MemoryCacheBackend(maxsize=int(os.getenv("CACHE_SIZE", "10000")), ttl=ttl)
+
+
+class CacheNamespace:
+    """
+    Claves de `backend` bajo `namespace`, con contadores de aciertos y fallos propios.
+
+    Cada valor se guarda con la `version` de los datos de los que se construyó; una
+    lectura con otra versión cuenta como fallo, de modo que una entrada guardada a
+    partir de datos ya reemplazados nunca se sirve aunque llegue después de invalidarla.
+    """
+
+    def __init__(self, backend: CacheBackend, namespace: str):
+        self.backend = backend
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key(self, name: Hashable) -> str:
+        return f"{self.namespace}:{name}"
+
+    @staticmethod
+    def _pack(value: bytes, version: str) -> bytes:
+        return version.encode() + b"\n" + value
+
+    def _unpack(self, stored: Optional[bytes], version: str) -> Optional[bytes]:
+        value = None
+        if stored is not None:
+            stored_version, _, content = stored.partition(b"\n")
+            if stored_version == version.encode():
+                value = content
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def get(self, name: Hashable, version: str = "") -> Optional[bytes]:
+        return self._unpack(self.backend.get(self.key(name)), version)
+
+    def set(self, name: Hashable, value: bytes, version: str = "") -> None:
+        self.backend.set(self.key(name), self._pack(value, version))
+
+    def delete(self, *names: Hashable) -> None:
+        self.backend.delete(*(self.key(name) for name in names))
+
+    async def aget(self, name: Hashable, version: str = "") -> Optional[bytes]:
+        return self._unpack(await self.backend.aget(self.key(name)), version)
+
+    async def aset(self, name: Hashable, value: bytes, version: str = "") -> None:
+        await self.backend.aset(self.key(name), self._pack(value, version))
+
+    async def adelete(self, *names: Hashable) -> None:
+        await self.backend.adelete(*(self.key(name) for name in names))
+
+    def clear(self) -> None:
+        self.backend.clear(f"{self.namespace}:")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            counters = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+        return {**self.backend.stats(), **counters}
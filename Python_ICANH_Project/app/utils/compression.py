@@ -0,0 +1,230 @@
+"""
+Compresión de las respuestas HTTP (`Content-Encoding`) según el `Accept-Encoding` del cliente.
+
+- **gzip** siempre está disponible; **br** (brotli) y **zstd** se ofrecen solo si están
+  instalados los paquetes `brotli` y `zstandard`. Entre las codificaciones que acepta
+  el cliente se elige la primera de `COMPRESSION_ENCODINGS`.
+- Las respuestas completas menores que `COMPRESSION_MINIMUM_SIZE` bytes se envían sin
+  comprimir: en ellas el costo de CPU no compensa los bytes ahorrados.
+- Las respuestas en streaming (las exportaciones NDJSON/CSV) se comprimen bloque a
+  bloque: cada bloque se vacía del compresor (`Z_SYNC_FLUSH` o equivalente) en cuanto
+  llega, así que el cliente sigue recibiendo las filas a medida que se leen.
+- Un endpoint decorado con `@no_compression` nunca se comprime, al igual que las
+  respuestas que ya traen `Content-Encoding`, las que piden `Cache-Control: no-transform`
+  y los tipos de contenido que no son texto.
+"""
+import os
+import zlib
+from typing import Callable, Dict, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende de los paquetes instalados
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depende de los paquetes instalados
+    zstandard = None
+
+# Orden de preferencia por defecto: brotli y zstd comprimen más que gzip con menos CPU
+DEFAULT_ENCODINGS = ("br", "zstd", "gzip")
+
+# Niveles por defecto (ver benchmarks/compression.py): el punto en el que subir el nivel
+# casi no reduce los bytes pero sí multiplica el tiempo de compresión
+DEFAULT_LEVELS = {"gzip": 5, "br": 4, "zstd": 3}
+
+# Tipos de contenido que vale la pena comprimir (prefijos o fragmentos del media type)
+COMPRESSIBLE_TYPES = ("text/", "json", "xml", "javascript", "csv")
+
+
+class GzipStream:
+    def __init__(self, level: int):
+        # wbits=31: formato gzip (cabecera y CRC) en lugar de zlib
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH if finish else zlib.Z_SYNC_FLUSH)
+
+
+class BrotliStream:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        output = self._compressor.process(data)
+        return output + (self._compressor.finish() if finish else self._compressor.flush())
+
+
+class ZstdStream:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        flush = zstandard.COMPRESSOBJ_FLUSH_FINISH if finish else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        return self._compressor.compress(data) + self._compressor.flush(flush)
+
+
+# Codificaciones disponibles en este entorno: nombre -> compresor incremental
+CODECS: Dict[str, Callable[[int], object]] = {"gzip": GzipStream}
+if brotli is not None:
+    CODECS["br"] = BrotliStream
+if zstandard is not None:
+    CODECS["zstd"] = ZstdStream
+
+
+def no_compression(endpoint: Callable) -> Callable:
+    """Marcar un endpoint cuyas respuestas no se comprimen"""
+    endpoint.compress = False
+    return endpoint
+
+
+def parse_accept_encoding(value: str) -> Dict[str, float]:
+    """Codificaciones de `Accept-Encoding` con su peso `q` (1.0 si no se indica)"""
+    accepted = {}
+    for item in value.split(","):
+        name, _, params = item.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    return accepted
+
+
+def negotiate(accept_encoding: str, encodings: Sequence[str]) -> Optional[str]:
+    """Primera de `encodings` que el cliente acepta (`q > 0`, explícita o por `*`)"""
+    accepted = parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    for encoding in encodings:
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def compressible(headers: Headers) -> bool:
+    """Si una respuesta con `headers` admite compresión"""
+    if "content-encoding" in headers or "no-transform" in headers.get("cache-control", ""):
+        return False
+    content_type = headers.get("content-type", "")
+    return any(fragment in content_type for fragment in COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI que comprime las respuestas con gzip, brotli o zstd.
+
+    - **encodings**: Codificaciones en orden de preferencia (las no instaladas se ignoran)
+    - **minimum_size**: Bytes mínimos de una respuesta completa para comprimirla
+    - **levels**: Nivel de compresión por codificación
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        encodings: Sequence[str] = DEFAULT_ENCODINGS,
+        minimum_size: int = 1000,
+        levels: Optional[Dict[str, int]] = None,
+    ):
+        self.app = app
+        self.encodings = tuple(encoding for encoding in encodings if encoding in CODECS)
+        self.minimum_size = minimum_size
+        self.levels = {**DEFAULT_LEVELS, **(levels or {})}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and self.encodings:
+            encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+            if encoding is not None:
+                responder = CompressionResponder(self.app, encoding, self.levels[encoding], self.minimum_size)
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class CompressionResponder:
+    """Compresión de una respuesta; decide al recibir el primer bloque del cuerpo"""
+
+    def __init__(self, app: ASGIApp, encoding: str, level: int, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.level = level
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.stream = None
+        self.decided = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.scope = scope
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Los headers se envían con el primer bloque, cuando ya se sabe si se comprime
+            self.start = {**message, "headers": list(message.get("headers", []))}
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self.decided:
+            self.decided = True
+            if self._should_compress(body, more_body):
+                self.stream = CODECS[self.encoding](self.level)
+                message = {**message, "body": self.stream.compress(body, finish=not more_body)}
+                self._compressed_headers(message["body"], more_body)
+            await self.send(self.start)
+        elif self.stream is not None:
+            message = {**message, "body": self.stream.compress(body, finish=not more_body)}
+        await self.send(message)
+
+    def _should_compress(self, body: bytes, more_body: bool) -> bool:
+        if not getattr(self.scope.get("endpoint"), "compress", True):
+            return False
+        if self.start["status"] < 200 or self.start["status"] in (204, 304):
+            return False
+        if not more_body and len(body) < self.minimum_size:
+            return False
+        return compressible(Headers(raw=self.start["headers"]))
+
+    def _compressed_headers(self, body: bytes, streaming: bool) -> None:
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        # La representación comprimida no es idéntica byte a byte: un ETag fuerte pasa a débil
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        if streaming:
+            # La longitud total no se conoce hasta el último bloque
+            if "content-length" in headers:
+                del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(len(body))
+
+
+def compression_options() -> dict:
+    """
+    Opciones de `CompressionMiddleware` a partir de variables de entorno.
+
+    - `COMPRESSION_ENCODINGS`: Codificaciones en orden de preferencia (vacío: sin compresión)
+    - `COMPRESSION_MINIMUM_SIZE`: Bytes mínimos de una respuesta para comprimirla
+    - `COMPRESSION_GZIP_LEVEL`, `COMPRESSION_BROTLI_LEVEL`, `COMPRESSION_ZSTD_LEVEL`: Niveles
+    """
+    encodings = os.getenv("COMPRESSION_ENCODINGS", ",".join(DEFAULT_ENCODINGS))
+    variables = {"gzip": "COMPRESSION_GZIP_LEVEL", "br": "COMPRESSION_BROTLI_LEVEL", "zstd": "COMPRESSION_ZSTD_LEVEL"}
+    return {
+        "encodings": tuple(name.strip().lower() for name in encodings.split(",") if name.strip()),
+        "minimum_size": int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1000")),
+        "levels": {name: int(os.getenv(variable, DEFAULT_LEVELS[name])) for name, variable in variables.items()},
+    }
@@ -0,0 +1,98 @@
+import csv
+import io
+import json
+from enum import Enum
+from typing import Iterator, Mapping, Optional
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Table, select
+from sqlalchemy.engine import Engine
+
+# Filas que se leen del cursor del servidor y se envían al cliente en cada bloque
+EXPORT_BATCH_SIZE = 1000
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+# Documentación OpenAPI compartida por los endpoints de exportación
+EXPORT_RESPONSES = {
+    200: {
+        "description": "Registros exportados en streaming",
+        "content": {media_type: {} for media_type in MEDIA_TYPES.values()},
+    }
+}
+
+
+def _iter_partitions(bind: Engine, table: Table) -> Iterator[tuple]:
+    """
+    Recorrer `table` ordenada por su clave primaria con un cursor del lado del servidor.
+
+    `yield_per` hace que el driver entregue las filas por bloques en lugar de
+    cargar el resultado completo en memoria. La conexión se abre dentro del
+    generador, porque la sesión de la petición ya se cerró cuando empieza el streaming.
+    La clave primaria es `id` en las entidades y (vehiculo_id, persona_id) en `vehiculo_persona`.
+    """
+    statement = select(table).order_by(*table.primary_key.columns)
+    with bind.connect() as connection:
+        result = connection.execution_options(yield_per=EXPORT_BATCH_SIZE).execute(statement)
+        yield tuple(result.keys())
+        for partition in result.partitions():
+            yield partition
+
+
+def _iter_ndjson(bind: Engine, table: Table) -> Iterator[str]:
+    """Generar la tabla como NDJSON, un objeto JSON por línea"""
+    partitions = _iter_partitions(bind, table)
+    keys = next(partitions)
+    for partition in partitions:
+        yield "".join(
+            json.dumps(dict(zip(keys, row)), ensure_ascii=False) + "\n"
+            for row in partition
+        )
+
+
+def _iter_csv(bind: Engine, table: Table) -> Iterator[str]:
+    """Generar la tabla como CSV con una fila de encabezado"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    partitions = _iter_partitions(bind, table)
+    writer.writerow(next(partitions))
+    for partition in partitions:
+        writer.writerows(partition)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Encabezado de una tabla vacía
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_response(
+    bind: Engine,
+    table: Table,
+    export_format: ExportFormat,
+    headers: Optional[Mapping[str, str]] = None,
+) -> StreamingResponse:
+    """
+    Construir la respuesta en streaming que exporta `table` en `export_format`.
+
+    `headers` se agregan a la respuesta (por ejemplo `ETag` y `Cache-Control`).
+    """
+    if export_format == ExportFormat.csv:
+        content = _iter_csv(bind, table)
+    else:
+        content = _iter_ndjson(bind, table)
+    filename = f"{table.name}.{export_format.value}"
+    return StreamingResponse(
+        content,
+        media_type=MEDIA_TYPES[export_format],
+        headers={**(headers or {}), "Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,175 @@
+"""
+Selección de campos (`fields=`) y expansión de relaciones (`expand=`) en los endpoints de lectura.
+
+Sin ninguno de los dos parámetros la respuesta conserva la forma documentada del
+endpoint. Con cualquiera de ellos solo se cargan de la base de datos las columnas
+pedidas (`load_only`) y las relaciones expandidas, y la respuesta se serializa con un
+esquema Pydantic reducido construido (y reutilizado) para esa combinación.
+
+Con `JSON_SERIALIZATION=direct` (por defecto) las respuestas completas también se
+serializan aquí: `TypeAdapter.dump_json` valida los objetos ORM contra el esquema y
+escribe los bytes JSON en pydantic-core, sin el paso intermedio por diccionarios de
+`jsonable_encoder` y `json.dumps` que hace FastAPI con el `response_model`. Con
+`JSON_SERIALIZATION=fastapi` se devuelven los objetos para que FastAPI los serialice.
+"""
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException, Query, Response
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from sqlalchemy.orm import load_only
+
+# Serializar las respuestas completas con TypeAdapter.dump_json en lugar del response_model
+DIRECT_JSON = os.getenv("JSON_SERIALIZATION", "direct").lower() == "direct"
+
+
+def parse_list_param(value: str, allowed: Sequence[str], param: str) -> Tuple[str, ...]:
+    """
+    Convertir `"a,b"` en una tupla de nombres validados contra `allowed`.
+
+    El resultado conserva el orden de `allowed`, de modo que `fields=modelo,id` y
+    `fields=id,modelo` comparten el mismo esquema de respuesta.
+    """
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Valor no permitido en {param}: {', '.join(sorted(unknown))}. "
+                   f"Valores permitidos: {', '.join(allowed)}"
+        )
+    return tuple(name for name in allowed if name in requested)
+
+
+def json_response(content: bytes, response: Optional[Response] = None) -> Response:
+    """
+    Respuesta JSON con `content` ya serializado.
+
+    Los headers ya fijados en `response` (por ejemplo `X-Next-Cursor` o `ETag`) se
+    copian a la respuesta generada.
+    """
+    rendered = Response(content=content, media_type="application/json")
+    if response is not None:
+        rendered.headers.raw.extend(response.headers.raw)
+    return rendered
+
+
+def dump_json(annotation: Any, data: Any) -> bytes:
+    """Validar `data` (objetos ORM o diccionarios) contra `annotation` y serializarlo a JSON"""
+    adapter = _adapter(annotation)
+    return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+
+
+def render_json(schema: Type[BaseModel], data: Any, response: Optional[Response] = None) -> Response:
+    """Respuesta JSON de `data` (un objeto o una lista) serializado con `schema`"""
+    annotation = List[schema] if isinstance(data, list) else schema
+    return json_response(dump_json(annotation, data), response)
+
+
+class FieldSelection:
+    """Opciones de carga y serialización resueltas para una petición"""
+
+    def __init__(
+        self,
+        options: Sequence[Any],
+        schema: Optional[Type[BaseModel]] = None,
+        response_schema: Optional[Type[BaseModel]] = None,
+    ):
+        self.options = tuple(options)
+        self.schema = schema
+        self.response_schema = response_schema
+
+    @property
+    def partial(self) -> bool:
+        """Si la petición usó `fields` o `expand`"""
+        return self.schema is not None
+
+    def render(self, data: Any, response: Optional[Response] = None) -> Any:
+        """
+        Serializar `data` (un objeto o una lista) con el esquema reducido.
+
+        Si la petición no usó `fields` ni `expand` se serializa con el esquema completo
+        (`JSON_SERIALIZATION=direct`) o se devuelve `data` sin cambios para que FastAPI
+        aplique el `response_model` del endpoint.
+        """
+        if self.schema is not None:
+            return render_json(self.schema, data, response)
+        if DIRECT_JSON and self.response_schema is not None:
+            return render_json(self.response_schema, data, response)
+        return data
+
+
+_adapters: Dict[Any, TypeAdapter] = {}
+
+
+def _adapter(annotation: Any) -> TypeAdapter:
+    """TypeAdapter reutilizable para `annotation`"""
+    if annotation not in _adapters:
+        _adapters[annotation] = TypeAdapter(annotation)
+    return _adapters[annotation]
+
+
+class FieldSet:
+    """
+    Campos y relaciones expandibles de un recurso; se usa como dependencia de FastAPI.
+
+    - **model**: Modelo SQLAlchemy del recurso
+    - **schema**: Esquema Pydantic completo del recurso (de él se toman los tipos)
+    - **relations**: Relaciones expandibles: nombre -> (opción de carga, tipo anotado)
+    - **default_expand**: Relaciones que incluye la respuesta sin `fields` ni `expand`
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        schema: Type[BaseModel],
+        relations: Optional[Dict[str, Tuple[Any, Any]]] = None,
+        default_expand: Sequence[str] = (),
+    ):
+        self.model = model
+        self.schema = schema
+        self.columns = tuple(column.key for column in model.__table__.columns)
+        self.relations = relations or {}
+        self.default = FieldSelection(
+            (self.relations[name][0] for name in default_expand), response_schema=schema
+        )
+        self._schemas: Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], Type[BaseModel]] = {}
+
+    def __call__(
+        self,
+        fields: Optional[str] = Query(
+            None, description="Columnas a devolver separadas por comas (el `id` siempre se incluye)"
+        ),
+        expand: Optional[str] = Query(
+            None, description="Relaciones a incluir separadas por comas"
+        ),
+    ) -> FieldSelection:
+        return self.select(fields, expand)
+
+    def select(self, fields: Optional[str] = None, expand: Optional[str] = None) -> FieldSelection:
+        """Resolver `fields` y `expand` en opciones de carga y esquema de respuesta"""
+        if fields is None and expand is None:
+            return self.default
+
+        columns = self.columns
+        if fields is not None:
+            requested = set(parse_list_param(fields, self.columns, "fields"))
+            columns = tuple(name for name in self.columns if name == "id" or name in requested)
+        expanded = parse_list_param(expand, tuple(self.relations), "expand") if expand else ()
+
+        options = [load_only(*(getattr(self.model, name) for name in columns))]
+        options.extend(self.relations[name][0] for name in expanded)
+        return FieldSelection(options, self._partial_schema(columns, expanded))
+
+    def _partial_schema(self, columns: Tuple[str, ...], expanded: Tuple[str, ...]) -> Type[BaseModel]:
+        """Esquema con solo `columns` y `expanded`, creado una vez por combinación"""
+        key = (columns, expanded)
+        if key not in self._schemas:
+            definitions = {name: (self.schema.model_fields[name].annotation, ...) for name in columns}
+            definitions.update({name: (self.relations[name][1], ...) for name in expanded})
+            self._schemas[key] = create_model(
+                f"{self.schema.__name__}Parcial",
+                __config__=ConfigDict(from_attributes=True),
+                **definitions,
+            )
+        return self._schemas[key]
@@ -0,0 +1,129 @@
+"""
+Filtros y ordenamiento de los listados (`GET /api/<recurso>/`).
+
+Cada filtro se traduce a una condición que el motor resuelve con un índice: igualdad,
+rangos y prefijos. Un prefijo se compila como el rango `col >= 'abc' AND col < 'abd'`
+en lugar de `LIKE 'abc%'`, que SQLite no resuelve con un índice (su `LIKE` ignora
+mayúsculas), de modo que los prefijos distinguen mayúsculas de minúsculas.
+
+El orden solo admite claves de una lista blanca, todas sobre columnas indexadas, y
+siempre termina en el `id` para que sea total y compatible con la paginación por cursor.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query
+from sqlalchemy.orm import undefer
+
+from ..models.models import MarcaVehiculo, Persona, Vehiculo
+
+SORT_DESCRIPTION = "Clave de orden; con `-` delante el orden es descendente"
+
+
+def prefix_condition(column: Any, prefix: str):
+    """Condición de rango equivalente a `column LIKE 'prefix%'` que usa el índice de `column`"""
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return (column >= prefix) & (column < upper)
+
+
+class Listing:
+    """Filtros y orden resueltos para una petición de listado"""
+
+    def __init__(self, model: Any, conditions: Sequence[Any], sort: str, columns: Tuple[Any, ...], descending: bool):
+        self.model = model
+        self.conditions = tuple(conditions)
+        self.sort = sort
+        self.columns = columns
+        self.descending = descending
+
+    def apply(self, statement):
+        """
+        Agregar los filtros a una consulta `Query` o `select()`.
+
+        Las columnas de orden se cargan aunque `fields=` no las pida, porque el cursor
+        de la página siguiente se calcula con sus valores.
+        """
+        return self.where(statement).options(*(undefer(column) for column in self.columns if column.key != "id"))
+
+    def where(self, statement):
+        """Agregar solo los filtros, sin opciones de carga (para un `select()` de columnas)"""
+        if self.conditions:
+            statement = statement.filter(*self.conditions)
+        return statement
+
+
+class SortKeys:
+    """Claves de orden permitidas de un recurso: nombre -> columnas (terminadas en `id`)"""
+
+    def __init__(self, model: Any, *names: str):
+        self.model = model
+        self.keys: Dict[str, Tuple[Any, ...]] = {"id": (model.id,)}
+        for name in names:
+            self.keys[name] = (getattr(model, name), model.id)
+
+    def resolve(self, sort: str) -> Tuple[str, Tuple[Any, ...], bool]:
+        """Traducir `sort` (p. ej. `-modelo`) a (clave del cursor, columnas, descendente)"""
+        descending = sort.startswith("-")
+        name = sort[1:] if descending else sort
+        if name not in self.keys:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Valor no permitido en sort: {sort}. Valores permitidos: {', '.join(self.keys)}"
+            )
+        return sort, self.keys[name], descending
+
+    def listing(self, conditions: List[Any], sort: str) -> Listing:
+        """Listado con `conditions` y el orden `sort`"""
+        return Listing(self.model, conditions, *self.resolve(sort))
+
+
+MARCA_SORTS = SortKeys(MarcaVehiculo, "nombre_marca", "pais")
+PERSONA_SORTS = SortKeys(Persona, "nombre", "cedula")
+VEHICULO_SORTS = SortKeys(Vehiculo, "modelo", "color", "marca_id")
+
+
+def marca_listing(
+    pais: Optional[str] = Query(None, description="País de origen exacto"),
+    sort: str = Query("id", description=f"{SORT_DESCRIPTION} (id, nombre_marca, pais)"),
+) -> Listing:
+    """Filtros y orden del listado de marcas"""
+    conditions = []
+    if pais is not None:
+        conditions.append(MarcaVehiculo.pais == pais)
+    return MARCA_SORTS.listing(conditions, sort)
+
+
+def persona_listing(
+    nombre: Optional[str] = Query(None, min_length=1, description="Prefijo del nombre"),
+    cedula: Optional[str] = Query(None, min_length=1, description="Prefijo de la cédula"),
+    sort: str = Query("id", description=f"{SORT_DESCRIPTION} (id, nombre, cedula)"),
+) -> Listing:
+    """Filtros y orden del listado de personas"""
+    conditions = []
+    if nombre is not None:
+        conditions.append(prefix_condition(Persona.nombre, nombre))
+    if cedula is not None:
+        conditions.append(prefix_condition(Persona.cedula, cedula))
+    return PERSONA_SORTS.listing(conditions, sort)
+
+
+def vehiculo_listing(
+    marca_id: Optional[int] = Query(None, description="ID de la marca"),
+    color: Optional[str] = Query(None, description="Color exacto"),
+    numero_puertas_min: Optional[int] = Query(None, description="Número mínimo de puertas"),
+    numero_puertas_max: Optional[int] = Query(None, description="Número máximo de puertas"),
+    modelo: Optional[str] = Query(None, min_length=1, description="Prefijo del modelo"),
+    sort: str = Query("id", description=f"{SORT_DESCRIPTION} (id, modelo, color, marca_id)"),
+) -> Listing:
+    """Filtros y orden del listado de vehículos"""
+    conditions = []
+    if marca_id is not None:
+        conditions.append(Vehiculo.marca_id == marca_id)
+    if color is not None:
+        conditions.append(Vehiculo.color == color)
+    if numero_puertas_min is not None:
+        conditions.append(Vehiculo.numero_puertas >= numero_puertas_min)
+    if numero_puertas_max is not None:
+        conditions.append(Vehiculo.numero_puertas <= numero_puertas_max)
+    if modelo is not None:
+        conditions.append(prefix_condition(Vehiculo.modelo, modelo))
+    return VEHICULO_SORTS.listing(conditions, sort)
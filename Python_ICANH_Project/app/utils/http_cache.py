@@ -0,0 +1,90 @@
+"""
+Caché HTTP de los endpoints GET: `ETag`, `If-None-Match` y `Cache-Control`.
+
+El ETag de una respuesta se deriva de la ruta, los parámetros de la petición y la
+versión de las tablas de las que depende el router (ver
+`app/database/versioning.py`). Si el cliente envía un `If-None-Match` que coincide
+se responde `304 Not Modified` antes de ejecutar el handler, sin cargar ni
+serializar ningún objeto.
+
+Los routers asíncronos usan `HttpCache.acall`, que lee las versiones con la sesión de
+`get_async_db` sin ocupar un hilo del threadpool (ver `app/routes/aio/__init__.py`).
+"""
+import hashlib
+import os
+from typing import Callable, Sequence
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..database.database import get_async_db, get_db
+from ..database.versioning import read_table_versions, share_table_versions
+
+# Cache-Control por defecto: el cliente puede guardar la respuesta pero debe revalidarla
+DEFAULT_CACHE_CONTROL = "private, no-cache"
+
+
+def no_http_cache(endpoint: Callable) -> Callable:
+    """Marcar un endpoint cuyas respuestas no dependen de las tablas versionadas"""
+    endpoint.http_cache = False
+    return endpoint
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Comparar `If-None-Match` con `etag` (comparación débil, admite listas y `*`)"""
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(value.removeprefix("W/") == etag.removeprefix("W/") for value in candidates)
+
+
+class HttpCache:
+    """
+    Dependencia de router que aplica ETag y Cache-Control a sus endpoints GET.
+
+    - **tables**: Tablas cuyas escrituras pueden cambiar las respuestas del router
+    - **cache_control**: Valor de `Cache-Control`; se puede sobrescribir con la
+      variable de entorno `env_var`
+    """
+
+    def __init__(self, tables: Sequence[str], cache_control: str = DEFAULT_CACHE_CONTROL, env_var: str = None):
+        self.tables = tuple(tables)
+        self.cache_control = os.getenv(env_var, cache_control) if env_var else cache_control
+
+    def etag(self, request: Request, versions: dict) -> str:
+        """ETag débil para la petición con las versiones de tabla actuales"""
+        key = "|".join([
+            request.url.path,
+            "&".join(sorted(f"{name}={value}" for name, value in request.query_params.multi_items())),
+            *(f"{table}:{versions.get(table)}" for table in self.tables),
+        ])
+        return f'W/"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+
+    @staticmethod
+    def applies(request: Request) -> bool:
+        """Si la petición usa la caché (GET a un endpoint no marcado con `@no_http_cache`)"""
+        return request.method == "GET" and getattr(request.scope.get("endpoint"), "http_cache", True)
+
+    def apply(self, request: Request, response: Response, versions: dict) -> None:
+        """Fijar ETag y Cache-Control, o responder `304` si `If-None-Match` coincide"""
+        if versions is None:
+            return
+
+        headers = {"ETag": self.etag(request, versions), "Cache-Control": self.cache_control}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, headers["ETag"]):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    def __call__(self, request: Request, response: Response, db: Session = Depends(get_db)) -> None:
+        if self.applies(request):
+            versions = read_table_versions(db, self.tables)
+            # El handler recibe la misma sesión y valida con ellas sus cachés de lectura
+            share_table_versions(db, versions)
+            self.apply(request, response, versions)
+
+    async def acall(self, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)) -> None:
+        """Versión asíncrona de la dependencia, con la sesión de `get_async_db`"""
+        if self.applies(request):
+            versions = await db.run_sync(read_table_versions, self.tables)
+            share_table_versions(db.sync_session, versions)
+            self.apply(request, response, versions)
@@ -0,0 +1,389 @@
+import codecs
+import csv
+import json
+import logging
+from enum import Enum
+from typing import BinaryIO, Dict, Iterator, List, Optional, Set, Tuple
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from ..models.models import MarcaVehiculo, Persona, Vehiculo, vehiculo_persona
+from ..schemas.schemas import (
+    FilaRechazada,
+    MarcaVehiculoCreate,
+    PersonaCreate,
+    PropietarioImportacion,
+    ResultadoImportacion,
+    VehiculoImportacion
+)
+from .export import ExportFormat
+from .marca_cache import marca_cache
+from .resource_cache import persona_cache, vehiculo_cache
+from .sql import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+# Filas rechazadas que se detallan en la respuesta (el total siempre se informa)
+MAX_REPORTED_REJECTIONS = 1000
+
+
+class TipoRegistro(str, Enum):
+    marca = "marca"
+    persona = "persona"
+    vehiculo = "vehiculo"
+    propietario = "propietario"
+
+
+# Esquema con el que se valida cada tipo de registro
+SCHEMAS = {
+    TipoRegistro.marca: MarcaVehiculoCreate,
+    TipoRegistro.persona: PersonaCreate,
+    TipoRegistro.vehiculo: VehiculoImportacion,
+    TipoRegistro.propietario: PropietarioImportacion,
+}
+
+# Extensiones de archivo reconocidas cuando no se indica el formato
+EXTENSIONS = {
+    ".csv": ExportFormat.csv,
+    ".ndjson": ExportFormat.ndjson,
+    ".jsonl": ExportFormat.ndjson,
+}
+
+Record = Tuple[int, Optional[dict], Optional[str]]
+
+
+def detect_format(filename: Optional[str]) -> Optional[ExportFormat]:
+    """Deducir el formato del archivo a partir de su extensión"""
+    for extension, file_format in EXTENSIONS.items():
+        if filename and filename.lower().endswith(extension):
+            return file_format
+    return None
+
+
+# Motivo de rechazo de las líneas que no se pueden decodificar
+INVALID_ENCODING = "La línea no está codificada en UTF-8"
+
+
+def _decode_lines(file: BinaryIO, invalid: Set[int]) -> Iterator[str]:
+    """
+    Decodificar el archivo línea a línea como UTF-8 (con o sin BOM).
+
+    Una línea que no es UTF-8 válido no interrumpe la lectura: su número se agrega a
+    `invalid` y se entrega con caracteres de reemplazo para que el lector CSV/NDJSON
+    conserve la numeración de las líneas siguientes.
+    """
+    for number, raw in enumerate(file, start=1):
+        if number == 1 and raw.startswith(codecs.BOM_UTF8):
+            raw = raw[len(codecs.BOM_UTF8):]
+        try:
+            yield raw.decode("utf-8")
+        except UnicodeDecodeError:
+            invalid.add(number)
+            yield raw.decode("utf-8", errors="replace")
+
+
+def _iter_csv_records(lines: Iterator[str], invalid: Set[int]) -> Iterator[Record]:
+    """Filas de un CSV; se rechazan las que contienen una línea inválida o que `csv` no puede leer"""
+    reader = csv.DictReader(lines)
+    first_line = 1
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as exc:
+            row = None
+            error = f"CSV inválido: {exc}"
+        # `DictReader.line_num` no se actualiza cuando la fila falla; el del lector interno sí
+        line_num = reader.reader.line_num
+        # Un campo entre comillas puede ocupar varias líneas del archivo
+        if row is not None and invalid.intersection(range(first_line, line_num + 1)):
+            row, error = None, INVALID_ENCODING
+        if row is None:
+            yield line_num, None, error
+        else:
+            yield line_num, {key: value for key, value in row.items() if key is not None}, None
+        first_line = line_num + 1
+
+
+def iter_records(file: BinaryIO, file_format: ExportFormat) -> Iterator[Record]:
+    """
+    Recorrer el archivo línea a línea sin cargarlo completo en memoria.
+
+    Genera tuplas (línea, registro, error): el registro es `None` cuando la línea
+    no se pudo interpretar (JSON o CSV inválido, o texto que no es UTF-8), y en ese
+    caso `error` explica el motivo. Así un archivo con líneas dañadas se rechaza fila
+    a fila en lugar de interrumpir una importación con lotes ya escritos.
+    """
+    invalid: Set[int] = set()
+    lines = _decode_lines(file, invalid)
+    if file_format == ExportFormat.csv:
+        yield from _iter_csv_records(lines, invalid)
+        return
+
+    for number, line in enumerate(lines, start=1):
+        if number in invalid:
+            yield number, None, INVALID_ENCODING
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield number, None, "JSON inválido"
+            continue
+        if not isinstance(record, dict):
+            yield number, None, "Cada línea debe ser un objeto JSON"
+            continue
+        yield number, record, None
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    """Resumir los errores de validación de Pydantic en una sola línea"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'registro'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+class Importer:
+    """
+    Valida filas de un archivo y las escribe por lotes de tamaño fijo.
+
+    Cada lote se escribe en su propia transacción y en orden de dependencias
+    (marcas, personas, vehículos y propietarios), de modo que un vehículo puede
+    referenciar por `nombre_marca` una marca que aparece antes en el mismo archivo.
+    """
+
+    def __init__(self, db: Session, batch_size: int, default_tipo: Optional[TipoRegistro] = None):
+        self.db = db
+        self.batch_size = batch_size
+        self.default_tipo = default_tipo
+        self.procesadas = 0
+        self.lotes = 0
+        self.rechazadas = 0
+        self.importadas = {tipo.value: 0 for tipo in TipoRegistro}
+        self.filas_rechazadas: List[FilaRechazada] = []
+        self._pending: Dict[TipoRegistro, List[Tuple[int, BaseModel]]] = {tipo: [] for tipo in TipoRegistro}
+        self._pending_count = 0
+
+    def reject(self, linea: int, tipo: Optional[str], motivo: str) -> None:
+        """Registrar una fila rechazada"""
+        self.rechazadas += 1
+        if len(self.filas_rechazadas) < MAX_REPORTED_REJECTIONS:
+            self.filas_rechazadas.append(FilaRechazada(linea=linea, tipo=tipo, motivo=motivo))
+
+    def add(self, linea: int, record: Optional[dict], error: Optional[str] = None) -> None:
+        """Validar una fila y encolarla; escribe el lote cuando alcanza `batch_size`"""
+        self.procesadas += 1
+        if record is None:
+            self.reject(linea, None, error or "Registro inválido")
+            return
+
+        raw_tipo = record.get("tipo") or (self.default_tipo.value if self.default_tipo else None)
+        try:
+            tipo = TipoRegistro(raw_tipo)
+        except ValueError:
+            motivo = "Tipo de registro desconocido" if raw_tipo else "Tipo de registro no especificado"
+            self.reject(linea, raw_tipo, motivo)
+            return
+
+        # Las celdas vacías de un CSV equivalen a campos ausentes
+        values = {key: value for key, value in record.items() if key != "tipo" and value not in ("", None)}
+        try:
+            item = SCHEMAS[tipo].model_validate(values)
+        except ValidationError as exc:
+            self.reject(linea, tipo.value, _format_validation_error(exc))
+            return
+
+        self._pending[tipo].append((linea, item))
+        self._pending_count += 1
+        if self._pending_count >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Escribir el lote pendiente en una transacción propia"""
+        if not self._pending_count:
+            return
+        pending = self._pending
+        self._pending = {tipo: [] for tipo in TipoRegistro}
+        self._pending_count = 0
+
+        motivos: Dict[int, str] = {}
+        try:
+            imported = {
+                TipoRegistro.marca: self._write_marcas(pending[TipoRegistro.marca]),
+                TipoRegistro.persona: self._write_personas(pending[TipoRegistro.persona]),
+                TipoRegistro.vehiculo: self._write_vehiculos(pending[TipoRegistro.vehiculo], motivos),
+                TipoRegistro.propietario: self._write_propietarios(pending[TipoRegistro.propietario], motivos),
+            }
+            self.db.commit()
+        except SQLAlchemyError:
+            self.db.rollback()
+            logger.exception("Importación: el lote %d falló y se descartó", self.lotes + 1)
+            for tipo, rows in pending.items():
+                for linea, _ in rows:
+                    self.reject(linea, tipo.value, motivos.get(linea, "Error de base de datos al escribir el lote"))
+        else:
+            if pending[TipoRegistro.marca]:
+                # El upsert puede haber cambiado el país de marcas ya guardadas en caché
+                marca_cache.clear()
+            if pending[TipoRegistro.persona]:
+                persona_cache.clear()
+            if any(pending.values()):
+                # La respuesta de un vehículo incluye su marca y sus propietarios
+                vehiculo_cache.clear()
+            for tipo, count in imported.items():
+                self.importadas[tipo.value] += count
+            for tipo, rows in pending.items():
+                for linea, _ in rows:
+                    if linea in motivos:
+                        self.reject(linea, tipo.value, motivos[linea])
+
+        self.lotes += 1
+        logger.info(
+            "Importación: lote %d escrito, %d filas procesadas, %d rechazadas",
+            self.lotes, self.procesadas, self.rechazadas
+        )
+
+    def _write_marcas(self, rows: List[Tuple[int, MarcaVehiculoCreate]]) -> int:
+        """Upsert de marcas por `nombre_marca`"""
+        if not rows:
+            return 0
+        # Si un nombre se repite dentro del lote prevalece la última fila
+        values = {item.nombre_marca: item.model_dump() for _, item in rows}
+        statement = dialect_insert(self.db, MarcaVehiculo.__table__)
+        statement = statement.on_conflict_do_update(
+            index_elements=["nombre_marca"],
+            set_={"pais": statement.excluded.pais},
+        )
+        self.db.execute(statement, list(values.values()))
+        return len(rows)
+
+    def _write_personas(self, rows: List[Tuple[int, PersonaCreate]]) -> int:
+        """Upsert de personas por `cedula`"""
+        if not rows:
+            return 0
+        values = {item.cedula: item.model_dump() for _, item in rows}
+        statement = dialect_insert(self.db, Persona.__table__)
+        statement = statement.on_conflict_do_update(
+            index_elements=["cedula"],
+            set_={"nombre": statement.excluded.nombre},
+        )
+        self.db.execute(statement, list(values.values()))
+        return len(rows)
+
+    def _write_vehiculos(self, rows: List[Tuple[int, VehiculoImportacion]], motivos: Dict[int, str]) -> int:
+        """Insertar vehículos nuevos y hacer upsert por `id` de los que lo traen"""
+        if not rows:
+            return 0
+
+        # Resolver las marcas del lote con una consulta por tipo de referencia
+        nombres = {item.nombre_marca for _, item in rows if item.marca_id is None}
+        ids = {item.marca_id for _, item in rows if item.marca_id is not None}
+        marcas_por_nombre = dict(self.db.execute(
+            select(MarcaVehiculo.nombre_marca, MarcaVehiculo.id).where(MarcaVehiculo.nombre_marca.in_(nombres))
+        ).all()) if nombres else {}
+        marcas_existentes = set(self.db.scalars(
+            select(MarcaVehiculo.id).where(MarcaVehiculo.id.in_(ids))
+        )) if ids else set()
+
+        nuevos = []
+        existentes = {}
+        for linea, item in rows:
+            if item.marca_id is not None:
+                marca_id = item.marca_id if item.marca_id in marcas_existentes else None
+            else:
+                marca_id = marcas_por_nombre.get(item.nombre_marca)
+            if marca_id is None:
+                motivos[linea] = "La marca especificada no existe"
+                continue
+            values = {
+                "modelo": item.modelo,
+                "marca_id": marca_id,
+                "numero_puertas": item.numero_puertas,
+                "color": item.color,
+            }
+            if item.id is None:
+                nuevos.append(values)
+            else:
+                existentes[item.id] = {"id": item.id, **values}
+
+        if nuevos:
+            self.db.execute(insert(Vehiculo.__table__), nuevos)
+        if existentes:
+            statement = dialect_insert(self.db, Vehiculo.__table__)
+            statement = statement.on_conflict_do_update(
+                index_elements=["id"],
+                set_={column: statement.excluded[column] for column in ("modelo", "marca_id", "numero_puertas", "color")},
+            )
+            self.db.execute(statement, list(existentes.values()))
+        return sum(1 for linea, _ in rows if linea not in motivos)
+
+    def _write_propietarios(self, rows: List[Tuple[int, PropietarioImportacion]], motivos: Dict[int, str]) -> int:
+        """Crear relaciones vehículo-propietario ignorando las que ya existen"""
+        if not rows:
+            return 0
+
+        cedulas = {item.cedula for _, item in rows if item.persona_id is None}
+        persona_ids = {item.persona_id for _, item in rows if item.persona_id is not None}
+        vehiculo_ids = {item.vehiculo_id for _, item in rows}
+        personas_por_cedula = dict(self.db.execute(
+            select(Persona.cedula, Persona.id).where(Persona.cedula.in_(cedulas))
+        ).all()) if cedulas else {}
+        personas_existentes = set(self.db.scalars(
+            select(Persona.id).where(Persona.id.in_(persona_ids))
+        )) if persona_ids else set()
+        vehiculos_existentes = set(self.db.scalars(
+            select(Vehiculo.id).where(Vehiculo.id.in_(vehiculo_ids))
+        ))
+
+        links = set()
+        for linea, item in rows:
+            if item.vehiculo_id not in vehiculos_existentes:
+                motivos[linea] = "Vehículo no encontrado"
+                continue
+            if item.persona_id is not None:
+                persona_id = item.persona_id if item.persona_id in personas_existentes else None
+            else:
+                persona_id = personas_por_cedula.get(item.cedula)
+            if persona_id is None:
+                motivos[linea] = "Persona no encontrada"
+                continue
+            links.add((item.vehiculo_id, persona_id))
+
+        if links:
+            statement = dialect_insert(self.db, vehiculo_persona).on_conflict_do_nothing()
+            self.db.execute(statement, [
+                {"vehiculo_id": vehiculo_id, "persona_id": persona_id}
+                for vehiculo_id, persona_id in links
+            ])
+        return sum(1 for linea, _ in rows if linea not in motivos)
+
+    def result(self) -> ResultadoImportacion:
+        """Resumen de la importación"""
+        return ResultadoImportacion(
+            procesadas=self.procesadas,
+            importadas=self.importadas,
+            rechazadas=self.rechazadas,
+            lotes=self.lotes,
+            filas_rechazadas=self.filas_rechazadas,
+        )
+
+
+def import_records(
+    db: Session,
+    file: BinaryIO,
+    file_format: ExportFormat,
+    default_tipo: Optional[TipoRegistro] = None,
+    batch_size: int = 1000,
+) -> ResultadoImportacion:
+    """Importar todos los registros de `file` en lotes de `batch_size` filas"""
+    importer = Importer(db, batch_size, default_tipo)
+    for linea, record, error in iter_records(file, file_format):
+        importer.add(linea, record, error)
+    importer.flush()
+    return importer.result()
@@ -0,0 +1,48 @@
+"""
+Estrategias de carga ansiosa según el esquema de respuesta de cada endpoint.
+
+Las relaciones many-to-one (`Vehiculo.marca`) se cargan con `joinedload`, que
+agrega un JOIN sin multiplicar filas; las colecciones (`propietarios`, `vehiculos`)
+con `selectinload`, que emite una única consulta `IN (...)` por página en lugar de
+una consulta por fila. Así cada endpoint ejecuta un número fijo de consultas.
+"""
+from typing import List, Optional
+
+from sqlalchemy.orm import joinedload, selectinload
+
+from ..models.models import MarcaVehiculo, Persona, Vehiculo
+from ..schemas import schemas
+from .fields import FieldSet
+
+# Esquemas `Vehiculo` y `VehiculoConPropietarios`: marca y propietarios
+VEHICULO_LOAD_OPTIONS = (
+    joinedload(Vehiculo.marca),
+    selectinload(Vehiculo.propietarios),
+)
+
+# Campos y relaciones expandibles (`fields=` / `expand=`) de los endpoints de lectura
+MARCA_FIELDS = FieldSet(
+    MarcaVehiculo,
+    schemas.MarcaVehiculo,
+    relations={
+        "vehiculos": (selectinload(MarcaVehiculo.vehiculos), List[schemas.VehiculoResumen]),
+    },
+)
+
+PERSONA_FIELDS = FieldSet(
+    Persona,
+    schemas.Persona,
+    relations={
+        "vehiculos": (selectinload(Persona.vehiculos), List[schemas.VehiculoResumen]),
+    },
+)
+
+VEHICULO_FIELDS = FieldSet(
+    Vehiculo,
+    schemas.Vehiculo,
+    relations={
+        "marca": (VEHICULO_LOAD_OPTIONS[0], Optional[schemas.MarcaVehiculo]),
+        "propietarios": (VEHICULO_LOAD_OPTIONS[1], List[schemas.Persona]),
+    },
+    default_expand=("marca", "propietarios"),
+)
@@ -0,0 +1,124 @@
+"""
+Caché de lectura de marcas de vehículo por `id` y por `nombre_marca`.
+
+Las marcas casi nunca cambian, pero crear o actualizar un vehículo valida su
+`marca_id`, actualizar una marca necesita su nombre anterior y
+`GET /api/marcas-vehiculo/{id}` la lee completa. En un fallo la caché lee la marca de
+la base de datos y la guarda; los handlers de escritura de marcas invalidan sus
+entradas después del commit.
+
+Como en las demás cachés de lectura, cada entrada lleva la versión de la tabla
+`marca_vehiculo` (ver `app/utils/resource_cache.py`). En los GET esa versión ya está
+en la sesión; en las escrituras se lee de `version_tabla`, una consulta por clave
+primaria sobre una tabla mínima, para no validar un vehículo contra una marca que otro
+proceso acaba de eliminar.
+
+Solo se guardan marcas existentes (nunca "no existe"), así que una marca recién
+creada es visible de inmediato.
+"""
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..models.models import MarcaVehiculo as MarcaVehiculoModel
+from ..schemas.schemas import MarcaVehiculo
+from .cache import CacheBackend, CacheNamespace
+from .resource_cache import ResourceCache, cache_backend
+
+
+class MarcaCache(ResourceCache):
+    """Marcas guardadas como JSON del esquema `MarcaVehiculo`, por id y por nombre"""
+
+    def __init__(self, backend: CacheBackend):
+        super().__init__(backend, "marca", MarcaVehiculo, tables=("marca_vehiculo",))
+        self.by_nombre = CacheNamespace(backend, "marca-nombre")
+
+    def store(self, db_marca: MarcaVehiculoModel, version: str) -> bytes:
+        """Guardar `db_marca` bajo su id y su nombre"""
+        content = super().store(db_marca, version)
+        self.by_nombre.set(db_marca.nombre_marca, content, version)
+        return content
+
+    def _store(self, db_marca: Optional[MarcaVehiculoModel], version: str) -> Optional[MarcaVehiculo]:
+        if db_marca is None:
+            return None
+        return MarcaVehiculo.model_validate_json(self.store(db_marca, version))
+
+    @staticmethod
+    def _load(content: Optional[bytes]) -> Optional[MarcaVehiculo]:
+        return MarcaVehiculo.model_validate_json(content) if content is not None else None
+
+    def get(self, db: Session, marca_id: int) -> Optional[MarcaVehiculo]:
+        """Obtener la marca `marca_id`, leyéndola de la base de datos si no está en caché"""
+        version = self.version(db)
+        marca = self._load(self.get_json(marca_id, version))
+        if marca is None:
+            marca = self._store(db.get(MarcaVehiculoModel, marca_id), version)
+        return marca
+
+    def get_by_nombre(self, db: Session, nombre_marca: str) -> Optional[MarcaVehiculo]:
+        """Obtener la marca llamada `nombre_marca`, leyéndola de la base de datos si no está en caché"""
+        version = self.version(db)
+        marca = self._load(self.by_nombre.get(nombre_marca, version))
+        if marca is None:
+            marca = self._store(db.scalar(
+                select(MarcaVehiculoModel).where(MarcaVehiculoModel.nombre_marca == nombre_marca)
+            ), version)
+        return marca
+
+    async def astore(self, db_marca: MarcaVehiculoModel, version: str) -> bytes:
+        """Versión asíncrona de `store`"""
+        content = await super().astore(db_marca, version)
+        await self.by_nombre.aset(db_marca.nombre_marca, content, version)
+        return content
+
+    async def _astore(self, db_marca: Optional[MarcaVehiculoModel], version: str) -> Optional[MarcaVehiculo]:
+        if db_marca is None:
+            return None
+        return MarcaVehiculo.model_validate_json(await self.astore(db_marca, version))
+
+    async def aget(self, db: AsyncSession, marca_id: int) -> Optional[MarcaVehiculo]:
+        """Versión asíncrona de `get`"""
+        version = await self.aversion(db)
+        marca = self._load(await self.aget_json(marca_id, version))
+        if marca is None:
+            marca = await self._astore(await db.get(MarcaVehiculoModel, marca_id), version)
+        return marca
+
+    async def aget_by_nombre(self, db: AsyncSession, nombre_marca: str) -> Optional[MarcaVehiculo]:
+        """Versión asíncrona de `get_by_nombre`"""
+        version = await self.aversion(db)
+        marca = self._load(await self.by_nombre.aget(nombre_marca, version))
+        if marca is None:
+            marca = await self._astore(await db.scalar(
+                select(MarcaVehiculoModel).where(MarcaVehiculoModel.nombre_marca == nombre_marca)
+            ), version)
+        return marca
+
+    def invalidate(self, marca_id: Optional[int] = None, *nombres: str) -> None:
+        """Descartar las entradas de `marca_id` y de cada nombre en `nombres`"""
+        if marca_id is not None:
+            super().invalidate(marca_id)
+        if nombres:
+            self.by_nombre.delete(*nombres)
+
+    async def ainvalidate(self, marca_id: Optional[int] = None, *nombres: str) -> None:
+        """Versión asíncrona de `invalidate`"""
+        if marca_id is not None:
+            await super().ainvalidate(marca_id)
+        if nombres:
+            await self.by_nombre.adelete(*nombres)
+
+    def clear(self) -> None:
+        """Vaciar la caché (por ejemplo, tras escrituras masivas de marcas)"""
+        super().clear()
+        self.by_nombre.clear()
+
+    def stats(self) -> dict:
+        """Contadores de aciertos/fallos de cada índice"""
+        return {"por_id": self.by_id.stats(), "por_nombre": self.by_nombre.stats()}
+
+
+marca_cache = MarcaCache(cache_backend)
@@ -0,0 +1,317 @@
+"""
+Métricas de la aplicación en el formato de texto de Prometheus (`GET /metrics`).
+
+- **Peticiones**: número de peticiones y latencia por plantilla de ruta (p. ej.
+  `/api/vehiculos/{vehiculo_id}`, no la URL concreta), método y código de estado, y
+  peticiones en curso por método.
+- **Base de datos**: consultas y segundos de base de datos por petición, medidos con
+  los eventos `before_cursor_execute`/`after_cursor_execute` del engine (ver
+  `app/database/database.py`), la duración de cada consulta y la espera para obtener
+  una conexión del pool.
+- **Cachés**: aciertos, fallos y proporción de aciertos de cada caché de lectura, leídos
+  al consultar `/metrics`.
+
+Las métricas viven en la memoria del proceso: con varios workers cada uno publica las
+suyas y Prometheus debe consultar cada proceso (o agregarlas por instancia).
+"""
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Publicar `/metrics` y medir las peticiones
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Tipo de contenido del formato de texto de Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Límites de los histogramas (segundos): los de Prometheus para las peticiones y otros
+# más finos para las consultas, que en SQLite suelen durar menos de un milisegundo
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+QUERY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Etiqueta `route` de las peticiones que no corresponden a ninguna ruta (404)
+UNMATCHED_ROUTE = "sin_ruta"
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_sample(name: str, labels: Dict[str, str], value: float) -> str:
+    if labels:
+        pairs = ",".join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+        return f"{name}{{{pairs}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+
+class Metric:
+    """Métrica con etiquetas; cada combinación de valores de `labelnames` es una serie"""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} espera las etiquetas {self.labelnames}, no {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            series = list(self._series.items())
+        for key, value in series:
+            yield self.name, self._labels(key), value
+
+
+class Counter(Metric):
+    """Contador que solo crece"""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._series.get(self._key(labels), 0)
+
+
+class Gauge(Counter):
+    """Valor que sube y baja"""
+
+    type = "gauge"
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = value
+
+
+class Histogram(Metric):
+    """Distribución de observaciones en intervalos acumulados (`le`), con suma y conteo"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = REQUEST_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Conteo por intervalo (no acumulado), suma y número de observaciones
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observar los segundos que tarda el bloque `with`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series[2] if series else 0
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            series = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        for key, counts, total, count in series:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+class Registry:
+    """Métricas de la aplicación y funciones que generan métricas al exportarlas"""
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+        self._collectors: List[Callable[[], Iterable[Metric]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, collect: Callable[[], Iterable[Metric]]) -> Callable[[], Iterable[Metric]]:
+        """Registrar `collect`, que construye métricas con valores leídos en cada exportación"""
+        self._collectors.append(collect)
+        return collect
+
+    def collect(self) -> Iterator[Metric]:
+        yield from self._metrics
+        for collect in self._collectors:
+            yield from collect()
+
+    def render(self) -> str:
+        """Todas las métricas en el formato de texto de Prometheus"""
+        lines = []
+        for metric in self.collect():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(_format_sample(*sample) for sample in metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "Peticiones HTTP atendidas", ("method", "route", "status")
+))
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Duración de las peticiones HTTP, cuerpo incluido", ("method", "route")
+))
+HTTP_REQUESTS_IN_PROGRESS = REGISTRY.register(Gauge(
+    "http_requests_in_progress", "Peticiones HTTP en curso", ("method",)
+))
+HTTP_REQUEST_DB_QUERIES = REGISTRY.register(Histogram(
+    "http_request_db_queries", "Consultas a la base de datos por petición", ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS,
+))
+HTTP_REQUEST_DB_DURATION = REGISTRY.register(Histogram(
+    "http_request_db_duration_seconds", "Segundos de consultas a la base de datos por petición", ("method", "route"),
+    buckets=QUERY_BUCKETS,
+))
+DB_QUERY_DURATION = REGISTRY.register(Histogram(
+    "db_query_duration_seconds", "Duración de cada consulta a la base de datos", buckets=QUERY_BUCKETS
+))
+DB_POOL_CHECKOUT = REGISTRY.register(Histogram(
+    "db_pool_checkout_seconds", "Espera para obtener una conexión del pool al iniciar una petición",
+    buckets=QUERY_BUCKETS,
+))
+
+
+class RequestQueries:
+    """Consultas a la base de datos de la petición en curso"""
+
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# Contadores de la petición en curso; los handlers síncronos los ven porque el
+# threadpool copia el contexto de la petición
+_request_queries: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+
+def record_query(seconds: float) -> None:
+    """Registrar una consulta de `seconds` segundos (y sumarla a la petición en curso)"""
+    DB_QUERY_DURATION.observe(seconds)
+    queries = _request_queries.get()
+    if queries is not None:
+        queries.count += 1
+        queries.seconds += seconds
+
+
+def route_template(scope: Scope) -> str:
+    """Plantilla de la ruta que atendió la petición (`UNMATCHED_ROUTE` si ninguna)"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que mide cada petición HTTP: conteo, latencia, consultas y peticiones en curso"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        queries = RequestQueries()
+        token = _request_queries.set(queries)
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc(method=method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_REQUESTS_IN_PROGRESS.dec(method=method)
+            _request_queries.reset(token)
+            route = route_template(scope)
+            HTTP_REQUESTS.inc(method=method, route=route, status=str(status))
+            HTTP_REQUEST_DURATION.observe(elapsed, method=method, route=route)
+            HTTP_REQUEST_DB_QUERIES.observe(queries.count, method=method, route=route)
+            HTTP_REQUEST_DB_DURATION.observe(queries.seconds, method=method, route=route)
+
+
+def cache_collector(caches: Dict[str, object]) -> Callable[[], List[Metric]]:
+    """
+    Colector de aciertos, fallos y proporción de aciertos de `caches` (nombre de la
+    etiqueta `cache` -> `CacheNamespace`), leídos de `stats()` en cada exportación.
+    """
+
+    def collect() -> List[Metric]:
+        hits = Counter("cache_hits_total", "Aciertos de las cachés de lectura", ("cache",))
+        misses = Counter("cache_misses_total", "Fallos de las cachés de lectura", ("cache",))
+        ratio = Gauge("cache_hit_ratio", "Proporción de aciertos de las cachés de lectura", ("cache",))
+        for name, cache in caches.items():
+            stats = cache.stats()
+            hits.inc(stats["hits"], cache=name)
+            misses.inc(stats["misses"], cache=name)
+            ratio.set(stats["hit_ratio"], cache=name)
+        return [hits, misses, ratio]
+
+    return collect
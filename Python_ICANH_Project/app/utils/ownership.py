@@ -0,0 +1,81 @@
+"""
+Consultas y escrituras sobre la tabla `vehiculo_persona` (propietarios de vehículos).
+
+- Lectura: los propietarios de un vehículo y los vehículos de una persona se leen
+  por páginas recorriendo `vehiculo_persona` en el orden de su índice, en lugar de
+  cargar la colección completa en la respuesta.
+- Escritura: cada operación en lote es una sola sentencia basada en conjuntos: un
+  `INSERT ... ON CONFLICT DO NOTHING` con todas las parejas o un `DELETE` con
+  `(vehiculo_id, persona_id) IN (...)`, sin cargar las colecciones ni recorrerlas en Python.
+"""
+from typing import Sequence, Tuple
+
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.orm import Session
+
+from ..models.models import Persona, Vehiculo, vehiculo_persona
+from ..schemas.schemas import ResultadoAsignacionMasiva
+from .loading import VEHICULO_LOAD_OPTIONS
+from .sql import dialect_insert
+
+# Orden de las páginas: la columna de `vehiculo_persona` que sigue al filtro en su índice.
+# En la fila devuelta coincide con el `id` de la entidad, que es lo que guarda el cursor.
+PROPIETARIOS_ORDER = (vehiculo_persona.c.persona_id,)
+VEHICULOS_ORDER = (vehiculo_persona.c.vehiculo_id,)
+PROPIETARIOS_CURSOR = (Persona.id,)
+VEHICULOS_CURSOR = (Vehiculo.id,)
+
+# Pareja (vehiculo_id, persona_id)
+Ownership = Tuple[int, int]
+
+
+def add_ownership_statement(db: Session, vehiculo_id: int, persona_id: int):
+    """
+    `INSERT ... ON CONFLICT DO NOTHING` de una relación: si ya existe (por ejemplo, la
+    creó una petición concurrente) la sentencia no afecta filas en lugar de violar la
+    clave primaria de `vehiculo_persona`.
+    """
+    return dialect_insert(db, vehiculo_persona).values(
+        vehiculo_id=vehiculo_id, persona_id=persona_id
+    ).on_conflict_do_nothing()
+
+
+def add_ownerships(db: Session, pairs: Sequence[Ownership]) -> ResultadoAsignacionMasiva:
+    """Crear las relaciones de `pairs`, ignorando las que ya existen"""
+    rows = [{"vehiculo_id": vehiculo_id, "persona_id": persona_id} for vehiculo_id, persona_id in pairs]
+    statement = dialect_insert(db, vehiculo_persona).values(rows).on_conflict_do_nothing()
+    created = db.execute(statement).rowcount
+    db.commit()
+    return ResultadoAsignacionMasiva(solicitados=len(pairs), modificados=created, sin_cambios=len(pairs) - created)
+
+
+def remove_ownerships(db: Session, pairs: Sequence[Ownership]) -> ResultadoAsignacionMasiva:
+    """Eliminar las relaciones de `pairs`; las que no existen se ignoran"""
+    columns = tuple_(vehiculo_persona.c.vehiculo_id, vehiculo_persona.c.persona_id)
+    removed = db.execute(delete(vehiculo_persona).where(columns.in_(list(pairs)))).rowcount
+    db.commit()
+    return ResultadoAsignacionMasiva(solicitados=len(pairs), modificados=removed, sin_cambios=len(pairs) - removed)
+
+
+def propietarios_statement(vehiculo_id: int):
+    """Personas propietarias de `vehiculo_id`, leídas a través de `vehiculo_persona`"""
+    return (
+        select(Persona)
+        .join(vehiculo_persona, vehiculo_persona.c.persona_id == Persona.id)
+        .where(vehiculo_persona.c.vehiculo_id == vehiculo_id)
+    )
+
+
+def vehiculos_statement(persona_id: int):
+    """Vehículos de `persona_id` (con su marca y propietarios), leídos a través de `vehiculo_persona`"""
+    return (
+        select(Vehiculo)
+        .join(vehiculo_persona, vehiculo_persona.c.vehiculo_id == Vehiculo.id)
+        .where(vehiculo_persona.c.persona_id == persona_id)
+        .options(*VEHICULO_LOAD_OPTIONS)
+    )
+
+
+def count_statement(column, value: int):
+    """`SELECT count(*)` de las relaciones de `vehiculo_persona` con `column == value`"""
+    return select(func.count()).select_from(vehiculo_persona).where(column == value)
@@ -0,0 +1,124 @@
+import base64
+import binascii
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+# Header en el que se devuelve el cursor de la siguiente página
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort: str, values: Sequence[Any]) -> str:
+    """Codificar un cursor opaco a partir de la clave de orden y los valores de la última fila"""
+    payload = json.dumps({"k": sort, "v": list(values)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, size: int) -> List[Any]:
+    """
+    Decodificar un cursor opaco y validar que corresponda a la clave de orden solicitada.
+
+    Lanza un error 400 si el cursor está malformado o fue generado para otro orden.
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        values = payload["v"]
+        valid = payload["k"] == sort and isinstance(values, list) and len(values) == size
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        valid = False
+    if not valid:
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+    return values
+
+
+def keyset_condition(columns: Sequence[Any], values: Sequence[Any], descending: bool = False):
+    """
+    Construir la condición WHERE que selecciona las filas posteriores a `values`
+    según el orden lexicográfico de `columns`.
+
+    Para (a, b) genera: a > va OR (a = va AND b > vb), que el motor resuelve
+    como un rango sobre el índice en lugar de recorrer las filas anteriores.
+    """
+    clauses = []
+    for position, column in enumerate(columns):
+        equal = [columns[i] == values[i] for i in range(position)]
+        after = column < values[position] if descending else column > values[position]
+        clauses.append(and_(*equal, after))
+    return or_(*clauses)
+
+
+def paginate_statement(
+    statement,
+    columns: Sequence[Any],
+    sort: str = "id",
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    descending: bool = False,
+):
+    """
+    Aplicar orden, cursor (o desplazamiento) y límite a una consulta `Query` o `select()`.
+
+    Se pide una fila extra para que `split_page` sepa si existe una página siguiente.
+    """
+    order = [column.desc() if descending else column.asc() for column in columns]
+    statement = statement.order_by(*order)
+
+    if cursor:
+        values = decode_cursor(cursor, sort, len(columns))
+        statement = statement.filter(keyset_condition(columns, values, descending))
+    elif skip:
+        statement = statement.offset(skip)
+
+    return statement.limit(max(limit, 0) + 1)
+
+
+def split_page(
+    rows: Sequence[Any],
+    columns: Sequence[Any],
+    sort: str = "id",
+    limit: int = 100,
+) -> Tuple[list, Optional[str]]:
+    """Separar la fila extra de `paginate_statement` y calcular el cursor siguiente"""
+    rows = list(rows)
+    if limit <= 0 or len(rows) <= limit:
+        return rows[:max(limit, 0)], None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    next_cursor = encode_cursor(sort, [getattr(last, column.key) for column in columns])
+    return rows, next_cursor
+
+
+def paginate(
+    query: Query,
+    columns: Sequence[Any],
+    sort: str = "id",
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    descending: bool = False,
+) -> Tuple[list, Optional[str]]:
+    """
+    Paginar una consulta ORM por cursor (keyset) o por desplazamiento.
+
+    - **columns**: Columnas de orden; la última debe ser única (normalmente el `id`)
+    - **sort**: Nombre de la clave de orden que se guarda dentro del cursor
+    - **cursor**: Cursor opaco devuelto por la página anterior; si se envía, `skip` se ignora
+    - **skip**/**limit**: Paginación clásica por desplazamiento
+
+    Retorna las filas de la página y el cursor de la página siguiente
+    (`None` cuando no hay más resultados).
+    """
+    query = paginate_statement(query, columns, sort, cursor, skip, limit, descending)
+    return split_page(query.all(), columns, sort, limit)
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    """Publicar el cursor de la siguiente página en los headers de la respuesta"""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
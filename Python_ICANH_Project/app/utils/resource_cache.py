@@ -0,0 +1,120 @@
+"""
+Caché de las respuestas de lectura de un recurso por id (`GET /api/<recurso>/{id}`).
+
+Guarda el JSON ya serializado con el esquema de respuesta, así que un acierto se
+responde sin consultar la base de datos ni construir objetos. Los handlers de
+escritura invalidan las entradas afectadas después del commit; con el backend
+`redis` la invalidación es visible para todos los workers.
+
+Invalidar no basta cuando una lectura concurrente carga el recurso antes de un commit
+y lo guarda después de la invalidación. Por eso cada entrada lleva la versión de las
+tablas de las que depende el recurso (`app/database/versioning.py`), leída antes de
+cargarlo, y solo se sirve mientras esa versión sea la actual. En los GET la versión
+es la que ya leyó la caché HTTP para el ETag, sin otra consulta. Como la versión es
+por tabla, cualquier escritura en una de esas tablas descarta todas las entradas del
+recurso, también las escritas por otros procesos.
+"""
+from typing import Any, Hashable, Optional, Sequence, Type
+
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..database.versioning import session_table_versions
+from ..models.models import Vehiculo as VehiculoModel, vehiculo_persona
+from ..schemas.schemas import Persona, Vehiculo
+from .cache import CacheBackend, CacheNamespace, build_cache_backend
+
+
+class ResourceCache:
+    """
+    Respuestas JSON de un recurso guardadas bajo `namespace:<id>`.
+
+    - **tables**: Tablas de las que se construye la respuesta; su versión valida cada entrada
+    """
+
+    def __init__(self, backend: CacheBackend, namespace: str, schema: Type[BaseModel], tables: Sequence[str]):
+        self.schema = schema
+        self.tables = tuple(tables)
+        self.by_id = CacheNamespace(backend, namespace)
+
+    def version(self, db: Session) -> str:
+        """
+        Versión actual de las tablas del recurso, con la que se leen y guardan las entradas.
+
+        Debe obtenerse antes de cargar el recurso: así una entrada nunca lleva una
+        versión posterior a los datos con los que se construyó. Es `""` en los motores
+        sin versiones de tabla, donde solo cuenta la invalidación.
+        """
+        versions = session_table_versions(db, self.tables)
+        if versions is None:
+            return ""
+        return ",".join(f"{table}:{versions.get(table)}" for table in self.tables)
+
+    async def aversion(self, db: AsyncSession) -> str:
+        """Versión asíncrona de `version`"""
+        return await db.run_sync(self.version)
+
+    def get_json(self, resource_id: Hashable, version: str) -> Optional[bytes]:
+        """JSON guardado para `resource_id` con `version`, o `None` si no está en caché"""
+        return self.by_id.get(resource_id, version)
+
+    def serialize(self, db_object: Any) -> bytes:
+        """JSON de `db_object` con el esquema del recurso"""
+        return self.schema.model_validate(db_object).model_dump_json().encode()
+
+    def store(self, db_object: Any, version: str) -> bytes:
+        """Serializar `db_object`, cargado con las tablas en `version`, y guardarlo"""
+        content = self.serialize(db_object)
+        self.by_id.set(db_object.id, content, version)
+        return content
+
+    def invalidate(self, *resource_ids: Hashable) -> None:
+        """Descartar las entradas de `resource_ids`"""
+        if resource_ids:
+            self.by_id.delete(*resource_ids)
+
+    async def aget_json(self, resource_id: Hashable, version: str) -> Optional[bytes]:
+        """Versión asíncrona de `get_json`"""
+        return await self.by_id.aget(resource_id, version)
+
+    async def astore(self, db_object: Any, version: str) -> bytes:
+        """Versión asíncrona de `store`"""
+        content = self.serialize(db_object)
+        await self.by_id.aset(db_object.id, content, version)
+        return content
+
+    async def ainvalidate(self, *resource_ids: Hashable) -> None:
+        """Versión asíncrona de `invalidate`"""
+        if resource_ids:
+            await self.by_id.adelete(*resource_ids)
+
+    def clear(self) -> None:
+        """Descartar todas las entradas del recurso"""
+        self.by_id.clear()
+
+    def stats(self) -> dict:
+        return {"por_id": self.by_id.stats()}
+
+
+def vehiculos_de_marca(marca_id: int):
+    """Consulta de los ids de vehículo cuya respuesta incluye la marca `marca_id`"""
+    return select(VehiculoModel.id).where(VehiculoModel.marca_id == marca_id)
+
+
+def vehiculos_de_persona(persona_id: int):
+    """Consulta de los ids de vehículo cuya respuesta incluye a la persona `persona_id`"""
+    return select(vehiculo_persona.c.vehiculo_id).where(vehiculo_persona.c.persona_id == persona_id)
+
+
+# Backend compartido por todas las cachés (CACHE_BACKEND=memory|redis)
+cache_backend = build_cache_backend()
+
+persona_cache = ResourceCache(cache_backend, "persona", Persona, tables=("persona",))
+
+# La respuesta de un vehículo incluye su marca y sus propietarios: también se invalida
+# al actualizar esa marca, esas personas o los propietarios del vehículo
+vehiculo_cache = ResourceCache(
+    cache_backend, "vehiculo", Vehiculo, tables=("vehiculo", "marca_vehiculo", "vehiculo_persona", "persona")
+)
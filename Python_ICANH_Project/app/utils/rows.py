@@ -0,0 +1,244 @@
+"""
+Respuestas de lectura construidas directamente desde filas SQL.
+
+Los listados completos (sin `fields` ni `expand`) y `GET /api/personas/{id}/vehiculos`
+seleccionan solo columnas de las tablas, sin crear objetos ORM ni registrarlos en el
+identity map de la sesión, y cada fila se convierte en un diccionario con la forma
+del esquema de respuesta.
+
+Cada esquema tiene un serializador precompilado: un `TypedDict` con los mismos campos
+que el esquema Pydantic, de modo que pydantic-core escribe el JSON desde los
+diccionarios sin validarlos ni construir instancias del modelo. Los datos vienen de
+nuestra propia base de datos y ya cumplen el esquema.
+
+Las relaciones se leen como con las opciones de `app/utils/loading.py`: la marca en el
+mismo SELECT (`LEFT OUTER JOIN`) y los propietarios con una consulta `IN (...)` por
+página. Con `ROW_RESPONSES=false` los endpoints vuelven a cargar objetos ORM.
+"""
+import os
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, Union, get_args, get_origin
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing_extensions import TypedDict
+
+from ..models.models import MarcaVehiculo, Persona, Vehiculo, vehiculo_persona
+from ..schemas import schemas
+from .fields import FieldSelection, json_response
+from .filters import Listing
+from .ownership import VEHICULOS_CURSOR, VEHICULOS_ORDER
+from .pagination import paginate_statement, split_page
+
+# Construir las respuestas de lectura desde filas SQL en lugar de objetos ORM
+ROW_RESPONSES = os.getenv("ROW_RESPONSES", "true").lower() == "true"
+
+_row_types: Dict[Type[BaseModel], Any] = {}
+
+
+def row_type(schema: Type[BaseModel]) -> Any:
+    """`TypedDict` con los campos de `schema` (los esquemas anidados también se convierten)"""
+    if schema not in _row_types:
+        fields = {name: _row_annotation(field.annotation) for name, field in schema.model_fields.items()}
+        _row_types[schema] = TypedDict(f"{schema.__name__}Fila", fields)
+    return _row_types[schema]
+
+
+def _row_annotation(annotation: Any) -> Any:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return row_type(annotation)
+    origin = get_origin(annotation)
+    if origin is Union:
+        return Union[tuple(_row_annotation(arg) for arg in get_args(annotation))]
+    if origin is list:
+        return List[_row_annotation(get_args(annotation)[0])]
+    return annotation
+
+
+def schema_columns(model: Any, schema: Type[BaseModel]) -> list:
+    """Columnas de `model` que son campos de `schema`, en el orden de los campos del esquema"""
+    table = model.__table__
+    return [table.c[name] for name in schema.model_fields if name in table.c]
+
+
+class RowSerializer:
+    """Serializador JSON precompilado de `schema` para diccionarios de confianza"""
+
+    def __init__(self, schema: Type[BaseModel]):
+        self.schema = schema
+        self._one = TypeAdapter(row_type(schema))
+        self._many = TypeAdapter(List[row_type(schema)])
+
+    def dump(self, data: Union[dict, List[dict]]) -> bytes:
+        """JSON de `data` (un diccionario o una lista), sin validarlo"""
+        return (self._many if isinstance(data, list) else self._one).dump_json(data)
+
+    def render(self, data: Union[dict, List[dict]], response: Optional[Response] = None) -> Response:
+        """Respuesta JSON de `data` que conserva los headers ya fijados en `response`"""
+        return json_response(self.dump(data), response)
+
+
+class RowSource:
+    """Consulta de columnas de un recurso y conversión de sus filas a diccionarios"""
+
+    def __init__(self, model: Any, schema: Type[BaseModel]):
+        self.table = model.__table__
+        # En el orden del esquema, para que el JSON conserve el orden de campos de FastAPI
+        self.columns = schema_columns(model, schema)
+        self.serializer = RowSerializer(schema)
+
+    def select(self):
+        """SELECT de las columnas del recurso, sin filtros ni orden"""
+        return select(*self.columns)
+
+    def item(self, row: Any) -> dict:
+        return dict(row._mapping)
+
+    def related_statement(self, items: List[dict]):
+        """Consulta de las relaciones de `items` (`None` si el recurso no tiene)"""
+        return None
+
+    def attach(self, items: List[dict], related: Sequence[Any]) -> None:
+        pass
+
+    def build(self, db: Session, rows: Sequence[Any]) -> List[dict]:
+        """Diccionarios de `rows`, con sus relaciones leídas en una consulta adicional"""
+        items = [self.item(row) for row in rows]
+        statement = self.related_statement(items)
+        if statement is not None:
+            self.attach(items, db.execute(statement).all())
+        return items
+
+    async def abuild(self, db: AsyncSession, rows: Sequence[Any]) -> List[dict]:
+        """Versión asíncrona de `build`"""
+        items = [self.item(row) for row in rows]
+        statement = self.related_statement(items)
+        if statement is not None:
+            self.attach(items, (await db.execute(statement)).all())
+        return items
+
+    def _page_statement(self, listing: Listing, cursor: Optional[str], skip: int, limit: int):
+        return paginate_statement(
+            listing.where(self.select()), listing.columns, listing.sort,
+            cursor=cursor, skip=skip, limit=limit, descending=listing.descending
+        )
+
+    def page(
+        self, db: Session, listing: Listing, cursor: Optional[str], skip: int, limit: int
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Página de `listing` como diccionarios y cursor de la página siguiente"""
+        rows = db.execute(self._page_statement(listing, cursor, skip, limit)).all()
+        rows, next_cursor = split_page(rows, listing.columns, listing.sort, limit)
+        return self.build(db, rows), next_cursor
+
+    async def apage(
+        self, db: AsyncSession, listing: Listing, cursor: Optional[str], skip: int, limit: int
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Versión asíncrona de `page`"""
+        rows = (await db.execute(self._page_statement(listing, cursor, skip, limit))).all()
+        rows, next_cursor = split_page(rows, listing.columns, listing.sort, limit)
+        return await self.abuild(db, rows), next_cursor
+
+    def render(self, items: List[dict], response: Optional[Response] = None) -> Response:
+        return self.serializer.render(items, response)
+
+
+class VehiculoRows(RowSource):
+    """Vehículos con su marca (en el mismo SELECT) y sus propietarios"""
+
+    _MARCA = "marca__"
+
+    def __init__(self):
+        super().__init__(Vehiculo, schemas.Vehiculo)
+        self.marca = MarcaVehiculo.__table__
+        self.marca_columns = schema_columns(MarcaVehiculo, schemas.MarcaVehiculo)
+        self.persona = Persona.__table__
+        self.persona_columns = schema_columns(Persona, schemas.Persona)
+
+    def select(self):
+        marca_columns = (column.label(f"{self._MARCA}{column.name}") for column in self.marca_columns)
+        return select(*self.columns, *marca_columns).outerjoin(self.marca, self.marca.c.id == self.table.c.marca_id)
+
+    def item(self, row: Any) -> dict:
+        mapping = row._mapping
+        item = {column.name: mapping[column.name] for column in self.columns}
+        marca_id = mapping[f"{self._MARCA}id"]
+        item["marca"] = None if marca_id is None else {
+            column.name: mapping[f"{self._MARCA}{column.name}"] for column in self.marca_columns
+        }
+        item["propietarios"] = []
+        return item
+
+    def related_statement(self, items: List[dict]):
+        if not items:
+            return None
+        return (
+            select(vehiculo_persona.c.vehiculo_id, *self.persona_columns)
+            .join(self.persona, self.persona.c.id == vehiculo_persona.c.persona_id)
+            .where(vehiculo_persona.c.vehiculo_id.in_([item["id"] for item in items]))
+            .order_by(vehiculo_persona.c.vehiculo_id, vehiculo_persona.c.persona_id)
+        )
+
+    def attach(self, items: List[dict], related: Sequence[Any]) -> None:
+        propietarios = defaultdict(list)
+        for row in related:
+            propietarios[row.vehiculo_id].append({column.name: row._mapping[column] for column in self.persona_columns})
+        for item in items:
+            item["propietarios"] = propietarios.get(item["id"], [])
+
+    def of_persona(self, persona_id: int):
+        """Vehículos de `persona_id`, leídos a través de `vehiculo_persona` (sin orden)"""
+        return (
+            self.select()
+            .join(vehiculo_persona, vehiculo_persona.c.vehiculo_id == self.table.c.id)
+            .where(vehiculo_persona.c.persona_id == persona_id)
+        )
+
+
+MARCA_ROWS = RowSource(MarcaVehiculo, schemas.MarcaVehiculo)
+PERSONA_ROWS = RowSource(Persona, schemas.Persona)
+VEHICULO_ROWS = VehiculoRows()
+PERSONA_CON_VEHICULOS_JSON = RowSerializer(schemas.PersonaConVehiculos)
+
+
+def _persona_statement(persona_id: int):
+    return PERSONA_ROWS.select().where(Persona.id == persona_id)
+
+
+def _vehiculos_statement(persona_id: int, cursor: Optional[str], skip: int, limit: int):
+    return paginate_statement(VEHICULO_ROWS.of_persona(persona_id), VEHICULOS_ORDER, cursor=cursor, skip=skip, limit=limit)
+
+
+def persona_con_vehiculos(
+    db: Session, persona_id: int, cursor: Optional[str], skip: int, limit: int
+) -> Tuple[Optional[dict], Optional[str]]:
+    """
+    Persona con una página de sus vehículos (esquema `PersonaConVehiculos`) y cursor de
+    la página siguiente; `(None, None)` si la persona no existe.
+    """
+    persona = db.execute(_persona_statement(persona_id)).first()
+    if persona is None:
+        return None, None
+    rows = db.execute(_vehiculos_statement(persona_id, cursor, skip, limit)).all()
+    rows, next_cursor = split_page(rows, VEHICULOS_CURSOR, limit=limit)
+    return {**persona._mapping, "vehiculos": VEHICULO_ROWS.build(db, rows)}, next_cursor
+
+
+async def apersona_con_vehiculos(
+    db: AsyncSession, persona_id: int, cursor: Optional[str], skip: int, limit: int
+) -> Tuple[Optional[dict], Optional[str]]:
+    """Versión asíncrona de `persona_con_vehiculos`"""
+    persona = (await db.execute(_persona_statement(persona_id))).first()
+    if persona is None:
+        return None, None
+    rows = (await db.execute(_vehiculos_statement(persona_id, cursor, skip, limit))).all()
+    rows, next_cursor = split_page(rows, VEHICULOS_CURSOR, limit=limit)
+    return {**persona._mapping, "vehiculos": await VEHICULO_ROWS.abuild(db, rows)}, next_cursor
+
+
+def use_rows(selection: FieldSelection) -> bool:
+    """Si la petición se responde desde filas SQL (respuesta completa, sin `fields`/`expand`)"""
+    return ROW_RESPONSES and not selection.partial
@@ -0,0 +1,47 @@
+from typing import Any, Dict
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+# Constructores de INSERT con soporte de ON CONFLICT por motor
+DIALECT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+def dialect_insert(db: Session, table: Any):
+    """
+    Crear un INSERT específico del motor de `db` que admite `on_conflict_do_update`
+    y `on_conflict_do_nothing` (upsert e insert-or-ignore en una sola sentencia).
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect not in DIALECT_INSERTS:
+        raise NotImplementedError(f"ON CONFLICT no está soportado para '{dialect}'")
+    return DIALECT_INSERTS[dialect](table)
+
+
+def insert_returning(model: Any, values: Dict[str, Any]):
+    """
+    `INSERT ... RETURNING` de todas las columnas de `model`: la fila creada se obtiene
+    en la misma ida a la base de datos, sin `SELECT` previo ni `refresh` posterior.
+
+    Las restricciones únicas se validan en la propia sentencia; el llamador convierte
+    el `IntegrityError` en la respuesta de error correspondiente.
+    """
+    table = model.__table__
+    return insert(table).values(**values).returning(*table.c)
+
+
+def update_returning(model: Any, model_id: int, values: Dict[str, Any]):
+    """
+    `UPDATE ... WHERE id = model_id RETURNING` de todas las columnas de `model`.
+
+    Sin `values` se devuelve un `SELECT` de la fila, de modo que el resultado siempre
+    es la fila actual (o ninguna si `model_id` no existe).
+    """
+    table = model.__table__
+    if not values:
+        return select(*table.c).where(table.c.id == model_id)
+    return update(table).where(table.c.id == model_id).values(**values).returning(*table.c)
@@ -0,0 +1,119 @@
+"""
+Total de resultados de los listados (`include_total=true`).
+
+El total se publica en el header `X-Total-Count` sin ejecutar `COUNT(*)` siempre que se
+pueda:
+
+- **Sin filtros**: se lee el contador de `conteo_tabla` (una consulta por clave primaria).
+- **Vehículos filtrados por marca, color o puertas**: se suma el resumen `resumen_vehiculo`,
+  cuyo costo depende del número de combinaciones y no del de vehículos.
+- **Otros filtros**: `COUNT(*)` sobre los índices de los filtros; en modo estimado (o en
+  modo `auto` sobre tablas de más de `TOTAL_ESTIMATE_THRESHOLD` filas) se cuenta como
+  máximo hasta `TOTAL_COUNT_CAP` y, si se alcanza, se publica una estimación
+  (la del planificador en PostgreSQL, el propio tope en los demás motores) junto con
+  `X-Total-Count-Estimated: true`.
+"""
+import json
+import os
+from enum import Enum
+from typing import Optional, Tuple
+
+from fastapi import Query, Response
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..database.counts import read_row_count
+from ..database.stats import summary_conditions, uses_summary
+from ..models.models import ResumenVehiculo, Vehiculo
+from .filters import Listing
+
+# Headers en los que se devuelve el total
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_ESTIMATED_HEADER = "X-Total-Count-Estimated"
+
+# Filas que se cuentan como máximo antes de estimar
+TOTAL_COUNT_CAP = int(os.getenv("TOTAL_COUNT_CAP", "10000"))
+
+# Tamaño de tabla a partir del cual el modo "auto" estima los totales filtrados
+TOTAL_ESTIMATE_THRESHOLD = int(os.getenv("TOTAL_ESTIMATE_THRESHOLD", "100000"))
+
+
+class TotalMode(str, Enum):
+    auto = "auto"
+    exact = "exact"
+    estimate = "estimate"
+
+
+def planner_estimate(db: Session, statement) -> Optional[int]:
+    """Filas que el planificador de PostgreSQL estima para `statement` (`None` en otros motores)"""
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    sql = statement.compile(dialect=bind.dialect, compile_kwargs={"literal_binds": True})
+    plan = db.scalar(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class TotalCount:
+    """Total solicitado para un listado: si se publica y con qué modo se calcula"""
+
+    def __init__(self, include: bool, mode: TotalMode = TotalMode.auto):
+        self.include = include
+        self.mode = mode
+
+    def count(self, db: Session, listing: Listing) -> Tuple[int, bool]:
+        """Total de filas de `listing` y si es una estimación"""
+        model = listing.model
+        rows = read_row_count(db, model.__tablename__)
+        if not listing.conditions:
+            if rows is None:
+                rows = db.scalar(select(func.count()).select_from(model))
+            return rows, False
+
+        if model is Vehiculo and uses_summary(db):
+            conditions = summary_conditions(listing.conditions)
+            if conditions is not None:
+                total = func.coalesce(func.sum(ResumenVehiculo.total), 0)
+                return db.scalar(select(total).where(*conditions)), False
+
+        matching = select(model.id).where(*listing.conditions)
+        estimate = self.mode == TotalMode.estimate or (
+            self.mode == TotalMode.auto and rows is not None and rows > TOTAL_ESTIMATE_THRESHOLD
+        )
+        if not estimate:
+            return db.scalar(select(func.count()).select_from(matching.subquery())), False
+
+        capped = db.scalar(select(func.count()).select_from(matching.limit(TOTAL_COUNT_CAP).subquery()))
+        if capped < TOTAL_COUNT_CAP:
+            return capped, False
+        return max(TOTAL_COUNT_CAP, planner_estimate(db, matching) or 0), True
+
+    @staticmethod
+    def _publish(response: Response, total: int, estimated: bool) -> None:
+        response.headers[TOTAL_COUNT_HEADER] = str(total)
+        if estimated:
+            response.headers[TOTAL_ESTIMATED_HEADER] = "true"
+
+    def apply(self, db: Session, listing: Listing, response: Response) -> None:
+        """Publicar el total de `listing` en `response` si se solicitó"""
+        if self.include:
+            self._publish(response, *self.count(db, listing))
+
+    async def aapply(self, db: AsyncSession, listing: Listing, response: Response) -> None:
+        """Versión de `apply` para una sesión asíncrona"""
+        if self.include:
+            self._publish(response, *await db.run_sync(self.count, listing))
+
+
+def total_count(
+    include_total: bool = Query(False, description=f"Publicar el total de resultados en `{TOTAL_COUNT_HEADER}`"),
+    total_mode: TotalMode = Query(
+        TotalMode.auto,
+        description="`exact` cuenta siempre, `estimate` estima los totales filtrados grandes "
+                    "y `auto` estima solo en tablas grandes",
+    ),
+) -> TotalCount:
+    """Total solicitado en los parámetros del listado"""
+    return TotalCount(include_total, total_mode)
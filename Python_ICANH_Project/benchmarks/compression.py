@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Medir el costo de CPU y los bytes ahorrados por cada codificación y nivel de compresión.
+
+Comprime tres cargas típicas de la API con los compresores de `app/utils/compression.py`
+(gzip siempre; br y zstd si están instalados `brotli` y `zstandard`):
+
+- `persona`: `GET /api/personas/{id}/vehiculos` con `--items` vehículos con marca y propietarios
+- `vehiculos`: `GET /api/vehiculos/` con `--items` vehículos
+- `export`: `GET /api/vehiculos/export` con `--export-rows` filas NDJSON, comprimidas en
+  bloques de 1000 filas como en el streaming
+
+    python benchmarks/compression.py --items 100 --export-rows 20000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.compression import CODECS
+from app.utils.export import EXPORT_BATCH_SIZE
+
+LEVELS = {"gzip": (1, 3, 4, 5, 6, 9), "br": (1, 4, 6, 9, 11), "zstd": (1, 3, 6, 9, 19)}
+
+NOMBRES = ["Ana", "Luis", "Marta", "Carlos", "Lucía", "Jorge", "Sofía", "Andrés", "Valentina", "Camilo"]
+APELLIDOS = ["Gómez", "Pérez", "Rodríguez", "Martínez", "García", "López", "Hernández", "Díaz", "Torres", "Ramírez"]
+MARCAS = [("Toyota", "Japón"), ("Renault", "Francia"), ("Chevrolet", "Estados Unidos"), ("Kia", "Corea del Sur"),
+          ("Mazda", "Japón"), ("Volkswagen", "Alemania"), ("Hyundai", "Corea del Sur"), ("Ford", "Estados Unidos")]
+COLORES = ["Rojo", "Gris", "Blanco", "Negro", "Azul", "Plata", "Verde"]
+
+
+def persona(rng: random.Random, persona_id: int) -> dict:
+    nombre = f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}"
+    return {"nombre": nombre, "cedula": str(rng.randrange(10**9, 10**10)), "id": persona_id}
+
+
+def vehiculo(rng: random.Random, vehiculo_id: int, owners: int) -> dict:
+    marca_id = rng.randrange(len(MARCAS))
+    nombre_marca, pais = MARCAS[marca_id]
+    return {
+        "modelo": f"Modelo {rng.randrange(1000)}", "marca_id": marca_id + 1,
+        "numero_puertas": rng.randint(2, 5), "color": rng.choice(COLORES), "id": vehiculo_id,
+        "marca": {"nombre_marca": nombre_marca, "pais": pais, "id": marca_id + 1},
+        "propietarios": [persona(rng, rng.randrange(1, 10**5)) for _ in range(owners)],
+    }
+
+
+def payloads(items: int, export_rows: int):
+    """Cuerpos completos y bloques de la exportación en streaming"""
+    rng = random.Random(42)
+    vehiculos = [vehiculo(rng, i, rng.randint(1, 3)) for i in range(1, items + 1)]
+    dumps = lambda data: json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+    lines = [
+        json.dumps({key: value for key, value in vehiculo(rng, i, 0).items() if key not in ("marca", "propietarios")},
+                   ensure_ascii=False) + "\n"
+        for i in range(1, export_rows + 1)
+    ]
+    export = ["".join(lines[i:i + EXPORT_BATCH_SIZE]).encode() for i in range(0, len(lines), EXPORT_BATCH_SIZE)]
+    return {
+        "persona": [dumps({**persona(rng, 1), "vehiculos": vehiculos})],
+        "vehiculos": [dumps(vehiculos)],
+        "export": export,
+    }
+
+
+def compress(codec, level: int, chunks) -> int:
+    """Bytes comprimidos de `chunks`, vaciando el compresor después de cada bloque"""
+    stream = codec(level)
+    return sum(len(stream.compress(chunk, finish=index == len(chunks) - 1)) for index, chunk in enumerate(chunks))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--export-rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    print(f"Codificaciones disponibles: {', '.join(CODECS)}")
+    for name, chunks in payloads(args.items, args.export_rows).items():
+        size = sum(len(chunk) for chunk in chunks)
+        print(f"\n{name}: {size / 1024:.1f} KiB en {len(chunks)} bloque(s)")
+        print(f"  {'codificación':14} {'nivel':>5} {'KiB':>9} {'ahorro':>7} {'ms':>8} {'MiB/s':>8}")
+        for encoding, codec in CODECS.items():
+            for level in LEVELS[encoding]:
+                compressed = compress(codec, level, chunks)
+                seconds = min(timeit.repeat(lambda: compress(codec, level, chunks), number=args.repeat, repeat=3))
+                seconds /= args.repeat
+                print(
+                    f"  {encoding:14} {level:5} {compressed / 1024:9.1f} {1 - compressed / size:7.1%} "
+                    f"{seconds * 1000:8.2f} {size / seconds / 2**20:8.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Comparar una página de `GET /api/vehiculos/` leída como objetos ORM y como filas SQL
+(`ROW_RESPONSES=true`).
+
+Mide la consulta, la carga de la marca y los propietarios y la serialización a JSON,
+sobre una base de datos SQLite en memoria con `--items` vehículos por página.
+
+    python benchmarks/rows.py --items 100 --repeat 100
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.models.models import Base, MarcaVehiculo, Persona, Vehiculo
+from app.schemas import schemas
+from app.utils.fields import dump_json
+from app.utils.filters import VEHICULO_SORTS
+from app.utils.loading import VEHICULO_LOAD_OPTIONS
+from app.utils.pagination import paginate
+from app.utils.rows import VEHICULO_ROWS
+
+
+def populate(session: Session, items: int, owners: int) -> None:
+    marcas = [MarcaVehiculo(nombre_marca=f"Marca {i}", pais="Colombia") for i in range(10)]
+    personas = [Persona(nombre=f"Persona {i}", cedula=str(1000 + i)) for i in range(owners * 10)]
+    session.add_all(marcas + personas)
+    session.flush()
+    session.add_all(
+        Vehiculo(
+            modelo=f"Modelo {i}", marca_id=marcas[i % 10].id, numero_puertas=4, color="Gris",
+            propietarios=[personas[(i + j) % len(personas)] for j in range(owners)],
+        )
+        for i in range(items)
+    )
+    session.commit()
+
+
+def orm_page(engine, listing, limit: int) -> bytes:
+    """Objetos ORM con `joinedload`/`selectinload` y `TypeAdapter.dump_json` (JSON_SERIALIZATION=direct)"""
+    with Session(engine) as session:
+        query = listing.apply(session.query(Vehiculo).options(*VEHICULO_LOAD_OPTIONS))
+        vehiculos, _ = paginate(query, listing.columns, listing.sort, limit=limit)
+        return dump_json(List[schemas.Vehiculo], vehiculos)
+
+
+def rows_page(engine, listing, limit: int) -> bytes:
+    """Filas SQL convertidas a diccionarios y serializador precompilado"""
+    with Session(engine) as session:
+        items, _ = VEHICULO_ROWS.page(session, listing, None, 0, limit)
+        return VEHICULO_ROWS.serializer.dump(items)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--owners", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        populate(session, args.items, args.owners)
+
+    listing = VEHICULO_SORTS.listing([], "id")
+    assert json.loads(orm_page(engine, listing, args.items)) == json.loads(rows_page(engine, listing, args.items))
+
+    candidates = {
+        "orm (objetos + dump_json)": lambda: orm_page(engine, listing, args.items),
+        "rows (filas + TypedDict)": lambda: rows_page(engine, listing, args.items),
+    }
+    print(f"{args.items} vehículos por página, {args.owners} propietarios cada uno, {args.repeat} repeticiones")
+    baseline = None
+    for name, function in candidates.items():
+        seconds = min(timeit.repeat(function, number=args.repeat, repeat=3)) / args.repeat
+        baseline = baseline or seconds
+        print(f"{name:28} {seconds * 1000:8.3f} ms/página  x{baseline / seconds:.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Comparar la serialización de un listado de vehículos con el `response_model` de FastAPI
+y con `TypeAdapter.dump_json` (`JSON_SERIALIZATION=direct`).
+
+Carga `--items` vehículos con su marca y `--owners` propietarios cada uno en una base de
+datos SQLite en memoria, como los devuelve `GET /api/vehiculos/`, y mide solo la
+serialización de la respuesta.
+
+    python benchmarks/serialization.py --items 100 --repeat 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import timeit
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.models.models import Base, MarcaVehiculo, Persona, Vehiculo
+from app.schemas import schemas
+from app.utils.fields import dump_json
+from app.utils.loading import VEHICULO_LOAD_OPTIONS
+
+
+def load_vehiculos(session: Session, items: int, owners: int) -> List[Vehiculo]:
+    marcas = [MarcaVehiculo(nombre_marca=f"Marca {i}", pais="Colombia") for i in range(10)]
+    personas = [Persona(nombre=f"Persona {i}", cedula=str(1000 + i)) for i in range(owners * 10)]
+    session.add_all(marcas + personas)
+    session.flush()
+    session.add_all(
+        Vehiculo(
+            modelo=f"Modelo {i}", marca_id=marcas[i % 10].id, numero_puertas=4, color="Gris",
+            propietarios=[personas[(i + j) % len(personas)] for j in range(owners)],
+        )
+        for i in range(items)
+    )
+    session.commit()
+    session.expunge_all()
+    return list(session.scalars(select(Vehiculo).options(*VEHICULO_LOAD_OPTIONS).order_by(Vehiculo.id)).unique())
+
+
+def fastapi_json(loop, field, vehiculos) -> bytes:
+    """Lo que hace FastAPI con `response_model`: validar, pasar a dict y `json.dumps`"""
+    content = loop.run_until_complete(serialize_response(field=field, response_content=vehiculos))
+    return JSONResponse(content).body
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--owners", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        vehiculos = load_vehiculos(session, args.items, args.owners)
+
+    loop = asyncio.new_event_loop()
+    field = create_model_field(name="Response", type_=List[schemas.Vehiculo], mode="serialization")
+    annotation = List[schemas.Vehiculo]
+    assert json.loads(fastapi_json(loop, field, vehiculos)) == json.loads(dump_json(annotation, vehiculos))
+
+    candidates = {
+        "fastapi (response_model)": lambda: fastapi_json(loop, field, vehiculos),
+        "direct (TypeAdapter.dump_json)": lambda: dump_json(annotation, vehiculos),
+    }
+    print(f"{args.items} vehículos, {args.owners} propietarios cada uno, {args.repeat} repeticiones")
+    baseline = None
+    for name, function in candidates.items():
+        seconds = min(timeit.repeat(function, number=args.repeat, repeat=3)) / args.repeat
+        baseline = baseline or seconds
+        print(f"{name:32} {seconds * 1000:8.3f} ms/respuesta  x{baseline / seconds:.2f}")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,14 +1,32 @@
+import logging
 import os
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.database.database import create_tables
-from app.routes import marca_vehiculo, persona, vehiculo
+from app.database.database import (
+    DATABASE_MODE,
+    create_tables,
+    dispose_async_engine,
+    log_database_settings,
+)
+from app.routes import aio, busqueda, estadisticas, importacion, marca_vehiculo, persona, vehiculo
+from app.utils.compression import CompressionMiddleware, compression_options, no_compression
+from app.utils.marca_cache import marca_cache
+from app.utils.metrics import CONTENT_TYPE, METRICS_ENABLED, REGISTRY, MetricsMiddleware, cache_collector
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.utils.resource_cache import persona_cache, vehiculo_cache
+from app.utils.totals import TOTAL_COUNT_HEADER, TOTAL_ESTIMATED_HEADER
 
 # Cargar variables de entorno
 load_dotenv()
 
+# Configurar logging desde variables de entorno
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format=os.getenv("LOG_FORMAT", "%(levelname)s:     %(asctime)s - %(name)s - %(message)s"),
+)
+
 # Crear la aplicación FastAPI con configuración desde variables de entorno
 app = FastAPI(
     title=os.getenv("APP_TITLE", "API de Gestión de Vehículos - ICANH"),
@@ -21,12 +39,21 @@ app = FastAPI(
     - **Gestión de Personas**: CRUD completo para personas con validación de cédula única
     - **Gestión de Vehículos**: CRUD completo con relación a marcas
     - **Relaciones Many-to-Many**: Gestión de propietarios de vehículos
+    - **Paginación por cursor**: Los listados devuelven el header `X-Next-Cursor`; envíalo como `?cursor=` para pedir la siguiente página
+    - **Totales**: Con `?include_total=true` los listados devuelven el header `X-Total-Count` sin recorrer la tabla
+    - **Caché HTTP**: Los GET devuelven `ETag`; con `If-None-Match` responden `304 Not Modified` si los datos no cambiaron
+    - **Respuestas parciales**: `?fields=` elige las columnas y `?expand=` las relaciones que se cargan y devuelven
+    - **Compresión**: Con `Accept-Encoding` las respuestas grandes y las exportaciones se envían comprimidas (gzip, br, zstd)
+    - **Métricas**: `GET /metrics` publica, en formato Prometheus, latencias y consultas por ruta, el pool y las cachés
 
     ## Endpoints disponibles:
 
     ### Marcas de Vehículo
     - `GET /api/marcas-vehiculo/` - Listar todas las marcas
     - `POST /api/marcas-vehiculo/` - Crear nueva marca
+    - `POST /api/marcas-vehiculo/bulk` - Crear marcas en lote
+    - `GET /api/marcas-vehiculo/export` - Exportar todas las marcas (NDJSON/CSV en streaming)
+    - `GET /api/marcas-vehiculo/cache/stats` - Estadísticas de la caché de marcas
     - `GET /api/marcas-vehiculo/{id}` - Obtener marca por ID
     - `PUT /api/marcas-vehiculo/{id}` - Actualizar marca
     - `DELETE /api/marcas-vehiculo/{id}` - Eliminar marca
@@ -34,6 +61,8 @@ app = FastAPI(
     ### Personas
     - `GET /api/personas/` - Listar todas las personas
     - `POST /api/personas/` - Crear nueva persona
+    - `POST /api/personas/bulk` - Crear personas en lote
+    - `GET /api/personas/export` - Exportar todas las personas (NDJSON/CSV en streaming)
     - `GET /api/personas/{id}` - Obtener persona por ID
     - `PUT /api/personas/{id}` - Actualizar persona
     - `DELETE /api/personas/{id}` - Eliminar persona
@@ -42,11 +71,23 @@ app = FastAPI(
     ### Vehículos
     - `GET /api/vehiculos/` - Listar todos los vehículos
     - `POST /api/vehiculos/` - Crear nuevo vehículo
+    - `POST /api/vehiculos/bulk` - Crear vehículos en lote
+    - `GET /api/vehiculos/export` - Exportar todos los vehículos (NDJSON/CSV en streaming)
+    - `GET /api/vehiculos/propietarios/export` - Exportar las relaciones vehículo-propietario (NDJSON/CSV en streaming)
     - `GET /api/vehiculos/{id}` - Obtener vehículo por ID
     - `PUT /api/vehiculos/{id}` - Actualizar vehículo
     - `DELETE /api/vehiculos/{id}` - Eliminar vehículo
     - `GET /api/vehiculos/{id}/propietarios/` - Obtener propietarios de un vehículo
     - `POST /api/vehiculos/{id}/propietarios/` - Asignar propietario a vehículo
+
+    ### Importación
+    - `POST /api/import` - Importar marcas, personas, vehículos y propietarios desde CSV/NDJSON
+
+    ### Búsqueda
+    - `GET /api/search?q=` - Buscar personas, vehículos y marcas por texto, ordenados por relevancia
+
+    ### Estadísticas
+    - `GET /api/stats/vehiculos/{marca|pais|color|puertas}` - Número de vehículos por grupo
     """),
     version=os.getenv("APP_VERSION", "1.0.0"),
     contact={
@@ -74,18 +115,63 @@ app.add_middleware(
     allow_credentials=os.getenv("ALLOW_CREDENTIALS", "True").lower() == "true",
     allow_methods=os.getenv("ALLOW_METHODS", "*").split(",") if os.getenv("ALLOW_METHODS", "*") != "*" else ["*"],
     allow_headers=os.getenv("ALLOW_HEADERS", "*").split(",") if os.getenv("ALLOW_HEADERS", "*") != "*" else ["*"],
+    # Headers de paginación y de caché que los clientes del navegador necesitan leer
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, TOTAL_ESTIMATED_HEADER, "ETag"],
 )
 
+# Comprimir las respuestas (gzip, y brotli/zstd si están instalados) según Accept-Encoding
+app.add_middleware(CompressionMiddleware, **compression_options())
+
+# Medir las peticiones para /metrics (el último middleware añadido es el más externo)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    REGISTRY.collector(cache_collector({
+        "persona": persona_cache.by_id,
+        "vehiculo": vehiculo_cache.by_id,
+        "marca": marca_cache.by_id,
+        "marca_nombre": marca_cache.by_nombre,
+    }))
+
+
+def include_routers(application: FastAPI, database_mode: str) -> None:
+    """
+    Incluir los routers de la API según el modo de base de datos.
+
+    En modo "async" cada router se combina con su versión asíncrona: las rutas CRUD
+    se atienden con handlers `async def` sin ocupar un hilo del threadpool, y las
+    rutas sin versión asíncrona siguen usando el engine síncrono.
+    """
+    routers = [
+        (marca_vehiculo.router, aio.marca_vehiculo.router),
+        (persona.router, aio.persona.router),
+        (vehiculo.router, aio.vehiculo.router),
+    ]
+    for sync_router, async_router in routers:
+        if database_mode == "async":
+            application.include_router(aio.merge_async_routes(sync_router, async_router))
+        else:
+            application.include_router(sync_router)
+
+    application.include_router(importacion.router)
+    application.include_router(busqueda.router)
+    application.include_router(estadisticas.router)
+
+
 # Incluir routers
-app.include_router(marca_vehiculo.router)
-app.include_router(persona.router)
-app.include_router(vehiculo.router)
+include_routers(app, DATABASE_MODE)
 
 
 @app.on_event("startup")
 def startup_event():
     """Crear las tablas de la base de datos al iniciar la aplicación"""
     create_tables()
+    log_database_settings()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Cerrar las conexiones del engine asíncrono al detener la aplicación"""
+    await dispose_async_engine()
 
 
 @app.get("/", summary="Bienvenida", tags=["General"])
@@ -104,6 +190,7 @@ def read_root():
 
 
 @app.get("/health", summary="Health Check", tags=["General"])
+@no_compression
 def health_check():
     """
     Endpoint para verificar el estado de la API.
@@ -111,3 +198,15 @@ def health_check():
     Retorna el estado actual del servicio.
     """
     return {"status": "healthy", "message": "API funcionando correctamente"}
+
+
+if METRICS_ENABLED:
+    @app.get("/metrics", summary="Métricas", tags=["General"])
+    def metrics():
+        """
+        Métricas de la aplicación en el formato de texto de Prometheus.
+
+        Peticiones y latencia por ruta, peticiones en curso, consultas y tiempo de base de
+        datos por petición, espera del pool de conexiones y aciertos de las cachés.
+        """
+        return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
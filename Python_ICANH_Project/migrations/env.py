@@ -0,0 +1,74 @@
+"""
+Entorno de Alembic.
+
+La URL se resuelve en este orden: la conexión recibida en `config.attributes`
+(la usa `app.database.migrations` al marcar una base de datos recién creada),
+`sqlalchemy.url` si se pasó con `-x`/`set_main_option`, y por último `DATABASE_URL`.
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine
+
+from app.database.database import SQLALCHEMY_DATABASE_URL
+from app.database.search import include_name
+from app.models.models import Base
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def _database_url() -> str:
+    return config.get_main_option("sqlalchemy.url") or SQLALCHEMY_DATABASE_URL
+
+
+def run_migrations_offline() -> None:
+    """Generar el SQL de las migraciones sin conectarse (`alembic upgrade head --sql`)"""
+    context.configure(
+        url=_database_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+        include_name=include_name,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def _run_with_connection(connection) -> None:
+    # render_as_batch: SQLite no soporta la mayoría de ALTER TABLE; include_name deja
+    # fuera de autogenerate las tablas FTS5 de búsqueda, que no son parte de los modelos
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=True,
+        include_name=include_name,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Aplicar las migraciones sobre una conexión"""
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run_with_connection(connection)
+        return
+
+    engine = create_engine(_database_url())
+    try:
+        with engine.connect() as connection:
+            _run_with_connection(connection)
+    finally:
+        engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,90 @@
+"""Esquema inicial: marcas, personas, vehículos, propietarios y versiones por tabla
+
+Corresponde a las tablas que `create_all` creaba antes de introducir Alembic. Una base
+de datos creada con esa versión se marca con `alembic stamp 0001_baseline` en lugar de
+aplicar esta migración.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-17
+"""
+import time
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.database.versioning import VERSIONED_TABLES, version_trigger_ddl
+
+revision: str = "0001_baseline"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "marca_vehiculo",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("nombre_marca", sa.String(), nullable=False),
+        sa.Column("pais", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("nombre_marca"),
+    )
+    op.create_index("ix_marca_vehiculo_id", "marca_vehiculo", ["id"])
+
+    op.create_table(
+        "persona",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("nombre", sa.String(), nullable=False),
+        sa.Column("cedula", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("cedula"),
+    )
+    op.create_index("ix_persona_id", "persona", ["id"])
+
+    op.create_table(
+        "vehiculo",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("modelo", sa.String(), nullable=False),
+        sa.Column("marca_id", sa.Integer(), nullable=False),
+        sa.Column("numero_puertas", sa.Integer(), nullable=False),
+        sa.Column("color", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(["marca_id"], ["marca_vehiculo.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_vehiculo_id", "vehiculo", ["id"])
+
+    op.create_table(
+        "vehiculo_persona",
+        sa.Column("vehiculo_id", sa.Integer(), nullable=False),
+        sa.Column("persona_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["persona_id"], ["persona.id"]),
+        sa.ForeignKeyConstraint(["vehiculo_id"], ["vehiculo.id"]),
+        sa.PrimaryKeyConstraint("vehiculo_id", "persona_id"),
+    )
+
+    version_tabla = op.create_table(
+        "version_tabla",
+        sa.Column("tabla", sa.String(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("tabla"),
+    )
+    initial = int(time.time() * 1000)
+    op.bulk_insert(version_tabla, [{"tabla": table, "version": initial} for table in VERSIONED_TABLES])
+    for statement in version_trigger_ddl(op.get_context().dialect.name):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    # Los triggers se eliminan junto con sus tablas
+    op.drop_table("version_tabla")
+    op.drop_table("vehiculo_persona")
+    op.drop_index("ix_vehiculo_id", table_name="vehiculo")
+    op.drop_table("vehiculo")
+    op.drop_index("ix_persona_id", table_name="persona")
+    op.drop_table("persona")
+    op.drop_index("ix_marca_vehiculo_id", table_name="marca_vehiculo")
+    op.drop_table("marca_vehiculo")
+    if op.get_context().dialect.name == "postgresql":
+        op.execute("DROP FUNCTION IF EXISTS incrementar_version_tabla()")
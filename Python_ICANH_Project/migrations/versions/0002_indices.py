@@ -0,0 +1,33 @@
+"""Índices en claves foráneas y columnas de filtro
+
+- `vehiculo.marca_id`: vehículos de una marca (borrado de marcas, `expand=vehiculos`).
+- `vehiculo_persona.persona_id`: vehículos de una persona; la clave primaria
+  `(vehiculo_id, persona_id)` solo cubre las búsquedas por vehículo.
+- `vehiculo.modelo` y `vehiculo.color`: filtros y ordenamientos de los listados.
+
+Revision ID: 0002_indices
+Revises: 0001_baseline
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0002_indices"
+down_revision: Union[str, None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_vehiculo_marca_id", "vehiculo", ["marca_id"])
+    op.create_index("ix_vehiculo_persona_persona_id", "vehiculo_persona", ["persona_id"])
+    op.create_index("ix_vehiculo_modelo", "vehiculo", ["modelo"])
+    op.create_index("ix_vehiculo_color", "vehiculo", ["color"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_vehiculo_color", table_name="vehiculo")
+    op.drop_index("ix_vehiculo_modelo", table_name="vehiculo")
+    op.drop_index("ix_vehiculo_persona_persona_id", table_name="vehiculo_persona")
+    op.drop_index("ix_vehiculo_marca_id", table_name="vehiculo")
@@ -0,0 +1,27 @@
+"""Índices para los filtros y órdenes de los listados de personas y marcas
+
+- `persona.nombre`: prefijo de nombre y `sort=nombre` (la cédula ya es única e indexada).
+- `marca_vehiculo.pais`: filtro `pais` y `sort=pais`.
+
+Revision ID: 0003_indices_filtros
+Revises: 0002_indices
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0003_indices_filtros"
+down_revision: Union[str, None] = "0002_indices"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_persona_nombre", "persona", ["nombre"])
+    op.create_index("ix_marca_vehiculo_pais", "marca_vehiculo", ["pais"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_marca_vehiculo_pais", table_name="marca_vehiculo")
+    op.drop_index("ix_persona_nombre", table_name="persona")
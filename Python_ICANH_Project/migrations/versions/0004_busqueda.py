@@ -0,0 +1,30 @@
+"""Índices de búsqueda de texto completo
+
+- SQLite: tablas FTS5 `persona_fts`, `vehiculo_fts` y `marca_vehiculo_fts` cargadas con
+  los datos existentes y mantenidas por triggers.
+- PostgreSQL: índices GIN sobre `to_tsvector('simple', ...)`.
+
+Revision ID: 0004_busqueda
+Revises: 0003_indices_filtros
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.database.search import drop_search_index_ddl, search_index_ddl
+
+revision: str = "0004_busqueda"
+down_revision: Union[str, None] = "0003_indices_filtros"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for statement in search_index_ddl(op.get_context().dialect.name):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for statement in drop_search_index_ddl(op.get_context().dialect.name):
+        op.execute(statement)
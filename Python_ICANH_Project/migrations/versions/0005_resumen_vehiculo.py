@@ -0,0 +1,49 @@
+"""Resumen de vehículos por marca, color y número de puertas
+
+Crea `resumen_vehiculo`, la carga con los vehículos existentes e instala los triggers
+que la mantienen en cada escritura de `vehiculo`. Si la tabla ya existe (la crea
+`create_tables` al arrancar la aplicación sobre una base de datos sin migrar) solo se
+recalcula su contenido; los triggers se crean solo si faltan.
+
+Revision ID: 0005_resumen_vehiculo
+Revises: 0004_busqueda
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.database.stats import rebuild_summary, summary_trigger_ddl
+
+revision: str = "0005_resumen_vehiculo"
+down_revision: Union[str, None] = "0004_busqueda"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table("resumen_vehiculo"):
+        op.create_table(
+            "resumen_vehiculo",
+            sa.Column("marca_id", sa.Integer(), nullable=False),
+            sa.Column("color", sa.String(), nullable=False),
+            sa.Column("numero_puertas", sa.Integer(), nullable=False),
+            sa.Column("total", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("marca_id", "color", "numero_puertas"),
+        )
+    rebuild_summary(bind)
+    for statement in summary_trigger_ddl(op.get_context().dialect.name):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_context().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS vehiculo_resumen ON vehiculo")
+        op.execute("DROP FUNCTION IF EXISTS actualizar_resumen_vehiculo()")
+    elif dialect == "sqlite":
+        for operation in ("insert", "delete", "update"):
+            op.execute(f"DROP TRIGGER IF EXISTS vehiculo_resumen_{operation}")
+    op.drop_table("resumen_vehiculo")
@@ -0,0 +1,59 @@
+"""Contadores de filas por tabla
+
+Crea `conteo_tabla`, la carga con el número de filas actual de cada tabla contada e
+instala los triggers que la mantienen en cada INSERT o DELETE. Si la tabla ya existe (la
+crea `create_tables` al arrancar la aplicación sobre una base de datos sin migrar) sus
+contadores se recalculan en lugar de insertarse de nuevo.
+
+Concurrencia en PostgreSQL: cada INSERT o DELETE de una tabla contada actualiza la misma
+fila de `conteo_tabla`, así que las transacciones que escriben a la vez en esa tabla
+esperan el bloqueo de esa fila hasta que la anterior confirma (lo mismo ocurre con
+`version_tabla`). Los triggers son por sentencia, de modo que una inserción masiva toma
+el bloqueo una sola vez. Se acepta porque el volumen de escritura de la API es bajo; si
+los escritores concurrentes se vuelven el cuello de botella, el contador debe repartirse
+en varias filas por tabla (sumadas al leer). En SQLite no cambia nada: las escrituras ya
+están serializadas por el bloqueo de la base de datos.
+
+Revision ID: 0006_conteo_tabla
+Revises: 0005_resumen_vehiculo
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.database.counts import COUNTED_TABLES, count_trigger_ddl
+
+revision: str = "0006_conteo_tabla"
+down_revision: Union[str, None] = "0005_resumen_vehiculo"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if not sa.inspect(op.get_bind()).has_table("conteo_tabla"):
+        op.create_table(
+            "conteo_tabla",
+            sa.Column("tabla", sa.String(), nullable=False),
+            sa.Column("filas", sa.BigInteger(), nullable=False),
+            sa.PrimaryKeyConstraint("tabla"),
+        )
+    for table in COUNTED_TABLES:
+        op.execute(f"DELETE FROM conteo_tabla WHERE tabla = '{table}'")
+        op.execute(f"INSERT INTO conteo_tabla (tabla, filas) SELECT '{table}', COUNT(*) FROM {table}")
+    for statement in count_trigger_ddl(op.get_context().dialect.name):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_context().dialect.name
+    for table in COUNTED_TABLES:
+        for operation in ("insert", "delete"):
+            if dialect == "postgresql":
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_conteo_{operation} ON {table}")
+            elif dialect == "sqlite":
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_conteo_{operation}")
+    if dialect == "postgresql":
+        op.execute("DROP FUNCTION IF EXISTS contar_filas_tabla()")
+    op.drop_table("conteo_tabla")
@@ -2,47 +2,150 @@
 """
 Script para ejecutar la API de Gestión de Vehículos - ICANH
 Este script facilita la ejecución de la aplicación con configuración desde variables de entorno.
+
+- **Desarrollo** (`ENVIRONMENT` distinto de `production`): un proceso, con recarga
+  automática salvo `RELOAD=False`.
+- **Producción** (`ENVIRONMENT=production`): `WEB_WORKERS` procesos (por defecto, uno por
+  CPU disponible) que comparten el socket, con uvloop y httptools si están instalados.
+  `kill -HUP <pid>` reinicia los workers uno a uno: los demás siguen atendiendo y cada
+  uno termina sus peticiones en curso antes de salir, así que no se pierden peticiones.
+  La recarga automática no está permitida, y con `CACHE_BACKEND=memory` las cachés de
+  lectura se desactivan porque cada worker tendría la suya sin ver las invalidaciones
+  de los demás.
 """
 
+import argparse
+import importlib.util
 import os
-import subprocess
 import sys
 from dotenv import load_dotenv
 
-def main():
+
+def _env_int(name: str, default):
+    """Leer una variable de entorno entera (vacía o ausente: `default`)"""
+    value = os.getenv(name, "")
+    return int(value) if value else default
+
+
+def available_cpus() -> int:
+    """CPUs que puede usar el proceso (respeta la afinidad de CPU del contenedor)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Argumentos de línea de comandos; tienen prioridad sobre las variables de entorno"""
+    parser = argparse.ArgumentParser(description="Ejecutar la API de Gestión de Vehículos - ICANH")
+    parser.add_argument("--reload", dest="reload", action="store_true", default=None,
+                        help="Recarga automática (no permitida con ENVIRONMENT=production)")
+    parser.add_argument("--no-reload", dest="reload", action="store_false")
+    parser.add_argument("--workers", type=int, help="Número de procesos (solo en producción)")
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    return parser.parse_args(argv)
+
+
+def server_options(args: argparse.Namespace) -> dict:
+    """
+    Construir los argumentos de `uvicorn.run` a partir de `args` y del entorno.
+
+    Lanza `SystemExit` si se pide recarga automática con `ENVIRONMENT=production`.
+    """
+    production = os.getenv("ENVIRONMENT", "development").lower() == "production"
+    reload = args.reload
+    if reload is None:
+        reload = os.getenv("RELOAD", str(not production)).lower() == "true"
+    if production and reload:
+        raise SystemExit("❌ La recarga automática (--reload / RELOAD=True) no está permitida con ENVIRONMENT=production")
+
+    options = {
+        "host": args.host or os.getenv("HOST", "0.0.0.0"),
+        "port": args.port or _env_int("PORT", 8000),
+        "reload": reload,
+    }
+    if not production:
+        return options
+
+    options.update(
+        workers=args.workers or _env_int("WEB_WORKERS", available_cpus()),
+        loop="uvloop" if _installed("uvloop") else "asyncio",
+        http="httptools" if _installed("httptools") else "h11",
+        # Mayor que el tiempo de inactividad de los balanceadores habituales (60 s), para
+        # que el proxy no reutilice una conexión que el servidor ya cerró
+        timeout_keep_alive=_env_int("KEEP_ALIVE_TIMEOUT", 65),
+        backlog=_env_int("BACKLOG", 2048),
+        # Peticiones simultáneas por worker; por encima se responde 503
+        limit_concurrency=_env_int("LIMIT_CONCURRENCY", None),
+        # Reciclar cada worker tras este número de peticiones (el supervisor lo reemplaza)
+        limit_max_requests=_env_int("MAX_REQUESTS", None),
+        timeout_graceful_shutdown=_env_int("GRACEFUL_TIMEOUT", 30),
+        proxy_headers=True,
+        forwarded_allow_ips=os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"),
+    )
+    return options
+
+
+def disable_process_caches(options: dict) -> bool:
+    """
+    Desactivar las cachés en memoria cuando hay varios workers.
+
+    Con `CACHE_BACKEND=memory` cada worker tiene su propia caché y no ve las
+    invalidaciones de los demás: podría responder el JSON obsoleto de un recurso (con
+    un ETag calculado sobre las versiones actuales) o aceptar una marca ya eliminada.
+    Los workers heredan el entorno, así que `CACHE_SIZE=0` desactiva sus cachés.
+    Retorna `True` si se desactivaron; con `CACHE_BACKEND=redis` se conservan.
+    """
+    if options.get("workers", 1) <= 1 or os.getenv("CACHE_BACKEND", "memory").lower() != "memory":
+        return False
+    os.environ["CACHE_SIZE"] = "0"
+    return True
+
+
+def prepare_database() -> None:
+    """
+    Crear las tablas una sola vez antes de arrancar los workers.
+
+    Así los workers no compiten por crear el esquema de una base de datos nueva; en
+    cada uno `create_tables` solo comprueba que ya existe.
+    """
+    from app.database.database import create_tables, engine
+
+    create_tables()
+    engine.dispose()
+
+
+def main(argv=None):
     # Cargar variables de entorno
     load_dotenv()
 
-    # Obtener configuración del servidor
-    host = os.getenv("HOST", "0.0.0.0")
-    port = os.getenv("PORT", "8000")
-    reload = os.getenv("RELOAD", "True").lower() == "true"
+    options = server_options(parse_args(argv))
+    host, port = options["host"], options["port"]
 
     print("🚀 Iniciando API de Gestión de Vehículos - ICANH")
     print(f"📍 Servidor: http://{host}:{port}")
     print(f"📚 Documentación: http://{host}:{port}/docs")
-    print(f"🔄 Recarga automática: {'Activada' if reload else 'Desactivada'}")
+    print(f"🔄 Recarga automática: {'Activada' if options['reload'] else 'Desactivada'}")
+    if "workers" in options:
+        print(f"⚙️  Producción: {options['workers']} workers, loop={options['loop']}, http={options['http']}")
+        print("♻️  Reinicio sin cortes: kill -HUP <pid>")
+    if disable_process_caches(options):
+        print("⚠️  CACHE_BACKEND=memory con varios workers: cachés de lectura desactivadas (use CACHE_BACKEND=redis)")
     print("-" * 50)
 
-    # Comando para ejecutar uvicorn
-    cmd = [
-        sys.executable, "-m", "uvicorn",
-        "main:app",
-        "--host", host,
-        "--port", port
-    ]
-
-    if reload:
-        cmd.append("--reload")
+    import uvicorn
 
-    # Ejecutar el comando
+    if options.get("workers", 1) > 1:
+        prepare_database()
     try:
-        subprocess.run(cmd, check=True)
+        uvicorn.run("main:app", **options)
     except KeyboardInterrupt:
         print("\n👋 Aplicación detenida por el usuario")
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Error al ejecutar la aplicación: {e}")
-        sys.exit(1)
+
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
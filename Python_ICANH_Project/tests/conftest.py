@@ -1,7 +1,9 @@
 import os
 import pytest
+from contextlib import contextmanager
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 
@@ -9,8 +11,9 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.database.database import Base, get_db
+from app.database.database import Base, get_async_db, get_db
 from app.models.models import MarcaVehiculo, Persona, Vehiculo
+from app.utils.resource_cache import cache_backend
 import main
 from faker import Faker
 
@@ -39,6 +42,9 @@ def set_sqlite_pragma(dbapi_connection, connection_record):
 # Crear SessionLocal para pruebas
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
+# Misma base de datos de pruebas accedida con el driver asíncrono
+TEST_ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./test_vehiculos.db"
+
 
 @pytest.fixture(scope="function")
 def db_session():
@@ -59,6 +65,14 @@ def db_session():
     Base.metadata.drop_all(bind=test_engine)
 
 
+@pytest.fixture(autouse=True)
+def clear_cache_backend():
+    """Fixture que vacía las cachés de la aplicación: cada test recrea las tablas y reutiliza ids"""
+    cache_backend.clear()
+    yield
+    cache_backend.clear()
+
+
 @pytest.fixture
 def faker():
     """Fixture que proporciona un generador de datos falsos"""
@@ -93,6 +107,69 @@ def client():
     Base.metadata.drop_all(bind=test_engine)
 
 
+@pytest.fixture
+def async_client():
+    """Fixture que proporciona un cliente de pruebas con los handlers en modo asíncrono"""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    Base.metadata.create_all(bind=test_engine)
+
+    # NullPool: cada sesión abre su conexión dentro del event loop del cliente de pruebas
+    async_engine = create_async_engine(TEST_ASYNC_DATABASE_URL, poolclass=NullPool)
+    event.listen(async_engine.sync_engine, "connect", set_sqlite_pragma)
+    AsyncTestingSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as session:
+            yield session
+
+    def override_get_db():
+        session = TestingSessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app = FastAPI()
+    main.include_routers(app, "async")
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_db] = override_get_db
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+    Base.metadata.drop_all(bind=test_engine)
+
+
+@pytest.fixture
+def count_queries():
+    """
+    Fixture que cuenta las sentencias SQL ejecutadas dentro de un bloque `with`.
+
+    Escucha `before_cursor_execute` en todos los engines, así que también cuenta
+    las consultas del engine asíncrono de `async_client`.
+    """
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+
+    return counter
+
+
 # Fixtures para crear datos de prueba
 @pytest.fixture
 def sample_marca(db_session, faker):
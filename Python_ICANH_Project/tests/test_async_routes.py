@@ -0,0 +1,126 @@
+import inspect
+
+from fastapi.routing import APIRoute
+
+from app.utils.http_cache import HttpCache
+
+
+class TestAsyncMode:
+    """Tests para los handlers CRUD en modo asíncrono (DATABASE_MODE=async)"""
+
+    def test_crud_routes_are_async(self, async_client):
+        """Test que las rutas CRUD se atiendan con handlers asíncronos"""
+        for route in async_client.app.routes:
+            if getattr(route, "path", "") == "/api/vehiculos/" and "GET" in route.methods:
+                assert inspect.iscoroutinefunction(route.endpoint)
+                break
+        else:
+            raise AssertionError("No se encontró la ruta GET /api/vehiculos/")
+
+    def test_http_cache_is_async(self, async_client):
+        """Test que las rutas asíncronas lean las versiones de tabla con la sesión asíncrona"""
+        dependencies = [
+            dependency.dependency
+            for route in async_client.app.routes
+            if isinstance(route, APIRoute) and inspect.iscoroutinefunction(route.endpoint)
+            for dependency in route.dependencies
+        ]
+        assert dependencies
+        assert not any(isinstance(dependency, HttpCache) for dependency in dependencies)
+        assert all(inspect.iscoroutinefunction(dependency) for dependency in dependencies)
+
+    def test_http_cache_revalidation(self, async_client, client, sample_marca):
+        """Test que los handlers asíncronos devuelvan el mismo ETag y respondan 304"""
+        path = f"/api/marcas-vehiculo/{sample_marca.id}"
+        etag = async_client.get(path).headers["etag"]
+        assert etag == client.get(path).headers["etag"]
+        assert async_client.get(path, headers={"If-None-Match": etag}).status_code == 304
+
+    def test_marca_crud(self, async_client):
+        """Test ciclo CRUD de marcas con AsyncSession"""
+        response = async_client.post("/api/marcas-vehiculo/", json={"nombre_marca": "Mazda", "pais": "Japón"})
+        assert response.status_code == 200
+        marca_id = response.json()["id"]
+
+        response = async_client.post("/api/marcas-vehiculo/", json={"nombre_marca": "Mazda", "pais": "Corea"})
+        assert response.status_code == 400
+
+        response = async_client.put(f"/api/marcas-vehiculo/{marca_id}", json={"pais": "Japan"})
+        assert response.status_code == 200
+        assert response.json()["pais"] == "Japan"
+
+        response = async_client.get("/api/marcas-vehiculo/")
+        assert [marca["id"] for marca in response.json()] == [marca_id]
+
+        response = async_client.delete(f"/api/marcas-vehiculo/{marca_id}")
+        assert response.status_code == 200
+        assert async_client.get(f"/api/marcas-vehiculo/{marca_id}").status_code == 404
+
+    def test_vehiculo_lifecycle_with_propietario(self, async_client, sample_marca, sample_persona):
+        """Test crear, asignar propietario, consultar y eliminar un vehículo en modo asíncrono"""
+        vehiculo_data = {
+            "modelo": "CX-5",
+            "marca_id": sample_marca.id,
+            "numero_puertas": 5,
+            "color": "Gris"
+        }
+        response = async_client.post("/api/vehiculos/", json=vehiculo_data)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["marca"]["id"] == sample_marca.id
+        assert data["propietarios"] == []
+        vehiculo_id = data["id"]
+
+        asignacion = {"persona_id": sample_persona.id}
+        response = async_client.post(f"/api/vehiculos/{vehiculo_id}/propietarios", json=asignacion)
+        assert response.status_code == 200
+        response = async_client.post(f"/api/vehiculos/{vehiculo_id}/propietarios", json=asignacion)
+        assert response.status_code == 400
+
+        response = async_client.get(f"/api/vehiculos/{vehiculo_id}/propietarios")
+        assert [p["id"] for p in response.json()["propietarios"]] == [sample_persona.id]
+
+        response = async_client.get(f"/api/personas/{sample_persona.id}/vehiculos")
+        vehiculos = response.json()["vehiculos"]
+        assert [v["id"] for v in vehiculos] == [vehiculo_id]
+        assert vehiculos[0]["marca"]["nombre_marca"] == sample_marca.nombre_marca
+
+        # La persona no se puede eliminar mientras tenga vehículos
+        assert async_client.delete(f"/api/personas/{sample_persona.id}").status_code == 400
+
+        response = async_client.put(f"/api/vehiculos/{vehiculo_id}", json={"color": "Negro"})
+        assert response.json()["color"] == "Negro"
+
+        assert async_client.delete(f"/api/vehiculos/{vehiculo_id}").status_code == 200
+        assert async_client.get(f"/api/vehiculos/{vehiculo_id}").status_code == 404
+        assert async_client.delete(f"/api/personas/{sample_persona.id}").status_code == 200
+
+    def test_create_vehiculo_invalid_marca(self, async_client):
+        """Test crear vehículo con marca inexistente en modo asíncrono"""
+        vehiculo_data = {"modelo": "Corolla", "marca_id": 999, "numero_puertas": 4, "color": "Rojo"}
+        response = async_client.post("/api/vehiculos/", json=vehiculo_data)
+        assert response.status_code == 400
+        assert "La marca especificada no existe" in response.json()["detail"]
+
+    def test_personas_cursor_pagination(self, async_client, multiple_personas):
+        """Test que la paginación por cursor funcione con AsyncSession"""
+        response = async_client.get("/api/personas/", params={"limit": 2})
+        assert len(response.json()) == 2
+        next_cursor = response.headers["X-Next-Cursor"]
+
+        response = async_client.get("/api/personas/", params={"limit": 2, "cursor": next_cursor})
+        assert [p["id"] for p in response.json()] == [multiple_personas[-1].id]
+
+    def test_delete_marca_with_vehiculos(self, async_client, sample_vehiculo):
+        """Test que no se pueda eliminar una marca con vehículos en modo asíncrono"""
+        response = async_client.delete(f"/api/marcas-vehiculo/{sample_vehiculo.marca_id}")
+        assert response.status_code == 400
+        assert "tiene vehículos asociados" in response.json()["detail"]
+
+    def test_openapi_in_async_mode(self, async_client):
+        """Test que la documentación OpenAPI se genere con los routers combinados"""
+        response = async_client.get("/openapi.json")
+        assert response.status_code == 200
+        paths = response.json()["paths"]
+        assert paths["/api/vehiculos/"]["get"]["summary"] == "Obtener todos los vehículos"
+        assert "/api/vehiculos/export" in paths
@@ -0,0 +1,147 @@
+from app.models.models import Persona, Vehiculo
+
+
+class TestBulkCreate:
+    """Tests para los endpoints de creación masiva"""
+
+    def test_create_personas_bulk(self, client, db_session):
+        """Test crear varias personas en una sola petición"""
+        personas = [{"nombre": f"Persona {i}", "cedula": f"10{i}"} for i in range(5)]
+
+        response = client.post("/api/personas/bulk", json=personas)
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["creados"] == 5
+        assert data["fallidos"] == 0
+        assert [item["indice"] for item in data["resultados"]] == list(range(5))
+        assert all(item["id"] is not None for item in data["resultados"])
+        assert db_session.query(Persona).count() == 5
+
+    def test_bulk_atomic_rejects_whole_batch(self, client, db_session, sample_persona):
+        """Test que en modo atómico un elemento inválido rechace todo el lote"""
+        personas = [
+            {"nombre": "Nueva", "cedula": "555"},
+            {"nombre": "Duplicada", "cedula": sample_persona.cedula},
+        ]
+
+        response = client.post("/api/personas/bulk", json=personas)
+        assert response.status_code == 400
+
+        data = response.json()
+        assert data["creados"] == 0
+        assert data["fallidos"] == 1
+        assert data["resultados"][1]["error"] == "Ya existe una persona con esa cédula"
+        assert db_session.query(Persona).count() == 1
+
+    def test_bulk_partial_creates_valid_items(self, client, db_session):
+        """Test que en modo parcial se creen los válidos y se reporten los repetidos"""
+        marcas = [
+            {"nombre_marca": "Kia", "pais": "Corea"},
+            {"nombre_marca": "Kia", "pais": "Corea"},
+            {"nombre_marca": "Seat", "pais": "España"},
+        ]
+
+        response = client.post("/api/marcas-vehiculo/bulk", params={"atomic": False}, json=marcas)
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["creados"] == 2
+        assert data["fallidos"] == 1
+        assert data["resultados"][1]["id"] is None
+        assert "repetido dentro del lote" in data["resultados"][1]["error"]
+
+        response = client.get("/api/marcas-vehiculo/")
+        assert sorted(marca["nombre_marca"] for marca in response.json()) == ["Kia", "Seat"]
+
+    def test_create_vehiculos_bulk_validates_marca(self, client, db_session, sample_marca):
+        """Test que se valide la existencia de las marcas de un lote de vehículos"""
+        vehiculos = [
+            {"modelo": "A", "marca_id": sample_marca.id, "numero_puertas": 4, "color": "Rojo"},
+            {"modelo": "B", "marca_id": 999, "numero_puertas": 2, "color": "Azul"},
+        ]
+
+        response = client.post("/api/vehiculos/bulk", params={"atomic": False}, json=vehiculos)
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["creados"] == 1
+        assert data["resultados"][1]["error"] == "La marca especificada no existe"
+
+        created = db_session.get(Vehiculo, data["resultados"][0]["id"])
+        assert created.modelo == "A"
+        assert created.marca_id == sample_marca.id
+
+    def test_bulk_empty_batch(self, client):
+        """Test que un lote vacío sea rechazado"""
+        response = client.post("/api/vehiculos/bulk", json=[])
+        assert response.status_code == 400
+        assert "no contiene elementos" in response.json()["detail"]
+
+
+class TestBulkOwnership:
+    """Tests para la asignación y el retiro de propietarios en lote"""
+
+    def test_assign_propietarios_bulk(
+        self, client, vehiculo_con_propietario, sample_persona, multiple_personas, count_queries
+    ):
+        """Test asignar varias personas con una consulta de existencia y un INSERT"""
+        persona_ids = [sample_persona.id] + [persona.id for persona in multiple_personas]
+        url = f"/api/vehiculos/{vehiculo_con_propietario.id}/propietarios/bulk"
+
+        with count_queries() as statements:
+            response = client.post(url, json={"persona_ids": persona_ids + persona_ids[-1:]})
+        assert response.status_code == 200
+        assert response.json() == {
+            "solicitados": len(persona_ids),
+            "modificados": len(persona_ids) - 1,  # una ya era propietaria
+            "sin_cambios": 1,
+        }
+        # Vehículo, existencia de las personas e INSERT ... ON CONFLICT DO NOTHING
+        assert len(statements) == 3
+        assert "ON CONFLICT DO NOTHING" in statements[-1]
+
+        propietarios = client.get(f"/api/vehiculos/{vehiculo_con_propietario.id}").json()["propietarios"]
+        assert sorted(p["id"] for p in propietarios) == sorted(persona_ids)
+
+    def test_assign_propietarios_missing_persona(self, client, sample_vehiculo, sample_persona):
+        """Test que una persona inexistente rechace el lote completo"""
+        url = f"/api/vehiculos/{sample_vehiculo.id}/propietarios/bulk"
+        response = client.post(url, json={"persona_ids": [sample_persona.id, 999]})
+        assert response.status_code == 404
+        assert "999" in response.json()["detail"]
+        assert client.get(f"/api/vehiculos/{sample_vehiculo.id}").json()["propietarios"] == []
+
+    def test_remove_propietarios_bulk(self, client, vehiculo_con_propietario, sample_persona):
+        """Test retirar propietarios ignorando los que no lo son"""
+        url = f"/api/vehiculos/{vehiculo_con_propietario.id}/propietarios/bulk"
+        response = client.request("DELETE", url, json={"persona_ids": [sample_persona.id, 999]})
+        assert response.status_code == 200
+        assert response.json() == {"solicitados": 2, "modificados": 1, "sin_cambios": 1}
+        assert client.get(f"/api/vehiculos/{vehiculo_con_propietario.id}").json()["propietarios"] == []
+
+    def test_vehiculos_bulk_for_persona(self, client, db_session, sample_persona, sample_marca):
+        """Test asignar y retirar vehículos desde la persona"""
+        vehiculos = [
+            Vehiculo(modelo=f"Modelo {i}", marca_id=sample_marca.id, numero_puertas=4, color="Gris")
+            for i in range(3)
+        ]
+        db_session.add_all(vehiculos)
+        db_session.commit()
+        vehiculo_ids = [vehiculo.id for vehiculo in vehiculos]
+        url = f"/api/personas/{sample_persona.id}/vehiculos/bulk"
+
+        response = client.post(url, json={"vehiculo_ids": vehiculo_ids})
+        assert response.json()["modificados"] == 3
+        assert len(client.get(f"/api/personas/{sample_persona.id}/vehiculos").json()["vehiculos"]) == 3
+
+        response = client.request("DELETE", url, json={"vehiculo_ids": vehiculo_ids[:2]})
+        assert response.json()["modificados"] == 2
+        vehiculos = client.get(f"/api/personas/{sample_persona.id}/vehiculos").json()["vehiculos"]
+        assert [v["id"] for v in vehiculos] == vehiculo_ids[2:]
+
+    def test_bulk_ownership_not_found_and_empty(self, client, sample_persona):
+        """Test 404 para un recurso inexistente y 400 para un lote vacío"""
+        assert client.post("/api/personas/999/vehiculos/bulk", json={"vehiculo_ids": [1]}).status_code == 404
+        response = client.post(f"/api/personas/{sample_persona.id}/vehiculos/bulk", json={"vehiculo_ids": []})
+        assert response.status_code == 400
@@ -0,0 +1,348 @@
+import asyncio
+import fnmatch
+import threading
+
+from sqlalchemy import update
+
+from app.models.models import MarcaVehiculo, Persona, Vehiculo
+from app.utils.cache import CacheNamespace, MemoryCacheBackend, RedisCacheBackend, TTLCache
+from app.utils.marca_cache import marca_cache
+from app.utils.resource_cache import persona_cache, vehiculo_cache
+
+
+class FakeTimer:
+    """Reloj manual para probar la expiración sin esperar"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    """Doble del cliente de Redis con los comandos que usa `RedisCacheBackend`"""
+
+    def __init__(self):
+        self.data = {}
+        self.expirations = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.expirations[key] = ex
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def scan_iter(self, match="*", count=None):
+        return [key for key in list(self.data) if fnmatch.fnmatchcase(key, match)]
+
+
+class ThreadRecordingRedis(FakeRedis):
+    """Doble de Redis que registra el hilo de cada lectura"""
+
+    def __init__(self):
+        super().__init__()
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.get_ident())
+        return super().get(key)
+
+
+class TestTTLCache:
+    """Tests para la caché en memoria con TTL y límite de tamaño"""
+
+    def test_hit_and_miss_counters(self):
+        """Test que se cuenten aciertos y fallos"""
+        cache = TTLCache(maxsize=10, ttl=60)
+        assert cache.get("a") is None
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+        assert stats["hit_ratio"] == 0.5
+
+    def test_entries_expire(self):
+        """Test que una entrada deje de ser válida después del TTL"""
+        timer = FakeTimer()
+        cache = TTLCache(maxsize=10, ttl=5, timer=timer)
+        cache.set("a", 1)
+        timer.now = 4.9
+        assert cache.get("a") == 1
+        timer.now = 5.0
+        assert cache.get("a") is None
+        assert cache.stats()["size"] == 0
+
+    def test_least_recently_used_is_evicted(self):
+        """Test que al superar el tamaño se descarte la entrada menos usada"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+
+class TestMarcaCache:
+    """Tests para la caché de marcas en los handlers"""
+
+    def test_create_vehiculo_skips_marca_query(self, client, sample_marca, count_queries):
+        """Test que la validación de la marca se sirva desde la caché"""
+        vehiculo = {"modelo": "Sandero", "marca_id": sample_marca.id, "numero_puertas": 5, "color": "Blanco"}
+        assert client.post("/api/vehiculos/", json=vehiculo).status_code == 200
+
+        with count_queries() as statements:
+            assert client.post("/api/vehiculos/", json=vehiculo).status_code == 200
+        # Solo la marca que serializa la respuesta, no la validación previa al INSERT
+        marca_queries = [s for s in statements if s.lstrip().startswith("SELECT") and "FROM marca_vehiculo" in s]
+        assert len(marca_queries) == 1
+        assert marca_cache.by_id.hits >= 1
+
+    def test_delete_marca_invalidates(self, client, db_session, sample_marca):
+        """Test que una marca eliminada deje de aceptarse aunque estuviera en caché"""
+        vehiculo = {"modelo": "Clio", "marca_id": sample_marca.id, "numero_puertas": 3, "color": "Rojo"}
+        vehiculo_id = client.post("/api/vehiculos/", json=vehiculo).json()["id"]
+        assert marca_cache.get_json(sample_marca.id, marca_cache.version(db_session)) is not None
+        client.delete(f"/api/vehiculos/{vehiculo_id}")
+
+        assert client.delete(f"/api/marcas-vehiculo/{sample_marca.id}").status_code == 200
+        response = client.post("/api/vehiculos/", json=vehiculo)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "La marca especificada no existe"
+
+    def test_rename_marca_invalidates_nombre(self, client, sample_marca):
+        """Test que renombrar una marca libere su nombre anterior"""
+        nombre_anterior = sample_marca.nombre_marca
+        response = client.post("/api/marcas-vehiculo/", json={"nombre_marca": nombre_anterior, "pais": "X"})
+        assert response.status_code == 400
+
+        response = client.put(f"/api/marcas-vehiculo/{sample_marca.id}", json={"nombre_marca": "Renombrada"})
+        assert response.status_code == 200
+
+        response = client.post("/api/marcas-vehiculo/", json={"nombre_marca": nombre_anterior, "pais": "X"})
+        assert response.status_code == 200
+        response = client.post("/api/marcas-vehiculo/", json={"nombre_marca": "Renombrada", "pais": "X"})
+        assert response.status_code == 400
+
+    def test_cache_stats_endpoint(self, client, sample_marca):
+        """Test que el endpoint de estadísticas exponga los contadores"""
+        response = client.get("/api/marcas-vehiculo/cache/stats")
+        assert response.status_code == 200
+        stats = response.json()
+        assert set(stats) == {"por_id", "por_nombre"}
+        assert {"hits", "misses", "size", "maxsize", "ttl", "hit_ratio"} <= set(stats["por_id"])
+
+    def test_async_handlers_use_cache(self, async_client, sample_marca):
+        """Test que los handlers asíncronos validen la marca desde la caché"""
+        vehiculo = {"modelo": "Logan", "marca_id": sample_marca.id, "numero_puertas": 4, "color": "Negro"}
+        hits = marca_cache.by_id.hits
+        assert async_client.post("/api/vehiculos/", json=vehiculo).status_code == 200
+        assert async_client.post("/api/vehiculos/", json=vehiculo).status_code == 200
+        assert marca_cache.by_id.hits == hits + 1
+
+
+class TestCacheBackends:
+    """Tests para los backends intercambiables de la caché"""
+
+    def test_memory_backend_clear_by_prefix(self):
+        """Test que el backend en memoria vacíe solo las claves del prefijo"""
+        backend = MemoryCacheBackend(maxsize=10, ttl=60)
+        backend.set("persona:1", b"a")
+        backend.set("vehiculo:1", b"b")
+        backend.clear("persona:")
+        assert backend.get("persona:1") is None
+        assert backend.get("vehiculo:1") == b"b"
+
+    def test_redis_backend_roundtrip(self):
+        """Test que el backend de Redis use el prefijo y el TTL configurados"""
+        client = FakeRedis()
+        backend = RedisCacheBackend(client=client, ttl=30, prefix="test:")
+        backend.set("persona:1", b"{}")
+        assert client.expirations == {"test:persona:1": 30}
+        assert backend.get("persona:1") == b"{}"
+        backend.delete("persona:1")
+        assert backend.get("persona:1") is None
+
+    def test_redis_backend_clear_by_prefix(self):
+        """Test que el backend de Redis borre solo las claves del espacio de nombres"""
+        client = FakeRedis()
+        client.set("otra-app:persona:1", b"x")
+        namespace = CacheNamespace(RedisCacheBackend(client=client, prefix="test:"), "persona")
+        namespace.set(1, b"a")
+        namespace.set(2, b"b")
+        namespace.clear()
+        assert namespace.get(1) is None
+        assert list(client.data) == ["otra-app:persona:1"]
+        assert (namespace.hits, namespace.misses) == (0, 1)
+
+    def test_namespace_version_mismatch_is_a_miss(self):
+        """Test que una entrada guardada con otra versión no se sirva y cuente como fallo"""
+        namespace = CacheNamespace(MemoryCacheBackend(maxsize=10, ttl=60), "persona")
+        namespace.set(1, b"{}", version="persona:1")
+        assert namespace.get(1, version="persona:2") is None
+        assert namespace.get(1, version="persona:1") == b"{}"
+        assert (namespace.hits, namespace.misses) == (1, 1)
+
+    def test_redis_backend_async_uses_threadpool(self):
+        """Test que las operaciones asíncronas sobre Redis no bloqueen el hilo del event loop"""
+        client = ThreadRecordingRedis()
+        namespace = CacheNamespace(RedisCacheBackend(client=client, prefix="test:"), "persona")
+
+        async def run():
+            await namespace.aset(1, b"a")
+            value = await namespace.aget(1)
+            await namespace.adelete(1)
+            return value, await namespace.aget(1), threading.get_ident()
+
+        value, deleted, loop_thread = asyncio.run(run())
+        assert (value, deleted) == (b"a", None)
+        assert (namespace.hits, namespace.misses) == (1, 1)
+        assert client.threads and loop_thread not in client.threads
+
+    def test_memory_backend_async_runs_inline(self):
+        """Test que el backend en memoria responda las operaciones asíncronas sin cambiar de hilo"""
+        backend = MemoryCacheBackend(maxsize=10, ttl=60)
+        backend.set("persona:1", b"a")
+        assert asyncio.run(backend.aget("persona:1")) == b"a"
+        assert not backend.blocking
+
+
+class TestResourceCache:
+    """Tests para la caché de lecturas individuales en los handlers"""
+
+    def test_read_vehiculo_served_from_cache(self, client, vehiculo_con_propietario, count_queries):
+        """Test que la segunda lectura no consulte las tablas del recurso"""
+        url = f"/api/vehiculos/{vehiculo_con_propietario.id}"
+        first = client.get(url)
+        assert first.status_code == 200
+
+        with count_queries() as statements:
+            second = client.get(url)
+        assert second.status_code == 200
+        assert second.json() == first.json()
+        # Solo queda la consulta de versiones del ETag
+        assert len(statements) == 1
+        assert "version_tabla" in statements[0]
+
+    def test_partial_selection_bypasses_cache(self, client, sample_persona):
+        """Test que fields= no devuelva la respuesta completa guardada"""
+        client.get(f"/api/personas/{sample_persona.id}")
+        response = client.get(f"/api/personas/{sample_persona.id}", params={"fields": "nombre"})
+        assert set(response.json()) == {"id", "nombre"}
+
+    def test_update_vehiculo_invalidates(self, client, sample_vehiculo):
+        """Test que actualizar un vehículo descarte su respuesta en caché"""
+        url = f"/api/vehiculos/{sample_vehiculo.id}"
+        client.get(url)
+        assert client.put(url, json={"color": "Verde"}).status_code == 200
+        assert client.get(url).json()["color"] == "Verde"
+
+    def test_assign_owner_invalidates(self, client, sample_vehiculo, sample_persona):
+        """Test que asignar un propietario se refleje en la siguiente lectura"""
+        url = f"/api/vehiculos/{sample_vehiculo.id}"
+        assert client.get(url).json()["propietarios"] == []
+        response = client.post(f"{url}/propietarios", json={"persona_id": sample_persona.id})
+        assert response.status_code == 200
+        assert [p["id"] for p in client.get(url).json()["propietarios"]] == [sample_persona.id]
+
+    def test_rename_persona_invalidates_vehiculos(self, client, vehiculo_con_propietario, sample_persona):
+        """Test que renombrar a un propietario invalide los vehículos que lo incluyen"""
+        vehiculo_url = f"/api/vehiculos/{vehiculo_con_propietario.id}"
+        persona_url = f"/api/personas/{sample_persona.id}"
+        client.get(vehiculo_url)
+        client.get(persona_url)
+
+        assert client.put(persona_url, json={"nombre": "Renombrada"}).status_code == 200
+        assert client.get(persona_url).json()["nombre"] == "Renombrada"
+        assert client.get(vehiculo_url).json()["propietarios"][0]["nombre"] == "Renombrada"
+
+    def test_update_marca_invalidates_vehiculos(self, client, sample_vehiculo, sample_marca):
+        """Test que cambiar una marca invalide los vehículos que la incluyen"""
+        vehiculo_url = f"/api/vehiculos/{sample_vehiculo.id}"
+        client.get(vehiculo_url)
+        client.get(f"/api/marcas-vehiculo/{sample_marca.id}")
+
+        response = client.put(f"/api/marcas-vehiculo/{sample_marca.id}", json={"pais": "Japón"})
+        assert response.status_code == 200
+        assert client.get(f"/api/marcas-vehiculo/{sample_marca.id}").json()["pais"] == "Japón"
+        assert client.get(vehiculo_url).json()["marca"]["pais"] == "Japón"
+
+    def test_delete_persona_invalidates(self, client, sample_persona):
+        """Test que una persona eliminada deje de servirse desde la caché"""
+        url = f"/api/personas/{sample_persona.id}"
+        client.get(url)
+        assert client.delete(url).status_code == 200
+        assert client.get(url).status_code == 404
+
+    def test_async_handlers_use_cache(self, async_client, db_session, sample_vehiculo, sample_persona):
+        """Test que los handlers asíncronos lean e invaliden la misma caché"""
+        url = f"/api/vehiculos/{sample_vehiculo.id}"
+        hits = vehiculo_cache.by_id.hits
+        async_client.get(url)
+        async_client.get(url)
+        assert vehiculo_cache.by_id.hits == hits + 1
+
+        assert async_client.post(f"{url}/propietarios", json={"persona_id": sample_persona.id}).status_code == 200
+        assert len(async_client.get(url).json()["propietarios"]) == 1
+
+        persona_url = f"/api/personas/{sample_persona.id}"
+        async_client.get(persona_url)
+        assert async_client.put(persona_url, json={"nombre": "Otra"}).status_code == 200
+        assert async_client.get(persona_url).json()["nombre"] == "Otra"
+        assert persona_cache.get_json(sample_persona.id, persona_cache.version(db_session)) is not None
+
+    def test_write_between_read_and_store(self, client, db_session, sample_vehiculo, monkeypatch):
+        """Test que una respuesta cargada antes de una escritura no se sirva después de ella"""
+        url = f"/api/vehiculos/{sample_vehiculo.id}"
+        color = sample_vehiculo.color
+        store = vehiculo_cache.store
+
+        def store_after_write(db_vehiculo, version):
+            # Otra petición actualiza el vehículo e invalida su entrada antes de este store()
+            db_session.execute(update(Vehiculo).where(Vehiculo.id == sample_vehiculo.id).values(color="Verde"))
+            db_session.commit()
+            vehiculo_cache.invalidate(sample_vehiculo.id)
+            return store(db_vehiculo, version)
+
+        monkeypatch.setattr(vehiculo_cache, "store", store_after_write)
+        assert client.get(url).json()["color"] == color
+        monkeypatch.undo()
+
+        assert client.get(url).json()["color"] == "Verde"
+
+    def test_write_between_read_and_store_async(self, async_client, db_session, sample_persona, monkeypatch):
+        """Test que los handlers asíncronos tampoco sirvan una respuesta cargada antes de una escritura"""
+        url = f"/api/personas/{sample_persona.id}"
+        nombre = sample_persona.nombre
+        astore = persona_cache.astore
+
+        async def astore_after_write(db_persona, version):
+            db_session.execute(update(Persona).where(Persona.id == sample_persona.id).values(nombre="Otra"))
+            db_session.commit()
+            await persona_cache.ainvalidate(sample_persona.id)
+            return await astore(db_persona, version)
+
+        monkeypatch.setattr(persona_cache, "astore", astore_after_write)
+        assert async_client.get(url).json()["nombre"] == nombre
+        monkeypatch.undo()
+
+        assert async_client.get(url).json()["nombre"] == "Otra"
+
+    def test_marca_cache_rejects_entry_older_than_delete(self, db_session, sample_marca):
+        """Test que la validación de marcas no use una entrada guardada antes de eliminarla"""
+        version = marca_cache.version(db_session)
+        db_marca = db_session.get(MarcaVehiculo, sample_marca.id)
+        db_session.delete(db_marca)
+        db_session.commit()
+        marca_cache.invalidate(sample_marca.id, sample_marca.nombre_marca)
+        # Una lectura concurrente guarda la marca que cargó antes del DELETE
+        marca_cache.store(db_marca, version)
+
+        assert marca_cache.get(db_session, sample_marca.id) is None
@@ -0,0 +1,188 @@
+import asyncio
+import gzip
+import json
+import zlib
+
+import brotli
+import pytest
+import zstandard
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.models.models import Persona
+from app.utils.compression import CODECS, CompressionMiddleware, negotiate, no_compression, parse_accept_encoding
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+# Descompresores incrementales de cada codificación (bloque -> bytes)
+DECOMPRESSORS = {
+    "gzip": lambda: zlib.decompressobj(31).decompress,
+    "br": lambda: brotli.Decompressor().process,
+    "zstd": lambda: zstandard.ZstdDecompressor().decompressobj().decompress,
+}
+
+
+@pytest.fixture
+def personas(db_session):
+    """Fixture con suficientes personas para superar el umbral de compresión"""
+    db_session.add_all(Persona(nombre=f"Persona {i}", cedula=f"cc-{i}") for i in range(60))
+    db_session.commit()
+
+
+def run_asgi(app, headers=GZIP):
+    """Ejecutar una petición GET contra `app` y devolver los mensajes ASGI enviados"""
+    messages = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+    scope = {
+        "type": "http", "method": "GET", "path": "/", "raw_path": b"/", "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+    }
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        # Sin desconexión del cliente: la respuesta termina por sí misma
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return messages[0], messages[1:]
+
+
+def streaming_app(chunks, media_type="application/x-ndjson"):
+    async def app(scope, receive, send):
+        response = StreamingResponse(iter(chunks), media_type=media_type)
+        await response(scope, receive, send)
+    return app
+
+
+class TestCompressionMiddleware:
+    """Tests para la compresión de las respuestas de la API"""
+
+    def test_large_list_is_compressed(self, client, personas):
+        """Test que un listado grande se envíe con gzip y el mismo contenido"""
+        compressed = client.get("/api/personas/", headers=GZIP)
+        plain = client.get("/api/personas/", headers={"Accept-Encoding": "identity"})
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in compressed.headers["vary"]
+        assert int(compressed.headers["content-length"]) < len(plain.content)
+        assert compressed.json() == plain.json()
+        assert "content-encoding" not in plain.headers
+        assert compressed.headers["etag"] == plain.headers["etag"]
+
+    def test_small_response_is_not_compressed(self, client):
+        """Test que las respuestas menores que el umbral se envíen sin comprimir"""
+        response = client.get("/", headers=GZIP)
+        assert "content-encoding" not in response.headers
+
+    def test_revalidation_with_compressed_etag(self, client, personas):
+        """Test que el ETag de la respuesta comprimida siga sirviendo para If-None-Match"""
+        etag = client.get("/api/personas/", headers=GZIP).headers["etag"]
+        response = client.get("/api/personas/", headers={**GZIP, "If-None-Match": etag})
+        assert response.status_code == 304
+
+    def test_export_is_compressed_while_streaming(self, client, personas):
+        """Test que la exportación en streaming se comprima sin Content-Length"""
+        response = client.get("/api/personas/export", headers=GZIP)
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert len(response.text.splitlines()) == 60
+
+    def test_streaming_chunks_are_flushed(self):
+        """Test que cada bloque del streaming se pueda descomprimir en cuanto llega"""
+        chunks = [json.dumps({"id": i}) + "\n" for i in range(3)]
+        start, bodies = run_asgi(CompressionMiddleware(streaming_app(chunks)))
+        assert (b"content-encoding", b"gzip") in start["headers"]
+
+        decompressor = zlib.decompressobj(31)
+        received = [decompressor.decompress(body["body"]).decode() for body in bodies]
+        assert received[:3] == chunks
+        assert bodies[-1]["more_body"] is False
+
+    @pytest.mark.parametrize("encoding", ["br", "zstd"])
+    def test_brotli_and_zstd_streaming(self, encoding):
+        """Test que brotli y zstd también vacíen cada bloque del streaming"""
+        chunks = [json.dumps({"id": i}) + "\n" for i in range(3)]
+        start, bodies = run_asgi(CompressionMiddleware(streaming_app(chunks)), {"Accept-Encoding": encoding})
+        assert (b"content-encoding", encoding.encode()) in start["headers"]
+
+        decompress = DECOMPRESSORS[encoding]()
+        received = [decompress(body["body"]).decode() for body in bodies]
+        assert received[:3] == chunks
+
+    def test_brotli_preferred_for_full_responses(self, client, personas):
+        """Test que con `br` aceptado se prefiera brotli y el contenido sea el mismo"""
+        compressed = client.get("/api/personas/", headers={"Accept-Encoding": "gzip, br, zstd"})
+        plain = client.get("/api/personas/", headers={"Accept-Encoding": "identity"})
+        assert compressed.headers["content-encoding"] == "br"
+        assert int(compressed.headers["content-length"]) < len(plain.content)
+        assert compressed.json() == plain.json()
+
+    def test_route_opt_out(self):
+        """Test que un endpoint con @no_compression no se comprima"""
+        app = FastAPI()
+
+        @app.get("/grande")
+        def grande():
+            return {"datos": "x" * 5000}
+
+        @app.get("/sin-comprimir")
+        @no_compression
+        def sin_comprimir():
+            return {"datos": "x" * 5000}
+
+        app.add_middleware(CompressionMiddleware, minimum_size=100)
+        with TestClient(app) as test_client:
+            assert test_client.get("/grande", headers=GZIP).headers["content-encoding"] == "gzip"
+            assert "content-encoding" not in test_client.get("/sin-comprimir", headers=GZIP).headers
+
+    def test_binary_and_encoded_responses_are_not_compressed(self):
+        """Test que no se compriman tipos binarios ni respuestas ya codificadas"""
+        start, _ = run_asgi(CompressionMiddleware(streaming_app([b"\x89PNG" * 500], "image/png")))
+        assert not any(name == b"content-encoding" for name, _ in start["headers"])
+
+        async def already_gzip(scope, receive, send):
+            body = gzip.compress(b"a" * 5000)
+            await send({"type": "http.response.start", "status": 200, "headers": [
+                (b"content-type", b"application/json"), (b"content-encoding", b"gzip"),
+            ]})
+            await send({"type": "http.response.body", "body": body})
+
+        start, bodies = run_asgi(CompressionMiddleware(already_gzip))
+        assert gzip.decompress(bodies[0]["body"]) == b"a" * 5000
+
+    def test_strong_etag_becomes_weak(self):
+        """Test que un ETag fuerte se marque como débil al comprimir"""
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": [
+                (b"content-type", b"text/plain"), (b"etag", b'"abc"'), (b"content-length", b"5000"),
+            ]})
+            await send({"type": "http.response.body", "body": b"a" * 5000})
+
+        start, bodies = run_asgi(CompressionMiddleware(app))
+        headers = dict(start["headers"])
+        assert headers[b"etag"] == b'W/"abc"'
+        assert int(headers[b"content-length"]) == len(bodies[0]["body"])
+
+
+class TestNegotiation:
+    """Tests para la negociación de Accept-Encoding"""
+
+    def test_all_codecs_available(self):
+        """Test que brotli y zstd estén instalados (requirements.txt) y no solo gzip"""
+        assert set(CODECS) == {"gzip", "br", "zstd"}
+
+    def test_parse_weights(self):
+        """Test leer los pesos q de Accept-Encoding"""
+        assert parse_accept_encoding("gzip;q=0.5, br, *;q=0") == {"gzip": 0.5, "br": 1.0, "*": 0.0}
+
+    def test_server_preference_among_accepted(self):
+        """Test que se elija la primera codificación del servidor que el cliente acepta"""
+        assert negotiate("gzip, br", ("br", "gzip")) == "br"
+        assert negotiate("gzip, br;q=0", ("br", "gzip")) == "gzip"
+        assert negotiate("*", ("zstd", "gzip")) == "zstd"
+        assert negotiate("identity", ("br", "gzip")) is None
+        assert negotiate("", ("gzip",)) is None
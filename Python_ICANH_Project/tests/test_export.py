@@ -0,0 +1,73 @@
+import csv
+import io
+import json
+
+
+class TestExport:
+    """Tests para los endpoints de exportación en streaming"""
+
+    def test_export_vehiculos_ndjson(self, client, sample_vehiculo):
+        """Test exportar vehículos como NDJSON"""
+        response = client.get("/api/vehiculos/export")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert 'filename="vehiculo.ndjson"' in response.headers["content-disposition"]
+
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert rows == [{
+            "id": sample_vehiculo.id,
+            "modelo": sample_vehiculo.modelo,
+            "marca_id": sample_vehiculo.marca_id,
+            "numero_puertas": sample_vehiculo.numero_puertas,
+            "color": sample_vehiculo.color,
+        }]
+
+    def test_export_personas_csv(self, client, multiple_personas):
+        """Test exportar personas como CSV ordenadas por id"""
+        response = client.get("/api/personas/export", params={"format": "csv"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [int(row["id"]) for row in rows] == [persona.id for persona in multiple_personas]
+        assert rows[0]["cedula"] == multiple_personas[0].cedula
+
+    def test_export_propietarios(self, client, vehiculo_con_propietario):
+        """Test exportar las relaciones vehículo-propietario"""
+        response = client.get("/api/vehiculos/propietarios/export")
+        assert response.status_code == 200
+        assert 'filename="vehiculo_persona.ndjson"' in response.headers["content-disposition"]
+
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert rows == [{
+            "vehiculo_id": vehiculo_con_propietario.id,
+            "persona_id": vehiculo_con_propietario.propietarios[0].id,
+        }]
+
+    def test_export_empty_table_csv(self, client):
+        """Test que una tabla vacía exporte solo el encabezado"""
+        response = client.get("/api/marcas-vehiculo/export", params={"format": "csv"})
+        assert response.status_code == 200
+        assert response.text.strip() == "id,nombre_marca,pais"
+
+    def test_export_invalid_format(self, client):
+        """Test que un formato desconocido sea rechazado"""
+        response = client.get("/api/marcas-vehiculo/export", params={"format": "xml"})
+        assert response.status_code == 422
+
+    def test_export_in_async_mode(self, async_client, multiple_marcas):
+        """Test que /export no sea capturado por /{id} en modo asíncrono"""
+        response = async_client.get("/api/marcas-vehiculo/export")
+        assert response.status_code == 200
+        assert len(response.text.splitlines()) == len(multiple_marcas)
+
+    def test_export_streams_in_batches(self, client, multiple_personas, monkeypatch):
+        """Test que la exportación recorra el cursor en varios bloques"""
+        monkeypatch.setattr("app.utils.export.EXPORT_BATCH_SIZE", 2)
+
+        with client.stream("GET", "/api/personas/export") as response:
+            chunks = [chunk for chunk in response.iter_text() if chunk]
+
+        lines = "".join(chunks).splitlines()
+        assert len(lines) == len(multiple_personas)
+        assert json.loads(lines[-1])["id"] == multiple_personas[-1].id
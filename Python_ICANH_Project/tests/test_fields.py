@@ -0,0 +1,101 @@
+import pytest
+
+from app.models.models import Vehiculo
+from app.utils import fields, rows
+from app.utils.pagination import NEXT_CURSOR_HEADER
+
+
+class TestFieldSelection:
+    """Tests para la selección de campos (`fields=`) y la expansión de relaciones (`expand=`)"""
+
+    @pytest.fixture
+    def vehiculos(self, db_session, sample_marca, sample_persona):
+        """Fixture que crea 3 vehículos con un propietario cada uno"""
+        vehiculos = [
+            Vehiculo(
+                modelo=f"Modelo {i}", marca_id=sample_marca.id, numero_puertas=4,
+                color="Gris", propietarios=[sample_persona]
+            )
+            for i in range(3)
+        ]
+        db_session.add_all(vehiculos)
+        db_session.commit()
+        return [vehiculo.id for vehiculo in vehiculos]
+
+    def test_default_shape_unchanged(self, client, vehiculos):
+        """Test que sin fields ni expand la respuesta conserve su forma completa"""
+        item = client.get("/api/vehiculos/").json()[0]
+        assert set(item) == {"id", "modelo", "marca_id", "numero_puertas", "color", "marca", "propietarios"}
+
+    def test_fields_projection(self, client, vehiculos, count_queries):
+        """Test que fields devuelva solo las columnas pedidas sin cargar relaciones"""
+        with count_queries() as statements:
+            response = client.get("/api/vehiculos/", params={"fields": "modelo"})
+        assert response.status_code == 200
+        assert response.json()[0] == {"id": vehiculos[0], "modelo": "Modelo 0"}
+        # Versiones de tabla (ETag) y una sola consulta, sin JOIN a la marca ni columnas no pedidas
+        assert len(statements) == 2
+        assert "marca_vehiculo" not in statements[-1]
+        assert "color" not in statements[-1]
+
+    def test_expand_relations(self, client, vehiculos, sample_marca, sample_persona):
+        """Test que expand incluya solo las relaciones listadas"""
+        response = client.get("/api/vehiculos/", params={"fields": "id,modelo", "expand": "marca"})
+        item = response.json()[0]
+        assert set(item) == {"id", "modelo", "marca"}
+        assert item["marca"]["nombre_marca"] == sample_marca.nombre_marca
+
+        response = client.get(f"/api/vehiculos/{vehiculos[0]}", params={"expand": "propietarios"})
+        item = response.json()
+        assert "marca" not in item
+        assert item["color"] == "Gris"
+        assert [persona["id"] for persona in item["propietarios"]] == [sample_persona.id]
+
+    def test_fields_keep_cursor_header(self, client, vehiculos):
+        """Test que la respuesta reducida conserve el header de paginación"""
+        response = client.get("/api/vehiculos/", params={"fields": "modelo", "limit": 2})
+        assert len(response.json()) == 2
+        assert NEXT_CURSOR_HEADER in response.headers
+
+    def test_expand_vehiculos_of_persona_and_marca(self, client, vehiculos, sample_persona, sample_marca):
+        """Test expandir los vehículos de una persona y de una marca"""
+        response = client.get(f"/api/personas/{sample_persona.id}", params={"fields": "nombre", "expand": "vehiculos"})
+        assert response.status_code == 200
+        persona = response.json()
+        assert set(persona) == {"id", "nombre", "vehiculos"}
+        assert sorted(vehiculo["id"] for vehiculo in persona["vehiculos"]) == vehiculos
+
+        response = client.get("/api/marcas-vehiculo/", params={"expand": "vehiculos"})
+        assert len(response.json()[0]["vehiculos"]) == 3
+
+    def test_unknown_field_returns_400(self, client, vehiculos):
+        """Test que un campo o relación desconocidos devuelvan 400"""
+        response = client.get("/api/vehiculos/", params={"fields": "modelo,precio"})
+        assert response.status_code == 400
+        assert "precio" in response.json()["detail"]
+
+        response = client.get("/api/personas/", params={"expand": "marca"})
+        assert response.status_code == 400
+
+    def test_async_fields_and_expand(self, async_client, vehiculos, count_queries):
+        """Test que los handlers asíncronos apliquen la misma selección"""
+        with count_queries() as statements:
+            response = async_client.get("/api/vehiculos/", params={"fields": "modelo,color", "expand": "marca"})
+        assert response.status_code == 200
+        assert set(response.json()[0]) == {"id", "modelo", "color", "marca"}
+        assert len(statements) == 2
+
+        response = async_client.get(f"/api/vehiculos/{vehiculos[1]}", params={"fields": "modelo"})
+        assert response.json() == {"id": vehiculos[1], "modelo": "Modelo 1"}
+
+    @pytest.mark.parametrize("path", ["/api/vehiculos/", "/api/personas/", "/api/marcas-vehiculo/"])
+    def test_direct_serialization_matches_response_model(self, client, vehiculos, monkeypatch, path):
+        """Test que JSON_SERIALIZATION=direct produzca los mismos bytes que el response_model de FastAPI"""
+        monkeypatch.setattr(rows, "ROW_RESPONSES", False)
+        direct = client.get(path)
+        monkeypatch.setattr(fields, "DIRECT_JSON", False)
+        standard = client.get(path)
+        assert direct.status_code == standard.status_code == 200
+        assert direct.content == standard.content
+        assert direct.headers["content-type"] == standard.headers["content-type"]
+        assert direct.headers["etag"] == standard.headers["etag"]
@@ -0,0 +1,108 @@
+import pytest
+from sqlalchemy import select
+
+from app.models.models import Persona, Vehiculo
+from app.utils.filters import VEHICULO_SORTS, prefix_condition
+from app.utils.pagination import NEXT_CURSOR_HEADER
+
+
+@pytest.fixture
+def parque(db_session, multiple_marcas):
+    """Fixture con 8 vehículos de distintas marcas, modelos, colores y puertas"""
+    datos = [
+        ("Corolla", "Rojo", 4), ("Corsa", "Azul", 3), ("Civic", "Rojo", 4), ("Clio", "Gris", 5),
+        ("Accord", "Rojo", 2), ("Mazda 3", "Azul", 4), ("Corolla Cross", "Gris", 5), ("Yaris", "Rojo", 5),
+    ]
+    vehiculos = [
+        Vehiculo(modelo=modelo, color=color, numero_puertas=puertas, marca_id=multiple_marcas[i % 2].id)
+        for i, (modelo, color, puertas) in enumerate(datos)
+    ]
+    db_session.add_all(vehiculos)
+    db_session.commit()
+    return vehiculos
+
+
+def walk(client, url, params):
+    """Recorrer un listado siguiendo X-Next-Cursor y devolver todos los elementos"""
+    items = []
+    response = client.get(url, params=params)
+    while True:
+        assert response.status_code == 200
+        items.extend(response.json())
+        next_cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not next_cursor:
+            return items
+        response = client.get(url, params={**params, "cursor": next_cursor})
+
+
+class TestListFilters:
+    """Tests para los filtros de los listados"""
+
+    def test_filter_vehiculos(self, client, parque, multiple_marcas):
+        """Test combinar filtros exactos y de rango"""
+        params = {"color": "Rojo", "numero_puertas_min": 4, "marca_id": multiple_marcas[0].id}
+        response = client.get("/api/vehiculos/", params=params)
+        assert response.status_code == 200
+        assert sorted(v["modelo"] for v in response.json()) == ["Civic", "Corolla"]
+
+    def test_prefix_is_case_sensitive_range(self, client, parque):
+        """Test que el prefijo del modelo se resuelva como rango"""
+        response = client.get("/api/vehiculos/", params={"modelo": "Coro"})
+        assert [v["modelo"] for v in response.json()] == ["Corolla", "Corolla Cross"]
+        assert client.get("/api/vehiculos/", params={"modelo": "coro"}).json() == []
+
+    def test_filter_personas_and_marcas(self, client, db_session, multiple_marcas):
+        """Test los filtros de personas (prefijos) y marcas (país)"""
+        db_session.add_all([Persona(nombre="Ana Gómez", cedula="111"), Persona(nombre="Andrés Ruiz", cedula="222")])
+        db_session.commit()
+        response = client.get("/api/personas/", params={"nombre": "An", "cedula": "2"})
+        assert [p["nombre"] for p in response.json()] == ["Andrés Ruiz"]
+
+        pais = multiple_marcas[0].pais
+        response = client.get("/api/marcas-vehiculo/", params={"pais": pais})
+        assert response.json() and all(m["pais"] == pais for m in response.json())
+
+
+class TestListSorting:
+    """Tests para el ordenamiento de los listados"""
+
+    def test_sort_with_cursor(self, client, parque):
+        """Test recorrer un orden por modelo descendente con cursor"""
+        items = walk(client, "/api/vehiculos/", {"sort": "-modelo", "limit": 3})
+        assert [v["modelo"] for v in items] == sorted((v.modelo for v in parque), reverse=True)
+
+    def test_sort_with_filters_and_partial_fields(self, client, parque):
+        """Test que el cursor funcione aunque `fields` no incluya la columna de orden"""
+        params = {"sort": "color", "color": "Rojo", "fields": "modelo", "limit": 2}
+        items = walk(client, "/api/vehiculos/", params)
+        rojos = sorted((v for v in parque if v.color == "Rojo"), key=lambda v: v.id)
+        assert [v["id"] for v in items] == [v.id for v in rojos]
+        assert set(items[0]) == {"id", "modelo"}
+
+    def test_invalid_sort_key(self, client):
+        """Test que una clave fuera de la lista blanca devuelva 400"""
+        response = client.get("/api/vehiculos/", params={"sort": "numero_puertas"})
+        assert response.status_code == 400
+        assert "sort" in response.json()["detail"]
+
+    def test_cursor_from_other_sort_rejected(self, client, parque):
+        """Test que un cursor generado con otro orden sea rechazado"""
+        cursor = client.get("/api/vehiculos/", params={"limit": 2}).headers[NEXT_CURSOR_HEADER]
+        response = client.get("/api/vehiculos/", params={"sort": "modelo", "cursor": cursor})
+        assert response.status_code == 400
+
+    def test_async_filters_and_sort(self, async_client, parque):
+        """Test que los handlers asíncronos filtren y ordenen igual"""
+        params = {"sort": "-modelo", "modelo": "C", "fields": "color", "limit": 2}
+        items = walk(async_client, "/api/vehiculos/", params)
+        esperados = sorted((v for v in parque if v.modelo.startswith("C")), key=lambda v: v.modelo, reverse=True)
+        assert [v["id"] for v in items] == [v.id for v in esperados]
+
+    def test_sort_uses_index(self, db_session):
+        """Test que el prefijo y el orden por modelo se resuelvan con su índice"""
+        _, columns, _ = VEHICULO_SORTS.resolve("modelo")
+        statement = select(Vehiculo.id).where(prefix_condition(Vehiculo.modelo, "Co")).order_by(*columns)
+        sql = str(statement.compile(compile_kwargs={"literal_binds": True}))
+        plan = str(db_session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all())
+        assert "ix_vehiculo_modelo" in plan
+        assert "TEMP B-TREE" not in plan
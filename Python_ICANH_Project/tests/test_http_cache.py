@@ -0,0 +1,97 @@
+from app.utils.http_cache import DEFAULT_CACHE_CONTROL, HttpCache, etag_matches
+
+
+class TestEtagMatching:
+    """Tests para la comparación de If-None-Match"""
+
+    def test_weak_comparison_and_lists(self):
+        """Test que la comparación ignore el prefijo W/ y acepte listas y *"""
+        assert etag_matches('W/"abc"', 'W/"abc"')
+        assert etag_matches('"abc"', 'W/"abc"')
+        assert etag_matches('"x", W/"abc"', 'W/"abc"')
+        assert etag_matches("*", 'W/"abc"')
+        assert not etag_matches('W/"abd"', 'W/"abc"')
+
+    def test_cache_control_from_environment(self, monkeypatch):
+        """Test que el Cache-Control de un router se configure por variable de entorno"""
+        monkeypatch.setenv("CACHE_CONTROL_PRUEBA", "public, max-age=30")
+        assert HttpCache(("persona",), env_var="CACHE_CONTROL_PRUEBA").cache_control == "public, max-age=30"
+        assert HttpCache(("persona",)).cache_control == DEFAULT_CACHE_CONTROL
+
+
+class TestConditionalGet:
+    """Tests para ETag / If-None-Match en los endpoints GET"""
+
+    def test_etag_and_304(self, client, sample_vehiculo, count_queries):
+        """Test que un If-None-Match vigente devuelva 304 sin consultar el vehículo"""
+        url = f"/api/vehiculos/{sample_vehiculo.id}"
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        assert etag.startswith('W/"')
+        assert response.headers["Cache-Control"] == DEFAULT_CACHE_CONTROL
+
+        with count_queries() as statements:
+            response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+        # Solo se leen las versiones de tabla
+        assert len(statements) == 1
+        assert "version_tabla" in statements[0]
+
+    def test_write_changes_etag(self, client, sample_vehiculo):
+        """Test que una escritura invalide el ETag de los endpoints que dependen de la tabla"""
+        url = f"/api/vehiculos/{sample_vehiculo.id}"
+        etag = client.get(url).headers["ETag"]
+        list_etag = client.get("/api/vehiculos/").headers["ETag"]
+
+        assert client.put(url, json={"color": "Verde"}).status_code == 200
+
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["color"] == "Verde"
+        assert client.get("/api/vehiculos/", headers={"If-None-Match": list_etag}).status_code == 200
+
+    def test_bulk_and_owner_writes_change_etag(self, client, sample_marca, sample_vehiculo, sample_persona):
+        """Test que las escrituras masivas y las asignaciones también cambien las versiones"""
+        etag = client.get("/api/marcas-vehiculo/").headers["ETag"]
+        client.post("/api/marcas-vehiculo/bulk", json=[{"nombre_marca": "Lada", "pais": "Rusia"}])
+        assert client.get("/api/marcas-vehiculo/", headers={"If-None-Match": etag}).status_code == 200
+
+        url = f"/api/personas/{sample_persona.id}/vehiculos"
+        etag = client.get(url).headers["ETag"]
+        client.post(f"/api/vehiculos/{sample_vehiculo.id}/propietarios", json={"persona_id": sample_persona.id})
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert len(response.json()["vehiculos"]) == 1
+
+    def test_etag_depends_on_query(self, client, multiple_personas):
+        """Test que parámetros distintos produzcan ETags distintos"""
+        first = client.get("/api/personas/", params={"limit": 1}).headers["ETag"]
+        second = client.get("/api/personas/", params={"limit": 2}).headers["ETag"]
+        assert first != second
+
+        response = client.get("/api/personas/", params={"limit": 2}, headers={"If-None-Match": first})
+        assert response.status_code == 200
+
+    def test_etag_on_partial_responses_and_export(self, client, sample_vehiculo):
+        """Test que las respuestas reducidas y las exportaciones también lleven ETag"""
+        response = client.get(f"/api/vehiculos/{sample_vehiculo.id}", params={"fields": "modelo"})
+        assert "ETag" in response.headers
+
+        response = client.get("/api/vehiculos/export")
+        etag = response.headers["ETag"]
+        assert client.get("/api/vehiculos/export", headers={"If-None-Match": etag}).status_code == 304
+
+    def test_cache_stats_not_cached(self, client):
+        """Test que los endpoints marcados con no_http_cache no publiquen ETag"""
+        response = client.get("/api/marcas-vehiculo/cache/stats")
+        assert response.status_code == 200
+        assert "ETag" not in response.headers
+
+    def test_async_mode_conditional_get(self, async_client, sample_vehiculo):
+        """Test que las rutas asíncronas conserven la dependencia de caché del router"""
+        url = f"/api/vehiculos/{sample_vehiculo.id}"
+        etag = async_client.get(url).headers["ETag"]
+        assert async_client.get(url, headers={"If-None-Match": etag}).status_code == 304
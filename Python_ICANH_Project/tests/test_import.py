@@ -0,0 +1,170 @@
+import csv
+import io
+import json
+
+from app.models.models import MarcaVehiculo, Persona, Vehiculo, vehiculo_persona
+
+
+def _ndjson(records):
+    """Serializar registros como NDJSON"""
+    return "".join(json.dumps(record) + "\n" for record in records).encode()
+
+
+class TestImport:
+    """Tests para la importación masiva desde archivo"""
+
+    def test_import_mixed_ndjson(self, client, db_session):
+        """Test importar marcas, personas, vehículos y propietarios en un mismo archivo"""
+        content = _ndjson([
+            {"tipo": "marca", "nombre_marca": "Renault", "pais": "Francia"},
+            {"tipo": "persona", "nombre": "Ana Gómez", "cedula": "111"},
+            {"tipo": "vehiculo", "id": 50, "modelo": "Logan", "nombre_marca": "Renault", "numero_puertas": 4, "color": "Gris"},
+            {"tipo": "propietario", "vehiculo_id": 50, "cedula": "111"},
+        ])
+
+        response = client.post("/api/import", files={"archivo": ("datos.ndjson", content)})
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["procesadas"] == 4
+        assert data["rechazadas"] == 0
+        assert data["importadas"] == {"marca": 1, "persona": 1, "vehiculo": 1, "propietario": 1}
+
+        vehiculo = db_session.get(Vehiculo, 50)
+        assert vehiculo.marca.nombre_marca == "Renault"
+        assert [persona.cedula for persona in vehiculo.propietarios] == ["111"]
+
+    def test_import_csv_upserts_in_batches(self, client, db_session, sample_persona):
+        """Test importar personas desde CSV en varios lotes actualizando las existentes"""
+        lines = ["nombre,cedula", f"Nombre Nuevo,{sample_persona.cedula}"]
+        lines += [f"Persona {i},{9000 + i}" for i in range(4)]
+        content = ("\n".join(lines) + "\n").encode()
+
+        response = client.post(
+            "/api/import",
+            params={"tipo": "persona", "batch_size": 2},
+            files={"archivo": ("personas.csv", content)},
+        )
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["importadas"]["persona"] == 5
+        assert data["lotes"] == 3
+
+        db_session.expire_all()
+        assert db_session.query(Persona).count() == 5
+        assert db_session.get(Persona, sample_persona.id).nombre == "Nombre Nuevo"
+
+    def test_import_reports_rejected_rows(self, client, db_session):
+        """Test que las filas inválidas se reporten sin detener la importación"""
+        content = (
+            _ndjson([{"tipo": "marca", "nombre_marca": "Fiat", "pais": "Italia"}])
+            + b"no es json\n"
+            + _ndjson([
+                {"tipo": "vehiculo", "modelo": "Uno", "nombre_marca": "Inexistente", "numero_puertas": 2, "color": "Rojo"},
+                {"tipo": "vehiculo", "modelo": "Palio", "nombre_marca": "Fiat", "numero_puertas": 9, "color": "Rojo"},
+                {"tipo": "avion", "modelo": "A320"},
+                {"tipo": "propietario", "vehiculo_id": 999, "persona_id": 1},
+            ])
+        )
+
+        response = client.post("/api/import", files={"archivo": ("datos.jsonl", content)})
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["importadas"]["marca"] == 1
+        assert data["rechazadas"] == 5
+        motivos = {fila["linea"]: fila["motivo"] for fila in data["filas_rechazadas"]}
+        assert motivos[2] == "JSON inválido"
+        assert motivos[3] == "La marca especificada no existe"
+        assert "numero_puertas" in motivos[4]
+        assert motivos[5] == "Tipo de registro desconocido"
+        assert motivos[6] == "Vehículo no encontrado"
+        assert db_session.query(MarcaVehiculo).count() == 1
+        assert db_session.query(Vehiculo).count() == 0
+
+    def test_import_non_utf8_line_is_rejected(self, client, db_session):
+        """Test que una línea que no es UTF-8 se rechace sin perder los lotes ya escritos"""
+        marcas = [{"tipo": "marca", "nombre_marca": f"Marca {i}", "pais": "Colombia"} for i in range(1200)]
+        content = _ndjson(marcas[:1000]) + '{"tipo": "marca", "nombre_marca": "Peñón", "pais": "España"}\n'.encode("latin-1")
+        content += _ndjson(marcas[1000:])
+
+        response = client.post(
+            "/api/import",
+            params={"batch_size": 500},
+            files={"archivo": ("marcas.ndjson", content)},
+        )
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["procesadas"] == 1201
+        assert data["importadas"]["marca"] == 1200
+        assert data["filas_rechazadas"] == [
+            {"linea": 1001, "tipo": None, "motivo": "La línea no está codificada en UTF-8"}
+        ]
+        assert db_session.query(MarcaVehiculo).count() == 1200
+
+    def test_import_csv_invalid_rows(self, client, db_session):
+        """Test que en un CSV se rechacen las filas que no son UTF-8 o que `csv` no puede leer"""
+        content = (
+            "\ufeffnombre,cedula\nAna,111\n".encode()
+            + "José,222\n".encode("latin-1")
+            + b"x" * (csv.field_size_limit() + 1) + b",333\n"
+            + 'Sofía "la ""Sofi""",444\n'.encode()
+            + '"Pedro\nPérez",555\n'.encode()
+        )
+
+        response = client.post("/api/import", params={"tipo": "persona"}, files={"archivo": ("personas.csv", content)})
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["importadas"]["persona"] == 3
+        motivos = {fila["linea"]: fila["motivo"] for fila in data["filas_rechazadas"]}
+        assert motivos[3] == "La línea no está codificada en UTF-8"
+        assert motivos[4].startswith("CSV inválido")
+        assert db_session.query(Persona).count() == 3
+
+    def test_import_roundtrip_with_export(self, client, db_session, sample_vehiculo):
+        """Test que un CSV exportado se pueda volver a importar actualizando por id"""
+        exported = client.get("/api/vehiculos/export", params={"format": "csv"}).text
+        rows = list(csv.DictReader(io.StringIO(exported)))
+        rows[0]["color"] = "Verde"
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+        content = buffer.getvalue().encode()
+
+        response = client.post(
+            "/api/import",
+            params={"tipo": "vehiculo"},
+            files={"archivo": ("vehiculos.csv", content)},
+        )
+        assert response.json()["importadas"]["vehiculo"] == 1
+
+        db_session.expire_all()
+        assert db_session.query(Vehiculo).count() == 1
+        assert db_session.get(Vehiculo, sample_vehiculo.id).color == "Verde"
+
+    def test_import_roundtrip_propietarios(self, client, db_session, vehiculo_con_propietario, sample_persona):
+        """Test que las relaciones exportadas se puedan volver a importar"""
+        exported = client.get("/api/vehiculos/propietarios/export", params={"format": "csv"}).content
+        db_session.execute(vehiculo_persona.delete())
+        db_session.commit()
+
+        response = client.post(
+            "/api/import",
+            params={"tipo": "propietario"},
+            files={"archivo": ("propietarios.csv", exported)},
+        )
+        assert response.json()["importadas"]["propietario"] == 1
+
+        db_session.expire_all()
+        propietarios = db_session.get(Vehiculo, vehiculo_con_propietario.id).propietarios
+        assert [persona.id for persona in propietarios] == [sample_persona.id]
+
+    def test_import_unknown_format(self, client):
+        """Test que un archivo sin formato reconocible sea rechazado"""
+        response = client.post("/api/import", files={"archivo": ("datos.txt", b"x")})
+        assert response.status_code == 400
+        assert "formato" in response.json()["detail"]
@@ -0,0 +1,77 @@
+import pytest
+
+from app.models.models import Persona, Vehiculo
+
+
+class TestQueryCount:
+    """Tests que verifican que los listados ejecuten un número fijo de consultas"""
+
+    @pytest.fixture
+    def flota(self, db_session, sample_marca):
+        """Fixture que crea una persona con 6 vehículos, cada uno con 2 propietarios"""
+        persona = Persona(nombre="Dueña de flota", cedula="9000000001")
+        socio = Persona(nombre="Socio", cedula="9000000002")
+        vehiculos = [
+            Vehiculo(
+                modelo=f"Modelo {i}", marca_id=sample_marca.id, numero_puertas=4,
+                color="Azul", propietarios=[persona, socio]
+            )
+            for i in range(6)
+        ]
+        db_session.add_all(vehiculos)
+        db_session.commit()
+        return persona.id, [vehiculo.id for vehiculo in vehiculos]
+
+    def test_read_vehiculos_query_count(self, client, flota, count_queries):
+        """Test que el listado de vehículos no haga una consulta por vehículo"""
+        with count_queries() as statements:
+            response = client.get("/api/vehiculos/")
+        assert response.status_code == 200
+        assert len(response.json()) == 6
+        assert all(len(item["propietarios"]) == 2 for item in response.json())
+        # Versiones de tabla (ETag) + vehículos con su marca (JOIN) + propietarios de toda la página (IN)
+        assert len(statements) == 3
+
+    def test_query_count_independent_of_page_size(self, client, flota, count_queries):
+        """Test que el número de consultas no crezca con el tamaño de la página"""
+        counts = []
+        for limit in (1, 6):
+            with count_queries() as statements:
+                client.get("/api/vehiculos/", params={"limit": limit})
+            counts.append(len(statements))
+        assert counts[0] == counts[1]
+
+    def test_read_vehiculo_propietarios_query_count(self, client, flota, count_queries):
+        """Test que el detalle con propietarios use una consulta por relación"""
+        with count_queries() as statements:
+            response = client.get(f"/api/vehiculos/{flota[1][0]}/propietarios")
+        assert response.status_code == 200
+        assert len(response.json()["propietarios"]) == 2
+        assert len(statements) == 3
+
+    def test_read_persona_vehiculos_query_count(self, client, flota, count_queries):
+        """Test que los vehículos de una persona se carguen sin N+1"""
+        with count_queries() as statements:
+            response = client.get(f"/api/personas/{flota[0]}/vehiculos")
+        assert response.status_code == 200
+        vehiculos = response.json()["vehiculos"]
+        assert len(vehiculos) == 6
+        assert all(vehiculo["marca"] is not None for vehiculo in vehiculos)
+        # Versiones de tabla + persona + vehículos con su marca + propietarios de los vehículos
+        assert len(statements) == 4
+
+    def test_async_read_vehiculos_query_count(self, async_client, flota, count_queries):
+        """Test que el listado asíncrono use las mismas estrategias de carga"""
+        with count_queries() as statements:
+            response = async_client.get("/api/vehiculos/")
+        assert response.status_code == 200
+        assert len(response.json()) == 6
+        assert len(statements) == 3
+
+    def test_async_read_persona_vehiculos_query_count(self, async_client, flota, count_queries):
+        """Test que los vehículos de una persona en modo asíncrono se carguen sin N+1"""
+        with count_queries() as statements:
+            response = async_client.get(f"/api/personas/{flota[0]}/vehiculos")
+        assert response.status_code == 200
+        assert len(response.json()["vehiculos"]) == 6
+        assert len(statements) == 4
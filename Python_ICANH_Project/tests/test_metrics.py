@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.database.database import get_db, instrument_engine
+from app.utils import metrics
+from app.utils.cache import CacheNamespace, MemoryCacheBackend
+from app.utils.metrics import (
+    Counter,
+    Histogram,
+    Registry,
+    RequestQueries,
+    cache_collector,
+)
+
+
+def sample(metric, name, **labels):
+    """Valor de la muestra `name` de `metric` con exactamente `labels` (0 si no existe)"""
+    for sample_name, sample_labels, value in metric.samples():
+        if sample_name == name and sample_labels == labels:
+            return value
+    return 0
+
+
+@pytest.fixture
+def instrumented_engine(db_session):
+    """Fixture que mide las consultas del engine de pruebas"""
+    engine = db_session.get_bind()
+    instrument_engine(engine)
+    return engine
+
+
+class TestRegistry:
+    """Tests para las métricas y su exportación en formato Prometheus"""
+
+    def test_render_counter_with_labels(self):
+        """Test que un contador se exporte con HELP, TYPE y etiquetas escapadas"""
+        registry = Registry()
+        counter = registry.register(Counter("peticiones_total", "Peticiones", ("ruta",)))
+        counter.inc(ruta='/a"b')
+        counter.inc(2, ruta='/a"b')
+        assert registry.render() == (
+            "# HELP peticiones_total Peticiones\n"
+            "# TYPE peticiones_total counter\n"
+            'peticiones_total{ruta="/a\\"b"} 3\n'
+        )
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test que los intervalos del histograma sean acumulados e incluyan +Inf, suma y conteo"""
+        histogram = Histogram("latencia_seconds", "Latencia", buckets=(0.1, 1))
+        for value in (0.05, 0.5, 0.5, 3):
+            histogram.observe(value)
+        assert [value for _, _, value in histogram.samples()] == [1, 3, 4, 4.05, 4]
+        assert sample(histogram, "latencia_seconds_bucket", le="+Inf") == 4
+
+    def test_labels_must_match(self):
+        """Test que observar con etiquetas distintas a las declaradas falle"""
+        with pytest.raises(ValueError):
+            Counter("c_total", "C", ("ruta",)).inc(metodo="GET")
+
+    def test_cache_collector(self):
+        """Test que el colector de cachés publique aciertos, fallos y proporción"""
+        cache = CacheNamespace(MemoryCacheBackend(10, 60), "prueba")
+        cache.set(1, b"{}")
+        cache.get(1)
+        cache.get(2)
+        hits, misses, ratio = cache_collector({"prueba": cache})()
+        assert sample(hits, "cache_hits_total", cache="prueba") == 1
+        assert sample(misses, "cache_misses_total", cache="prueba") == 1
+        assert sample(ratio, "cache_hit_ratio", cache="prueba") == 0.5
+
+
+class TestMetricsEndpoint:
+    """Tests para /metrics y la medición de las peticiones"""
+
+    def test_metrics_endpoint(self, client):
+        """Test que /metrics responda en el formato de texto de Prometheus"""
+        client.get("/health")
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE http_request_duration_seconds histogram" in response.text
+        assert 'http_requests_total{method="GET",route="/health",status="200"}' in response.text
+        assert "cache_hit_ratio" in response.text
+
+    def test_requests_grouped_by_route_template(self, client):
+        """Test que las peticiones se agrupen por plantilla de ruta y código de estado"""
+        route = "/api/vehiculos/{vehiculo_id}"
+        before = metrics.HTTP_REQUESTS.value(method="GET", route=route, status="404")
+        timed = metrics.HTTP_REQUEST_DURATION.count(method="GET", route=route)
+        client.get("/api/vehiculos/998")
+        client.get("/api/vehiculos/999")
+        assert metrics.HTTP_REQUESTS.value(method="GET", route=route, status="404") == before + 2
+        assert metrics.HTTP_REQUEST_DURATION.count(method="GET", route=route) == timed + 2
+        assert metrics.HTTP_REQUESTS_IN_PROGRESS.value(method="GET") == 0
+
+    def test_unmatched_route(self, client):
+        """Test que las URLs sin ruta compartan una sola serie"""
+        before = metrics.HTTP_REQUESTS.value(method="GET", route=metrics.UNMATCHED_ROUTE, status="404")
+        client.get("/no-existe/1")
+        client.get("/no-existe/2")
+        assert metrics.HTTP_REQUESTS.value(method="GET", route=metrics.UNMATCHED_ROUTE, status="404") == before + 2
+
+    def test_db_queries_per_request(self, client, instrumented_engine):
+        """Test que se cuenten las consultas de cada petición en los handlers síncronos"""
+        labels = {"method": "GET", "route": "/api/vehiculos/"}
+        queries = sample(metrics.HTTP_REQUEST_DB_QUERIES, "http_request_db_queries_sum", **labels)
+        client.get("/api/vehiculos/")
+        # Versiones de tabla (ETag) y la página de vehículos (sin propietarios que leer)
+        assert sample(metrics.HTTP_REQUEST_DB_QUERIES, "http_request_db_queries_sum", **labels) == queries + 2
+        assert sample(metrics.HTTP_REQUEST_DB_DURATION, "http_request_db_duration_seconds_sum", **labels) > 0
+
+
+class TestDatabaseInstrumentation:
+    """Tests para la medición de consultas y del pool de conexiones"""
+
+    def test_queries_outside_requests(self, instrumented_engine):
+        """Test que una consulta fuera de una petición solo cuente en la duración global"""
+        before = metrics.DB_QUERY_DURATION.count()
+        with instrumented_engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        assert metrics.DB_QUERY_DURATION.count() == before + 1
+
+    def test_async_engine_queries(self):
+        """Test que las consultas del engine asíncrono se sumen a la petición en curso"""
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=NullPool)
+        instrument_engine(engine.sync_engine)
+        queries = RequestQueries()
+
+        async def run():
+            token = metrics._request_queries.set(queries)
+            try:
+                async with engine.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+                    await connection.execute(text("SELECT 2"))
+            finally:
+                metrics._request_queries.reset(token)
+                await engine.dispose()
+
+        asyncio.run(run())
+        assert queries.count == 2
+        assert queries.seconds > 0
+
+    def test_instrument_engine_is_idempotent(self, instrumented_engine):
+        """Test que instrumentar dos veces no duplique las mediciones"""
+        instrument_engine(instrumented_engine)
+        before = metrics.DB_QUERY_DURATION.count()
+        with instrumented_engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        assert metrics.DB_QUERY_DURATION.count() == before + 1
+
+    def test_pool_checkout_is_timed(self):
+        """Test que `get_db` mida la espera para obtener una conexión del pool"""
+        before = metrics.DB_POOL_CHECKOUT.count()
+        sessions = get_db()
+        next(sessions)
+        sessions.close()
+        assert metrics.DB_POOL_CHECKOUT.count() == before + 1
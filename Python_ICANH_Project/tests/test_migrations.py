@@ -0,0 +1,161 @@
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+
+from app.database.database import create_tables
+from app.database.migrations import alembic_config, current_revision, head_revision
+from app.database.search import include_name
+from app.models.models import Base
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Engine sobre una base de datos SQLite vacía en archivo"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'migraciones.db'}")
+    yield engine
+    engine.dispose()
+
+
+def migrate(engine, revision="head", downgrade=False):
+    """Ejecutar `alembic upgrade/downgrade` sobre `engine`"""
+    with engine.begin() as connection:
+        config = alembic_config(connection)
+        if downgrade:
+            command.downgrade(config, revision)
+        else:
+            command.upgrade(config, revision)
+
+
+class TestMigrations:
+    """Tests para las migraciones de Alembic"""
+
+    def test_upgrade_head_matches_models(self, engine):
+        """Test que las migraciones produzcan exactamente el esquema de los modelos"""
+        migrate(engine)
+        with engine.connect() as connection:
+            assert current_revision(connection) == head_revision()
+            context = MigrationContext.configure(connection, opts={"include_name": include_name})
+            diff = compare_metadata(context, Base.metadata)
+        assert diff == []
+
+    def test_baseline_installs_version_triggers(self, engine):
+        """Test que la migración inicial registre las versiones y sus triggers"""
+        migrate(engine)
+        with engine.begin() as connection:
+            before = connection.scalar(text("SELECT version FROM version_tabla WHERE tabla = 'persona'"))
+            connection.execute(text("INSERT INTO persona (nombre, cedula) VALUES ('Ana', '1')"))
+            after = connection.scalar(text("SELECT version FROM version_tabla WHERE tabla = 'persona'"))
+        assert after == before + 1
+
+    def test_indexes_migration(self, engine):
+        """Test que la búsqueda inversa de propietarios use el índice nuevo"""
+        query = "EXPLAIN QUERY PLAN SELECT vehiculo_id FROM vehiculo_persona WHERE persona_id = 1"
+        migrate(engine, "0001_baseline")
+        with engine.connect() as connection:
+            assert "ix_vehiculo_persona_persona_id" not in str(connection.execute(text(query)).all())
+
+        migrate(engine)
+        with engine.connect() as connection:
+            assert "ix_vehiculo_persona_persona_id" in str(connection.execute(text(query)).all())
+            indexes = {index["name"] for index in inspect(connection).get_indexes("vehiculo")}
+        assert {"ix_vehiculo_marca_id", "ix_vehiculo_modelo", "ix_vehiculo_color"} <= indexes
+
+    def test_search_migration_indexes_existing_rows(self, engine):
+        """Test que la migración de búsqueda indexe las filas existentes y las escrituras nuevas"""
+        query = "SELECT rowid FROM persona_fts WHERE persona_fts MATCH :q"
+        migrate(engine, "0003_indices_filtros")
+        with engine.begin() as connection:
+            connection.execute(text("INSERT INTO persona (nombre, cedula) VALUES ('Ana Gómez', '1')"))
+
+        migrate(engine)
+        with engine.begin() as connection:
+            assert connection.scalars(text(query), {"q": "gomez"}).all() == [1]
+            connection.execute(text("INSERT INTO persona (nombre, cedula) VALUES ('Luis Gómez', '2')"))
+            assert connection.scalars(text(query), {"q": "gomez"}).all() == [1, 2]
+
+    def test_summary_migration_loads_existing_vehicles(self, engine):
+        """Test que la migración del resumen cuente los vehículos existentes y los nuevos"""
+        query = "SELECT total FROM resumen_vehiculo WHERE color = 'Rojo'"
+        insert = "INSERT INTO vehiculo (modelo, color, numero_puertas, marca_id) VALUES ('Rio', 'Rojo', 4, 1)"
+        migrate(engine, "0004_busqueda")
+        with engine.begin() as connection:
+            connection.execute(text("INSERT INTO marca_vehiculo (nombre_marca, pais) VALUES ('Kia', 'Corea')"))
+            connection.execute(text(insert))
+
+        migrate(engine)
+        with engine.begin() as connection:
+            assert connection.scalar(text(query)) == 1
+            connection.execute(text(insert))
+            assert connection.scalar(text(query)) == 2
+
+    def test_summary_migration_after_create_tables(self, engine):
+        """Test que la migración del resumen funcione si `create_tables` ya creó la tabla"""
+        query = "SELECT total FROM resumen_vehiculo WHERE color = 'Rojo'"
+        insert = "INSERT INTO vehiculo (modelo, color, numero_puertas, marca_id) VALUES ('Rio', 'Rojo', 4, 1)"
+        migrate(engine, "0004_busqueda")
+        with engine.begin() as connection:
+            connection.execute(text("INSERT INTO marca_vehiculo (nombre_marca, pais) VALUES ('Kia', 'Corea')"))
+            connection.execute(text(insert))
+        create_tables(engine)
+        with engine.begin() as connection:
+            # Una escritura con los triggers ya instalados no se cuenta dos veces
+            connection.execute(text(insert))
+
+        migrate(engine, "0005_resumen_vehiculo")
+        with engine.begin() as connection:
+            assert connection.scalar(text(query)) == 2
+            connection.execute(text(insert))
+            assert connection.scalar(text(query)) == 3
+
+    def test_row_counters_migration(self, engine):
+        """Test que los contadores de filas partan del conteo existente y sigan las escrituras"""
+        query = "SELECT filas FROM conteo_tabla WHERE tabla = 'persona'"
+        migrate(engine, "0005_resumen_vehiculo")
+        with engine.begin() as connection:
+            connection.execute(text("INSERT INTO persona (nombre, cedula) VALUES ('Ana', '1'), ('Luis', '2')"))
+
+        migrate(engine)
+        with engine.begin() as connection:
+            assert connection.scalar(text(query)) == 2
+            connection.execute(text("DELETE FROM persona WHERE cedula = '1'"))
+            assert connection.scalar(text(query)) == 1
+
+    def test_upgrade_head_after_create_tables(self, engine):
+        """Test que `upgrade head` funcione si `create_tables` ya creó las tablas nuevas"""
+        query = "SELECT filas FROM conteo_tabla WHERE tabla = 'persona'"
+        migrate(engine, "0001_baseline")
+        with engine.begin() as connection:
+            connection.execute(text("INSERT INTO persona (nombre, cedula) VALUES ('Ana', '1')"))
+        create_tables(engine)
+        with engine.begin() as connection:
+            connection.execute(text("INSERT INTO persona (nombre, cedula) VALUES ('Luis', '2')"))
+
+        migrate(engine)
+        with engine.begin() as connection:
+            assert current_revision(connection) == head_revision()
+            assert connection.scalar(text(query)) == 2
+            connection.execute(text("INSERT INTO persona (nombre, cedula) VALUES ('Eva', '3')"))
+            assert connection.scalar(text(query)) == 3
+
+    def test_downgrade_to_base(self, engine):
+        """Test que las migraciones se puedan revertir por completo"""
+        migrate(engine)
+        migrate(engine, "base", downgrade=True)
+        assert inspect(engine).get_table_names() == ["alembic_version"]
+
+    def test_create_tables_stamps_new_database(self, engine):
+        """Test que una base de datos creada al arrancar quede marcada con la última migración"""
+        create_tables(engine)
+        with engine.connect() as connection:
+            assert current_revision(connection) == head_revision()
+        # upgrade head no tiene nada pendiente
+        migrate(engine)
+
+    def test_create_tables_keeps_existing_database_revision(self, engine):
+        """Test que una base de datos existente no se marque sin aplicar sus migraciones"""
+        migrate(engine, "0001_baseline")
+        create_tables(engine)
+        with engine.connect() as connection:
+            assert current_revision(connection) == "0001_baseline"
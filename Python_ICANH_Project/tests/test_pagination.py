@@ -0,0 +1,158 @@
+import pytest
+from fastapi import HTTPException
+
+from app.models.models import Persona, Vehiculo
+from app.utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+
+class TestCursor:
+    """Tests para la codificación de cursores opacos"""
+
+    def test_encode_decode_roundtrip(self):
+        """Test que un cursor codificado se pueda decodificar"""
+        cursor = encode_cursor("id", [42])
+        assert decode_cursor(cursor, "id", 1) == [42]
+
+    def test_decode_invalid_cursor(self):
+        """Test que un cursor malformado sea rechazado"""
+        with pytest.raises(HTTPException) as exc_info:
+            decode_cursor("no-es-un-cursor", "id", 1)
+        assert exc_info.value.status_code == 400
+
+    def test_decode_cursor_other_sort(self):
+        """Test que un cursor generado para otro orden sea rechazado"""
+        cursor = encode_cursor("modelo", ["Corolla", 3])
+        with pytest.raises(HTTPException):
+            decode_cursor(cursor, "id", 1)
+
+
+class TestCursorPagination:
+    """Tests para la paginación por cursor de los listados"""
+
+    @pytest.fixture
+    def many_vehiculos(self, db_session, sample_marca):
+        """Fixture que crea 7 vehículos de la misma marca"""
+        vehiculos = [
+            Vehiculo(modelo=f"Modelo {i}", marca_id=sample_marca.id, numero_puertas=4, color="Rojo")
+            for i in range(7)
+        ]
+        db_session.add_all(vehiculos)
+        db_session.commit()
+        return [vehiculo.id for vehiculo in vehiculos]
+
+    def test_walk_vehiculos_with_cursor(self, client, many_vehiculos):
+        """Test recorrer todos los vehículos siguiendo X-Next-Cursor"""
+        seen = []
+        response = client.get("/api/vehiculos/", params={"limit": 3})
+        while True:
+            assert response.status_code == 200
+            seen.extend(item["id"] for item in response.json())
+            next_cursor = response.headers.get(NEXT_CURSOR_HEADER)
+            if not next_cursor:
+                break
+            response = client.get("/api/vehiculos/", params={"limit": 3, "cursor": next_cursor})
+
+        assert seen == sorted(many_vehiculos)
+
+    def test_last_page_without_cursor(self, client, many_vehiculos):
+        """Test que la última página no publique cursor"""
+        response = client.get("/api/vehiculos/", params={"limit": 10})
+        assert response.status_code == 200
+        assert len(response.json()) == 7
+        assert NEXT_CURSOR_HEADER not in response.headers
+
+    def test_skip_limit_still_supported(self, client, many_vehiculos):
+        """Test que skip/limit sigan funcionando para clientes existentes"""
+        response = client.get("/api/vehiculos/", params={"skip": 5, "limit": 10})
+        assert response.status_code == 200
+        assert [item["id"] for item in response.json()] == sorted(many_vehiculos)[5:]
+
+    def test_invalid_cursor_returns_400(self, client):
+        """Test que un cursor inválido devuelva 400"""
+        response = client.get("/api/personas/", params={"cursor": "basura"})
+        assert response.status_code == 400
+        assert "Cursor" in response.json()["detail"]
+
+    def test_personas_and_marcas_with_cursor(self, client, multiple_personas, multiple_marcas):
+        """Test que personas y marcas también publiquen cursor"""
+        for url, total in (("/api/personas/", multiple_personas), ("/api/marcas-vehiculo/", multiple_marcas)):
+            response = client.get(url, params={"limit": 2})
+            assert len(response.json()) == 2
+            next_cursor = response.headers[NEXT_CURSOR_HEADER]
+
+            response = client.get(url, params={"limit": 2, "cursor": next_cursor})
+            assert [item["id"] for item in response.json()] == [total[-1].id]
+            assert NEXT_CURSOR_HEADER not in response.headers
+
+
+class TestOwnershipPagination:
+    """Tests para la paginación de propietarios y vehículos de una persona"""
+
+    @pytest.fixture
+    def flota_compartida(self, db_session, sample_marca, sample_persona):
+        """Fixture con 5 vehículos de `sample_persona` y 5 copropietarios del primero"""
+        vehiculos = [
+            Vehiculo(modelo=f"Modelo {i}", marca_id=sample_marca.id, numero_puertas=4, color="Rojo")
+            for i in range(5)
+        ]
+        personas = [Persona(nombre=f"Copropietario {i}", cedula=f"90{i}") for i in range(4)]
+        for vehiculo in vehiculos:
+            vehiculo.propietarios.append(sample_persona)
+        vehiculos[0].propietarios.extend(personas)
+        db_session.add_all(vehiculos)
+        db_session.commit()
+        return vehiculos[0].id, [vehiculo.id for vehiculo in vehiculos]
+
+    def _walk(self, client, url):
+        """Recorrer todas las páginas de `url` de 2 en 2 y devolver los cuerpos"""
+        pages = []
+        response = client.get(url, params={"limit": 2})
+        while True:
+            assert response.status_code == 200
+            pages.append(response.json())
+            next_cursor = response.headers.get(NEXT_CURSOR_HEADER)
+            if not next_cursor:
+                return pages
+            response = client.get(url, params={"limit": 2, "cursor": next_cursor})
+
+    def test_walk_vehiculo_propietarios(self, client, flota_compartida):
+        """Test recorrer los propietarios de un vehículo por cursor"""
+        vehiculo_id, _ = flota_compartida
+        pages = self._walk(client, f"/api/vehiculos/{vehiculo_id}/propietarios")
+        assert [len(page["propietarios"]) for page in pages] == [2, 2, 1]
+        ids = [persona["id"] for page in pages for persona in page["propietarios"]]
+        assert ids == sorted(ids) and len(set(ids)) == 5
+        assert all(page["marca"] is not None for page in pages)
+
+    def test_walk_persona_vehiculos(self, client, sample_persona, flota_compartida):
+        """Test recorrer los vehículos de una persona por cursor"""
+        _, vehiculo_ids = flota_compartida
+        pages = self._walk(client, f"/api/personas/{sample_persona.id}/vehiculos")
+        assert [v["id"] for page in pages for v in page["vehiculos"]] == sorted(vehiculo_ids)
+
+    def test_count_endpoints(self, client, sample_persona, flota_compartida):
+        """Test contar relaciones sin cargarlas"""
+        vehiculo_id, _ = flota_compartida
+        response = client.get(f"/api/vehiculos/{vehiculo_id}/propietarios/count")
+        assert response.json() == {"total": 5}
+        response = client.get(f"/api/personas/{sample_persona.id}/vehiculos/count")
+        assert response.json() == {"total": 5}
+
+    def test_count_empty_and_missing(self, client, sample_vehiculo, count_queries):
+        """Test que un conteo en cero distinga un recurso sin relaciones de uno inexistente"""
+        with count_queries() as statements:
+            response = client.get(f"/api/vehiculos/{sample_vehiculo.id}/propietarios/count")
+        assert response.json() == {"total": 0}
+        assert len(statements) == 3  # versiones de tabla (ETag) + conteo + existencia del vehículo
+        assert client.get("/api/vehiculos/999/propietarios/count").status_code == 404
+        assert client.get("/api/personas/999/vehiculos/count").status_code == 404
+
+    def test_async_pagination_and_count(self, async_client, sample_persona, flota_compartida):
+        """Test que los handlers asíncronos paginen y cuenten igual"""
+        vehiculo_id, vehiculo_ids = flota_compartida
+        pages = self._walk(async_client, f"/api/personas/{sample_persona.id}/vehiculos")
+        assert [v["id"] for page in pages for v in page["vehiculos"]] == sorted(vehiculo_ids)
+        pages = self._walk(async_client, f"/api/vehiculos/{vehiculo_id}/propietarios")
+        assert sum(len(page["propietarios"]) for page in pages) == 5
+        response = async_client.get(f"/api/vehiculos/{vehiculo_id}/propietarios/count")
+        assert response.json() == {"total": 5}
@@ -1,7 +1,8 @@
 import pytest
 from fastapi import HTTPException
+from sqlalchemy import event
 
-from app.models.models import MarcaVehiculo, Persona, Vehiculo
+from app.models.models import MarcaVehiculo, Persona, Vehiculo, vehiculo_persona
 
 
 class TestMarcaVehiculoRoutes:
@@ -297,6 +298,40 @@ class TestVehiculoRoutes:
         assert response2.status_code == 400
         assert "ya es propietaria" in response2.json()["detail"]
 
+    def test_concurrent_assign_is_not_500(self, client, db_session, sample_vehiculo, sample_persona):
+        """Test que una asignación concurrente de la misma pareja responda 400 y no 500"""
+        engine = db_session.get_bind()
+
+        def concurrent_assign(conn, cursor, statement, parameters, context, executemany):
+            # Otra petición crea la relación justo antes del INSERT de esta
+            if statement.startswith("INSERT INTO vehiculo_persona"):
+                cursor.connection.execute(
+                    "INSERT OR IGNORE INTO vehiculo_persona (vehiculo_id, persona_id) VALUES (?, ?)",
+                    (sample_vehiculo.id, sample_persona.id),
+                )
+
+        event.listen(engine, "before_cursor_execute", concurrent_assign)
+        try:
+            response = client.post(
+                f"/api/vehiculos/{sample_vehiculo.id}/propietarios/",
+                json={"persona_id": sample_persona.id}
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", concurrent_assign)
+        assert response.status_code == 400
+        assert "ya es propietaria" in response.json()["detail"]
+
+    def test_assign_existing_propietario_async(self, async_client, db_session, sample_vehiculo, sample_persona):
+        """Test que el handler asíncrono responda 400 si la relación ya existe"""
+        db_session.execute(vehiculo_persona.insert().values(vehiculo_id=sample_vehiculo.id, persona_id=sample_persona.id))
+        db_session.commit()
+        response = async_client.post(
+            f"/api/vehiculos/{sample_vehiculo.id}/propietarios/",
+            json={"persona_id": sample_persona.id}
+        )
+        assert response.status_code == 400
+        assert "ya es propietaria" in response.json()["detail"]
+
     def test_assign_propietario_invalid_persona(self, client, sample_vehiculo):
         """Test asignar propietario inexistente"""
         asignacion_data = {"persona_id": 999}
@@ -342,6 +377,63 @@ class TestVehiculoRoutes:
         assert response.status_code == 404
 
 
+class TestSingleStatementWrites:
+    """Tests para las escrituras de una sola sentencia (INSERT/UPDATE ... RETURNING)"""
+
+    def test_create_persona_single_statement(self, client, count_queries):
+        """Test que crear una persona sea un único INSERT ... RETURNING"""
+        with count_queries() as statements:
+            response = client.post("/api/personas/", json={"nombre": "Ana", "cedula": "123"})
+        assert response.status_code == 200
+        assert response.json()["cedula"] == "123"
+        assert len(statements) == 1
+        assert statements[0].startswith("INSERT") and "RETURNING" in statements[0]
+
+    def test_update_marca_single_statement(self, client, sample_marca, count_queries):
+        """Test que actualizar una marca en caché sea un único UPDATE ... RETURNING"""
+        client.get(f"/api/marcas-vehiculo/{sample_marca.id}")
+        with count_queries() as statements:
+            response = client.put(f"/api/marcas-vehiculo/{sample_marca.id}", json={"pais": "Corea"})
+        assert response.status_code == 200
+        assert response.json()["pais"] == "Corea"
+        # Versión de `marca_vehiculo` (valida la entrada en caché), UPDATE ... RETURNING y
+        # la consulta de vehículos a invalidar
+        assert len(statements) == 3
+        assert "version_tabla" in statements[0]
+        assert statements[1].startswith("UPDATE") and "RETURNING" in statements[1]
+
+    def test_duplicate_rejected_by_constraint(self, client, db_session, sample_persona):
+        """Test que un duplicado que no se vio antes del INSERT devuelva 400"""
+        response = client.post("/api/personas/", json={"nombre": "Otra", "cedula": sample_persona.cedula})
+        assert response.status_code == 400
+        assert "cédula" in response.json()["detail"]
+        assert db_session.query(Persona).count() == 1
+
+    def test_update_to_existing_nombre_marca(self, client, multiple_marcas):
+        """Test que renombrar a un nombre existente devuelva 400 y no cambie la marca"""
+        primera, segunda = multiple_marcas[:2]
+        response = client.put(
+            f"/api/marcas-vehiculo/{segunda.id}", json={"nombre_marca": primera.nombre_marca}
+        )
+        assert response.status_code == 400
+        assert client.get(f"/api/marcas-vehiculo/{segunda.id}").json()["nombre_marca"] == segunda.nombre_marca
+
+    def test_update_missing_persona(self, client):
+        """Test que actualizar una persona inexistente devuelva 404"""
+        response = client.put("/api/personas/999", json={"nombre": "Nadie"})
+        assert response.status_code == 404
+
+    def test_async_create_and_duplicate(self, async_client, sample_marca):
+        """Test que los handlers asíncronos usen la restricción única"""
+        marca = {"nombre_marca": sample_marca.nombre_marca, "pais": "X"}
+        assert async_client.post("/api/marcas-vehiculo/", json=marca).status_code == 400
+        response = async_client.post("/api/marcas-vehiculo/", json={"nombre_marca": "Nueva", "pais": "X"})
+        assert response.status_code == 200
+        assert response.json()["nombre_marca"] == "Nueva"
+        response = async_client.put(f"/api/marcas-vehiculo/{sample_marca.id}", json={"nombre_marca": "Nueva"})
+        assert response.status_code == 400
+
+
 class TestGeneralEndpoints:
     """Tests para endpoints generales"""
 
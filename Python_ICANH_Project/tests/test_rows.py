@@ -0,0 +1,110 @@
+import pytest
+
+from app.models.models import MarcaVehiculo, Persona, Vehiculo
+from app.schemas import schemas
+from app.utils import rows
+from app.utils.filters import VEHICULO_SORTS
+from app.utils.rows import PERSONA_CON_VEHICULOS_JSON, VEHICULO_ROWS
+
+
+@pytest.fixture
+def flota(db_session):
+    """Fixture con 2 marcas, 3 personas y 5 vehículos con distintos propietarios"""
+    marcas = [MarcaVehiculo(nombre_marca="Mazda", pais="Japón"), MarcaVehiculo(nombre_marca="Kia", pais="Corea")]
+    personas = [Persona(nombre=f"Persona {i}", cedula=f"90{i}") for i in range(3)]
+    db_session.add_all(marcas + personas)
+    db_session.flush()
+    vehiculos = [
+        Vehiculo(
+            modelo=f"Modelo {i}", marca_id=marcas[i % 2].id, numero_puertas=2 + i % 4,
+            color="Azul", propietarios=personas[:i % 4],
+        )
+        for i in range(5)
+    ]
+    db_session.add_all(vehiculos)
+    db_session.commit()
+    return personas
+
+
+def get_both(client, monkeypatch, path, **params):
+    """Respuesta desde filas SQL y desde objetos ORM de la misma petición"""
+    monkeypatch.setattr(rows, "ROW_RESPONSES", True)
+    from_rows = client.get(path, params=params)
+    monkeypatch.setattr(rows, "ROW_RESPONSES", False)
+    from_orm = client.get(path, params=params)
+    monkeypatch.setattr(rows, "ROW_RESPONSES", True)
+    return from_rows, from_orm
+
+
+class TestRowResponses:
+    """Tests para las respuestas construidas desde filas SQL"""
+
+    @pytest.mark.parametrize("path, params", [
+        ("/api/vehiculos/", {}),
+        ("/api/vehiculos/", {"sort": "-modelo", "limit": 2}),
+        ("/api/vehiculos/", {"numero_puertas_min": 3, "include_total": "true"}),
+        ("/api/personas/", {"sort": "nombre"}),
+        ("/api/marcas-vehiculo/", {"pais": "Corea"}),
+    ])
+    def test_lists_match_orm_responses(self, client, flota, monkeypatch, path, params):
+        """Test que los listados desde filas sean idénticos (bytes y headers) a los de objetos ORM"""
+        from_rows, from_orm = get_both(client, monkeypatch, path, **params)
+        assert from_rows.status_code == from_orm.status_code == 200
+        assert from_rows.content == from_orm.content
+        for header in ("x-next-cursor", "x-total-count", "etag"):
+            assert from_rows.headers.get(header) == from_orm.headers.get(header)
+
+    def test_persona_vehiculos_match_orm_response(self, client, flota, monkeypatch):
+        """Test que los vehículos de una persona desde filas coincidan con la respuesta ORM, página a página"""
+        params = {"limit": 2}
+        while True:
+            from_rows, from_orm = get_both(client, monkeypatch, f"/api/personas/{flota[0].id}/vehiculos", **params)
+            assert from_rows.content == from_orm.content
+            assert from_rows.json()["vehiculos"][0]["propietarios"]
+            cursor = from_rows.headers.get("x-next-cursor")
+            assert cursor == from_orm.headers.get("x-next-cursor")
+            if cursor is None:
+                break
+            params["cursor"] = cursor
+
+    def test_persona_vehiculos_not_found(self, client, db_session):
+        """Test que una persona inexistente devuelva 404"""
+        assert client.get("/api/personas/999/vehiculos").status_code == 404
+
+    def test_async_lists_from_rows(self, client, async_client, flota):
+        """Test que los handlers asíncronos devuelvan lo mismo que los síncronos"""
+        for path in ("/api/vehiculos/", "/api/personas/", f"/api/personas/{flota[1].id}/vehiculos"):
+            assert async_client.get(path).content == client.get(path).content
+
+    def test_same_number_of_queries(self, client, flota, count_queries):
+        """Test que el listado de vehículos siga costando un número fijo de consultas"""
+        with count_queries() as statements:
+            client.get("/api/vehiculos/")
+        # Versiones de tabla (ETag), vehículos con su marca y propietarios de la página
+        assert len(statements) == 3
+        assert "marca_vehiculo" in statements[1]
+
+
+class TestRowSource:
+    """Tests para las fuentes de filas y los serializadores precompilados"""
+
+    def test_page_does_not_hydrate_orm_objects(self, db_session, flota):
+        """Test que leer una página no cree objetos ORM en la sesión"""
+        db_session.expunge_all()
+        items, next_cursor = VEHICULO_ROWS.page(db_session, VEHICULO_SORTS.listing([], "id"), None, 0, 3)
+        assert len(db_session.identity_map) == 0
+        assert next_cursor is not None
+        assert [len(item["propietarios"]) for item in items] == [0, 1, 2]
+        assert items[1]["marca"]["nombre_marca"] == "Kia"
+
+    def test_items_follow_schema_field_order(self, db_session, flota):
+        """Test que los diccionarios sigan el orden de campos del esquema (el JSON lo conserva)"""
+        items, _ = VEHICULO_ROWS.page(db_session, VEHICULO_SORTS.listing([], "id"), None, 0, 2)
+        assert list(items[1]) == list(schemas.Vehiculo.model_fields)
+        assert list(items[1]["marca"]) == list(schemas.MarcaVehiculo.model_fields)
+        assert list(items[1]["propietarios"][0]) == list(schemas.Persona.model_fields)
+
+    def test_serializer_does_not_validate(self):
+        """Test que el serializador precompilado escriba los datos de confianza sin validarlos"""
+        persona = {"nombre": "", "cedula": "1", "id": 3, "vehiculos": []}
+        assert PERSONA_CON_VEHICULOS_JSON.dump(persona) == b'{"nombre":"","cedula":"1","id":3,"vehiculos":[]}'
@@ -0,0 +1,93 @@
+import pytest
+
+import run
+
+
+@pytest.fixture
+def environment(monkeypatch):
+    """Fixture que limpia las variables de entorno del servidor"""
+    names = (
+        "ENVIRONMENT", "RELOAD", "WEB_WORKERS", "HOST", "PORT", "LIMIT_CONCURRENCY", "KEEP_ALIVE_TIMEOUT",
+        "BACKLOG", "MAX_REQUESTS", "GRACEFUL_TIMEOUT", "FORWARDED_ALLOW_IPS", "CACHE_BACKEND", "CACHE_SIZE",
+    )
+    for name in names:
+        monkeypatch.delenv(name, raising=False)
+    return monkeypatch
+
+
+class TestServerOptions:
+    """Tests para la configuración del servidor de run.py"""
+
+    def test_development_defaults(self, environment):
+        """Test que en desarrollo se use un proceso con recarga automática"""
+        options = run.server_options(run.parse_args([]))
+        assert options == {"host": "0.0.0.0", "port": 8000, "reload": True}
+
+    def test_development_reload_from_environment(self, environment):
+        """Test que RELOAD=False desactive la recarga en desarrollo"""
+        environment.setenv("RELOAD", "False")
+        assert run.server_options(run.parse_args([]))["reload"] is False
+        assert run.server_options(run.parse_args(["--reload"]))["reload"] is True
+
+    def test_production_uses_workers(self, environment):
+        """Test que producción use un worker por CPU, sin recarga y con uvloop/httptools"""
+        environment.setenv("ENVIRONMENT", "production")
+        environment.setattr(run, "_installed", lambda module: True)
+        options = run.server_options(run.parse_args([]))
+        assert options["reload"] is False
+        assert options["workers"] == run.available_cpus()
+        assert options["loop"] == "uvloop"
+        assert options["http"] == "httptools"
+        assert options["timeout_keep_alive"] == 65
+        assert options["backlog"] == 2048
+        assert options["limit_concurrency"] is None
+        assert options["limit_max_requests"] is None
+        assert options["timeout_graceful_shutdown"] == 30
+        assert options["forwarded_allow_ips"] == "127.0.0.1"
+
+    def test_production_falls_back_without_uvloop(self, environment):
+        """Test que sin uvloop ni httptools se use el loop y el parser estándar"""
+        environment.setenv("ENVIRONMENT", "production")
+        environment.setattr(run, "_installed", lambda module: False)
+        options = run.server_options(run.parse_args([]))
+        assert (options["loop"], options["http"]) == ("asyncio", "h11")
+
+    def test_production_settings_from_environment(self, environment):
+        """Test que workers y límites se configuren por entorno y por argumentos"""
+        environment.setenv("ENVIRONMENT", "production")
+        environment.setenv("WEB_WORKERS", "3")
+        environment.setenv("LIMIT_CONCURRENCY", "200")
+        environment.setenv("KEEP_ALIVE_TIMEOUT", "10")
+        options = run.server_options(run.parse_args(["--port", "9000"]))
+        assert options["workers"] == 3
+        assert options["limit_concurrency"] == 200
+        assert options["timeout_keep_alive"] == 10
+        assert options["port"] == 9000
+        assert run.server_options(run.parse_args(["--workers", "5"]))["workers"] == 5
+
+    def test_production_refuses_reload(self, environment):
+        """Test que producción rechace la recarga automática por argumento o por entorno"""
+        environment.setenv("ENVIRONMENT", "production")
+        with pytest.raises(SystemExit):
+            run.server_options(run.parse_args(["--reload"]))
+        environment.setenv("RELOAD", "True")
+        with pytest.raises(SystemExit):
+            run.server_options(run.parse_args([]))
+
+
+class TestWorkerCaches:
+    """Tests para las cachés en memoria con varios workers"""
+
+    def test_memory_caches_disabled_with_workers(self, environment):
+        """Test que varios workers con el backend en memoria desactiven las cachés"""
+        environment.setenv("CACHE_SIZE", "10000")
+        assert run.disable_process_caches({"workers": 4}) is True
+        assert run.os.environ["CACHE_SIZE"] == "0"
+
+    def test_caches_kept_with_single_worker_or_redis(self, environment):
+        """Test que un worker o el backend redis conserven las cachés"""
+        assert run.disable_process_caches({"workers": 1}) is False
+        assert run.disable_process_caches({}) is False
+        environment.setenv("CACHE_BACKEND", "redis")
+        assert run.disable_process_caches({"workers": 4}) is False
+        assert run.os.environ.get("CACHE_SIZE") is None
@@ -0,0 +1,114 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.database.search import SEARCH_INDEXES, query_terms
+from app.models.models import MarcaVehiculo, Persona, Vehiculo
+
+
+@pytest.fixture
+def directorio(db_session):
+    """Fixture con personas, marcas y vehículos de nombres conocidos"""
+    toyota = MarcaVehiculo(nombre_marca="Toyota", pais="Japón")
+    renault = MarcaVehiculo(nombre_marca="Renault", pais="Francia")
+    personas = [
+        Persona(nombre="Ana Gómez", cedula="1010"),
+        Persona(nombre="Luis Gómez Pérez", cedula="2020"),
+        Persona(nombre="Marta Ruiz", cedula="3030"),
+    ]
+    db_session.add_all([toyota, renault, *personas])
+    db_session.flush()
+    db_session.add_all([
+        Vehiculo(modelo="Corolla", color="Rojo", numero_puertas=4, marca_id=toyota.id),
+        Vehiculo(modelo="Clio", color="Gris", numero_puertas=5, marca_id=renault.id),
+    ])
+    db_session.commit()
+    return personas
+
+
+def search_ids(client, **params):
+    response = client.get("/api/search", params=params)
+    assert response.status_code == 200
+    return [(result["tipo"], result["datos"]) for result in response.json()]
+
+
+class TestSearchEndpoint:
+    """Tests para GET /api/search"""
+
+    def test_search_by_prefix_ignoring_accents_and_case(self, client, directorio):
+        """Test que los términos se busquen como prefijos sin distinguir tildes ni mayúsculas"""
+        results = search_ids(client, q="GOME")
+        assert sorted(datos["nombre"] for _, datos in results) == ["Ana Gómez", "Luis Gómez Pérez"]
+
+    def test_all_terms_must_match(self, client, directorio):
+        """Test que todos los términos deban aparecer en el registro"""
+        results = search_ids(client, q="gómez luis")
+        assert results == [("persona", {"nombre": "Luis Gómez Pérez", "cedula": "2020"})]
+
+    def test_search_across_resources(self, client, directorio):
+        """Test que una búsqueda combine personas, vehículos y marcas"""
+        assert search_ids(client, q="toyota") == [("marca", {"nombre_marca": "Toyota"})]
+        assert search_ids(client, q="rojo") == [("vehiculo", {"modelo": "Corolla", "color": "Rojo"})]
+        assert search_ids(client, q="3030") == [("persona", {"nombre": "Marta Ruiz", "cedula": "3030"})]
+
+    def test_filter_by_tipo_and_limit(self, client, directorio):
+        """Test que `tipo` restrinja los recursos y `limit` el número de resultados"""
+        results = search_ids(client, q="c", tipo="vehiculo")
+        assert sorted(datos["modelo"] for _, datos in results) == ["Clio", "Corolla"]
+        assert {tipo for tipo, _ in search_ids(client, q="r", tipo=["persona", "marca"])} == {"persona", "marca"}
+        assert len(search_ids(client, q="gomez", limit=1)) == 1
+
+    def test_results_are_ranked(self, client, directorio):
+        """Test que el registro más relevante aparezca primero"""
+        response = client.get("/api/search", params={"q": "gomez"})
+        scores = [result["puntaje"] for result in response.json()]
+        assert scores == sorted(scores, reverse=True)
+        # "Ana Gómez" es más corto que "Luis Gómez Pérez": bm25 lo pondera más alto
+        assert response.json()[0]["datos"]["nombre"] == "Ana Gómez"
+
+    def test_scores_normalized_per_resource(self, client, directorio):
+        """Test que los puntajes se normalicen por recurso (el mejor de cada uno vale 1)"""
+        results = client.get("/api/search", params={"q": "r"}).json()
+        best = {}
+        for result in results:
+            assert 0 < result["puntaje"] <= 1
+            best[result["tipo"]] = max(best.get(result["tipo"], 0), result["puntaje"])
+        assert set(best) == {"persona", "vehiculo", "marca"}
+        assert set(best.values()) == {1.0}
+
+    def test_index_follows_writes(self, client, directorio):
+        """Test que los triggers mantengan el índice al actualizar y eliminar"""
+        persona_id = directorio[2].id
+        client.put(f"/api/personas/{persona_id}", json={"nombre": "Marta Herrera"})
+        assert search_ids(client, q="ruiz") == []
+        assert search_ids(client, q="herrera") == [("persona", {"nombre": "Marta Herrera", "cedula": "3030"})]
+
+        client.delete(f"/api/personas/{persona_id}")
+        assert search_ids(client, q="herrera") == []
+
+    def test_query_without_words(self, client, directorio):
+        """Test que una búsqueda sin palabras sea rechazada"""
+        response = client.get("/api/search", params={"q": "***"})
+        assert response.status_code == 400
+
+
+class TestSearchHelpers:
+    """Tests para las funciones de búsqueda"""
+
+    def test_query_terms(self):
+        """Test que los términos se normalicen y no se repitan"""
+        assert query_terms('Ana "GÓMEZ" ana; 10-20') == ["ana", "gómez", "10", "20"]
+
+    def test_fallback_without_full_text_index(self, tmp_path):
+        """Test que en motores sin índice de texto completo se busque con ILIKE"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'respaldo.db'}")
+        try:
+            Persona.__table__.create(engine)
+            with Session(engine) as db:
+                db.add_all([Persona(nombre="Ana Gómez", cedula="1"), Persona(nombre="Luis", cedula="2")])
+                db.commit()
+                index = SEARCH_INDEXES[0]
+                rows = db.execute(index.statement("otro", ["gómez"], 10)).all()
+            assert [row.nombre for row in rows] == ["Ana Gómez"]
+        finally:
+            engine.dispose()
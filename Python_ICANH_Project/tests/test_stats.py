@@ -0,0 +1,106 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.database.database import create_tables
+from app.database.stats import Dimension, stats_statement
+from app.models.models import MarcaVehiculo, Vehiculo
+
+
+@pytest.fixture
+def flota(db_session):
+    """Fixture con 5 vehículos de dos marcas de países distintos"""
+    toyota = MarcaVehiculo(nombre_marca="Toyota", pais="Japón")
+    renault = MarcaVehiculo(nombre_marca="Renault", pais="Francia")
+    db_session.add_all([toyota, renault])
+    db_session.flush()
+    vehiculos = [
+        Vehiculo(modelo="Corolla", color="Rojo", numero_puertas=4, marca_id=toyota.id),
+        Vehiculo(modelo="Yaris", color="Rojo", numero_puertas=4, marca_id=toyota.id),
+        Vehiculo(modelo="Hilux", color="Gris", numero_puertas=2, marca_id=toyota.id),
+        Vehiculo(modelo="Clio", color="Gris", numero_puertas=5, marca_id=renault.id),
+        Vehiculo(modelo="Twingo", color="Rojo", numero_puertas=4, marca_id=renault.id),
+    ]
+    db_session.add_all(vehiculos)
+    db_session.commit()
+    return {"toyota": toyota, "renault": renault, "vehiculos": vehiculos}
+
+
+def stats(client, dimension):
+    response = client.get(f"/api/stats/vehiculos/{dimension}")
+    assert response.status_code == 200
+    return [(item["grupo"], item["total"]) for item in response.json()]
+
+
+class TestVehicleStats:
+    """Tests para GET /api/stats/vehiculos/{dimension}"""
+
+    def test_counts_by_dimension(self, client, flota):
+        """Test que cada dimensión se cuente de mayor a menor"""
+        assert stats(client, "marca") == [("Toyota", 3), ("Renault", 2)]
+        assert stats(client, "pais") == [("Japón", 3), ("Francia", 2)]
+        assert stats(client, "color") == [("Rojo", 3), ("Gris", 2)]
+        assert stats(client, "puertas") == [(4, 3), (2, 1), (5, 1)]
+
+    def test_unknown_dimension(self, client, flota):
+        """Test que una dimensión desconocida sea rechazada"""
+        assert client.get("/api/stats/vehiculos/modelo").status_code == 422
+
+    def test_summary_follows_vehicle_writes(self, client, flota):
+        """Test que el resumen se actualice al crear, modificar y eliminar vehículos"""
+        renault_id = flota["renault"].id
+        response = client.post(
+            "/api/vehiculos/",
+            json={"modelo": "Megane", "color": "Azul", "numero_puertas": 5, "marca_id": renault_id},
+        )
+        nuevo_id = response.json()["id"]
+        assert ("Azul", 1) in stats(client, "color")
+
+        client.put(f"/api/vehiculos/{nuevo_id}", json={"color": "Rojo"})
+        assert stats(client, "color") == [("Rojo", 4), ("Gris", 2)]
+
+        client.delete(f"/api/vehiculos/{flota['vehiculos'][3].id}")
+        assert stats(client, "puertas") == [(4, 3), (2, 1), (5, 1)]
+        assert stats(client, "marca") == [("Toyota", 3), ("Renault", 2)]
+
+    def test_summary_follows_bulk_writes(self, client, flota):
+        """Test que las cargas masivas también actualicen el resumen"""
+        toyota_id = flota["toyota"].id
+        vehiculos = [{"modelo": f"Prius {i}", "color": "Blanco", "numero_puertas": 4, "marca_id": toyota_id} for i in range(3)]
+        assert client.post("/api/vehiculos/bulk", json=vehiculos).status_code == 200
+        assert stats(client, "marca") == [("Toyota", 6), ("Renault", 2)]
+
+    def test_summary_matches_group_by(self, db_session, flota):
+        """Test que el resumen y el GROUP BY directo sobre vehiculo coincidan"""
+        for dimension in Dimension:
+            direct = db_session.execute(stats_statement(dimension, use_summary=False)).all()
+            summary = db_session.execute(stats_statement(dimension, use_summary=True)).all()
+            assert summary == direct
+
+    def test_summary_reads_groups_not_rows(self, db_session, flota):
+        """Test que el resumen guarde una fila por combinación (marca, color, puertas)"""
+        rows = db_session.execute(text("SELECT total FROM resumen_vehiculo")).scalars().all()
+        assert sorted(rows) == [1, 1, 1, 2]
+
+
+class TestSummaryCreation:
+    """Tests para la creación del resumen en una base de datos existente"""
+
+    def test_create_tables_loads_existing_vehicles(self, tmp_path):
+        """Test que el resumen creado al arrancar incluya los vehículos existentes"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'existente.db'}")
+        try:
+            with engine.begin() as connection:
+                for table in (MarcaVehiculo.__table__, Vehiculo.__table__):
+                    table.create(connection)
+                connection.execute(text("INSERT INTO marca_vehiculo (nombre_marca, pais) VALUES ('Kia', 'Corea')"))
+                connection.execute(text(
+                    "INSERT INTO vehiculo (modelo, color, numero_puertas, marca_id) "
+                    "VALUES ('Rio', 'Rojo', 4, 1), ('Picanto', 'Rojo', 4, 1)"
+                ))
+
+            create_tables(engine)
+            with engine.connect() as connection:
+                rows = connection.execute(text("SELECT marca_id, color, numero_puertas, total FROM resumen_vehiculo"))
+                assert rows.all() == [(1, "Rojo", 4, 2)]
+        finally:
+            engine.dispose()
@@ -0,0 +1,89 @@
+import pytest
+
+from app.models.models import MarcaVehiculo, Vehiculo
+from app.utils import totals
+from app.utils.totals import TOTAL_COUNT_HEADER, TOTAL_ESTIMATED_HEADER
+
+
+@pytest.fixture
+def parque(db_session):
+    """Fixture con 2 marcas y 6 vehículos"""
+    toyota = MarcaVehiculo(nombre_marca="Toyota", pais="Japón")
+    kia = MarcaVehiculo(nombre_marca="Kia", pais="Corea")
+    db_session.add_all([toyota, kia])
+    db_session.flush()
+    datos = [
+        ("Corolla", "Rojo", 4, toyota), ("Corsa", "Azul", 3, toyota), ("Yaris", "Rojo", 5, toyota),
+        ("Rio", "Rojo", 4, kia), ("Picanto", "Gris", 5, kia), ("Cerato", "Rojo", 4, kia),
+    ]
+    db_session.add_all([
+        Vehiculo(modelo=modelo, color=color, numero_puertas=puertas, marca_id=marca.id)
+        for modelo, color, puertas, marca in datos
+    ])
+    db_session.commit()
+    return {"toyota": toyota, "kia": kia}
+
+
+def total(client, url, **params):
+    response = client.get(url, params={"include_total": "true", **params})
+    assert response.status_code == 200
+    return int(response.headers[TOTAL_COUNT_HEADER]), response.headers.get(TOTAL_ESTIMATED_HEADER)
+
+
+class TestTotalCount:
+    """Tests para el header X-Total-Count de los listados"""
+
+    def test_total_is_opt_in(self, client, parque):
+        """Test que sin include_total no se publique el total"""
+        response = client.get("/api/vehiculos/")
+        assert TOTAL_COUNT_HEADER not in response.headers
+
+    def test_unfiltered_total_reads_counter(self, client, parque, count_queries):
+        """Test que el total sin filtros se lea del contador de la tabla y no con COUNT(*)"""
+        with count_queries() as statements:
+            assert total(client, "/api/vehiculos/", limit=2) == (6, None)
+        assert not any("count(" in statement.lower() for statement in statements)
+        assert any("conteo_tabla" in statement for statement in statements)
+        assert total(client, "/api/marcas-vehiculo/") == (2, None)
+
+    def test_total_follows_writes(self, client, parque):
+        """Test que los contadores sigan las altas y bajas"""
+        client.post("/api/personas/", json={"nombre": "Ana", "cedula": "1"})
+        response = client.post("/api/personas/", json={"nombre": "Luis", "cedula": "2"})
+        assert total(client, "/api/personas/") == (2, None)
+        client.delete(f"/api/personas/{response.json()['id']}")
+        assert total(client, "/api/personas/") == (1, None)
+
+    def test_vehicle_filters_use_summary(self, client, parque, count_queries):
+        """Test que los filtros por marca, color y puertas se cuenten sobre el resumen"""
+        with count_queries() as statements:
+            result = total(client, "/api/vehiculos/", color="Rojo", numero_puertas_min=4, marca_id=parque["kia"].id)
+        assert result == (2, None)
+        assert any("resumen_vehiculo" in statement for statement in statements)
+        assert not any("FROM vehiculo" in statement and "count(" in statement for statement in statements)
+
+    def test_other_filters_count_exactly(self, client, parque):
+        """Test que los filtros fuera del resumen se cuenten con COUNT(*) sobre los índices"""
+        assert total(client, "/api/vehiculos/", modelo="Co") == (2, None)
+        assert total(client, "/api/vehiculos/", modelo="Co", color="Azul") == (1, None)
+        assert total(client, "/api/marcas-vehiculo/", pais="Corea") == (1, None)
+
+    def test_estimate_mode_caps_count(self, client, parque, monkeypatch):
+        """Test que el modo estimado cuente hasta el tope y marque el total como estimado"""
+        monkeypatch.setattr(totals, "TOTAL_COUNT_CAP", 2)
+        assert total(client, "/api/vehiculos/", modelo="C", total_mode="estimate") == (2, "true")
+        assert total(client, "/api/vehiculos/", modelo="Y", total_mode="estimate") == (1, None)
+        # Sin filtros el contador es exacto aunque se pida estimación
+        assert total(client, "/api/vehiculos/", total_mode="estimate") == (6, None)
+
+    def test_auto_mode_estimates_large_tables(self, client, parque, monkeypatch):
+        """Test que el modo auto solo estime sobre tablas más grandes que el umbral"""
+        monkeypatch.setattr(totals, "TOTAL_COUNT_CAP", 2)
+        assert total(client, "/api/vehiculos/", modelo="C") == (3, None)
+        monkeypatch.setattr(totals, "TOTAL_ESTIMATE_THRESHOLD", 5)
+        assert total(client, "/api/vehiculos/", modelo="C") == (2, "true")
+
+    def test_async_listing_total(self, async_client, parque):
+        """Test que los listados asíncronos publiquen el mismo total"""
+        assert total(async_client, "/api/vehiculos/", color="Rojo") == (4, None)
+        assert total(async_client, "/api/personas/") == (0, None)